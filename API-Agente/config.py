@@ -16,6 +16,12 @@ class Config:
     TABLE_DATOS_SOCIOECONOMICOS = os.getenv('TABLE_DATOS_SOCIOECONOMICOS', 'DatosSocioeconomicos')
     TABLE_HISTORIAL = os.getenv('TABLE_HISTORIAL', 'Historial')
     TABLE_TAREAS = os.getenv('TABLE_TAREAS', 'Tarea')
+    TABLE_CACHE_RESPUESTAS = os.getenv('TABLE_CACHE_RESPUESTAS', 'CacheRespuestas')
+    
+    # ===== ÍNDICES SECUNDARIOS =====
+    INDEX_USUARIOS_CORREO = os.getenv('INDEX_USUARIOS_CORREO', 'CorreoIndex')
+    # Partition key constante de ListadoCorreoIndex (listado paginado por correo)
+    LISTADO_USUARIOS = 'usuarios'
     
     # ===== API CONFIGURATION =====
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
@@ -25,6 +31,94 @@ class Config:
     LIMITE_HISTORIAL = int(os.getenv('LIMITE_HISTORIAL', '10'))
     LIMITE_TAREAS = int(os.getenv('LIMITE_TAREAS', '20'))
     
+    # ===== CACHÉ DE RESPUESTAS DEL AGENTE =====
+    # Coincidencia exacta por contexto + mensaje normalizado + huella del prompt.
+    # L1 en memoria del contenedor y L2 en DynamoDB (TTL nativo sobre 'expira')
+    CACHE_RESPUESTAS_HABILITADO = os.getenv('CACHE_RESPUESTAS_HABILITADO', 'false').lower() == 'true'
+    CACHE_RESPUESTAS_TTL_SEGUNDOS = int(os.getenv('CACHE_RESPUESTAS_TTL_SEGUNDOS', '86400'))
+    CACHE_RESPUESTAS_L1_TTL_SEGUNDOS = int(os.getenv('CACHE_RESPUESTAS_L1_TTL_SEGUNDOS', '600'))
+    CACHE_RESPUESTAS_L1_MAX_ENTRADAS = int(os.getenv('CACHE_RESPUESTAS_L1_MAX_ENTRADAS', '200'))
+    # Los aciertos se cuentan en memoria y se suman a la tabla cada tanto
+    # (por tiempo o al acumular demasiados, lo que ocurra primero)
+    CACHE_RESPUESTAS_VOLCADO_SEGUNDOS = int(os.getenv('CACHE_RESPUESTAS_VOLCADO_SEGUNDOS', '60'))
+    CACHE_RESPUESTAS_VOLCADO_MAX_PENDIENTES = int(os.getenv('CACHE_RESPUESTAS_VOLCADO_MAX_PENDIENTES', '50'))
+    
+    # ===== CACHÉ SEMÁNTICA DE RESPUESTAS =====
+    # Preguntas casi duplicadas (similitud coseno de vectores locales) del
+    # mismo estudiante con los mismos datos. URI: ruta local o s3://bucket/prefijo
+    CACHE_SEMANTICO_HABILITADO = os.getenv('CACHE_SEMANTICO_HABILITADO', 'false').lower() == 'true'
+    CACHE_SEMANTICO_UMBRAL = float(os.getenv('CACHE_SEMANTICO_UMBRAL', '0.7'))
+    CACHE_SEMANTICO_DIMENSION = int(os.getenv('CACHE_SEMANTICO_DIMENSION', '1024'))
+    CACHE_SEMANTICO_MAX_ENTRADAS = int(os.getenv('CACHE_SEMANTICO_MAX_ENTRADAS', '5000'))
+    CACHE_SEMANTICO_TTL_SEGUNDOS = int(os.getenv('CACHE_SEMANTICO_TTL_SEGUNDOS', '86400'))
+    CACHE_SEMANTICO_URI = os.getenv('CACHE_SEMANTICO_URI', '')
+    CACHE_SEMANTICO_PERSISTIR_SEGUNDOS = int(os.getenv('CACHE_SEMANTICO_PERSISTIR_SEGUNDOS', '60'))
+    
+    # ===== RESUMEN DE INTERACCIONES =====
+    # 'sincrono': el handler genera el resumen y lo guarda antes de responder
+    # 'diferido': el handler encola el intercambio y el worker procesar_resumen
+    #             genera el resumen y escribe el Historial
+    RESUMEN_MODO = os.getenv('RESUMEN_MODO', 'sincrono')
+    RESUMEN_COLA_URL = os.getenv('RESUMEN_COLA_URL')
+    
+    # Estrategia del resumen por contexto:
+    # 'extractivo': resumidor local sin LLM (microsegundos, sin costo)
+    # 'llm': resumen generado con Gemini (una llamada extra por consulta)
+    RESUMEN_ESTRATEGIA = os.getenv('RESUMEN_ESTRATEGIA', 'extractivo')
+    RESUMEN_ESTRATEGIA_POR_CONTEXTO: Dict[str, str] = {
+        'MentorAcademico': os.getenv('RESUMEN_ESTRATEGIA_MENTORACADEMICO', RESUMEN_ESTRATEGIA),
+        'OrientadorVocacional': os.getenv('RESUMEN_ESTRATEGIA_ORIENTADORVOCACIONAL', RESUMEN_ESTRATEGIA),
+        'Psicologo': os.getenv('RESUMEN_ESTRATEGIA_PSICOLOGO', RESUMEN_ESTRATEGIA)
+    }
+    
+    # ===== RECUPERACIÓN DEL HISTORIAL POR RELEVANCIA =====
+    # Cada resumen se guarda con su vector float16 (vectorizador local) y el
+    # agente recibe las TOP_K interacciones más similares al mensaje entre
+    # las últimas CANDIDATOS del contexto, en lugar de las últimas 5
+    HISTORIAL_RECUPERACION_HABILITADA = os.getenv('HISTORIAL_RECUPERACION_HABILITADA', 'false').lower() == 'true'
+    HISTORIAL_RECUPERACION_TOP_K = int(os.getenv('HISTORIAL_RECUPERACION_TOP_K', '5'))
+    HISTORIAL_RECUPERACION_CANDIDATOS = int(os.getenv('HISTORIAL_RECUPERACION_CANDIDATOS', '50'))
+    HISTORIAL_VECTOR_DIMENSION = int(os.getenv('HISTORIAL_VECTOR_DIMENSION', '256'))
+    
+    # ===== MEMORIA CONSOLIDADA DEL HISTORIAL =====
+    # La compactación periódica pliega los resúmenes de cada contexto
+    # anteriores a los últimos MEMORIA_MANTENER_RECIENTES en un registro por
+    # usuario y contexto (id '<contexto>#memoria') y borra los plegados. El
+    # agente lee ese registro más los recientes: el prompt no crece con la
+    # antigüedad. Con la recuperación por relevancia se conservan todos los
+    # candidatos
+    MEMORIA_MANTENER_RECIENTES = int(os.getenv(
+        'MEMORIA_MANTENER_RECIENTES',
+        str(HISTORIAL_RECUPERACION_CANDIDATOS if HISTORIAL_RECUPERACION_HABILITADA else LIMITE_HISTORIAL)
+    ))
+    # Registros nuevos mínimos de un contexto para reescribir su memoria
+    MEMORIA_LOTE_MINIMO = int(os.getenv('MEMORIA_LOTE_MINIMO', '5'))
+    MEMORIA_MAX_CARACTERES = int(os.getenv('MEMORIA_MAX_CARACTERES', '600'))
+    # Usuarios compactados a la vez por la Lambda programada
+    MEMORIA_MAX_WORKERS = int(os.getenv('MEMORIA_MAX_WORKERS', '8'))
+    
+    # ===== RETENCIÓN DEL HISTORIAL (TTL nativo sobre 'expira') =====
+    # Días que se conserva cada registro desde que se escribe (la memoria
+    # consolidada se renueva en cada compactación); 0 = sin expiración
+    HISTORIAL_RETENCION_DIAS = int(os.getenv('HISTORIAL_RETENCION_DIAS', '365'))
+    HISTORIAL_RETENCION_DIAS_POR_CONTEXTO: Dict[str, int] = {
+        'MentorAcademico': int(os.getenv('HISTORIAL_RETENCION_DIAS_MENTORACADEMICO', str(HISTORIAL_RETENCION_DIAS))),
+        'OrientadorVocacional': int(os.getenv('HISTORIAL_RETENCION_DIAS_ORIENTADORVOCACIONAL', str(HISTORIAL_RETENCION_DIAS))),
+        'Psicologo': int(os.getenv('HISTORIAL_RETENCION_DIAS_PSICOLOGO', str(HISTORIAL_RETENCION_DIAS)))
+    }
+    
+    # ===== CACHÉ ENTRE INVOCACIONES =====
+    # Datos* cambian poco: se cachean en el contenedor Lambda caliente.
+    # Usuario no (lleva la autorización). API-Analisis escribe Datos* desde
+    # otros contenedores, así que la frescura la acota el TTL, como allí
+    CACHE_HABILITADO = os.getenv('CACHE_HABILITADO', 'true').lower() == 'true'
+    CACHE_TTL_SEGUNDOS = int(os.getenv('CACHE_TTL_SEGUNDOS', '60'))
+    CACHE_MAX_ENTRADAS = int(os.getenv('CACHE_MAX_ENTRADAS', '500'))
+    
+    # ===== SCAN PARALELO (lecturas masivas) =====
+    # Segmentos (y hilos) por defecto de BaseDAO.parallel_scan
+    SCAN_PARALELO_SEGMENTOS = int(os.getenv('SCAN_PARALELO_SEGMENTOS', '8'))
+    
     # ===== CONFIGURACIÓN DE CONTEXTOS =====
     CONTEXTOS_DISPONIBLES = [
         'MentorAcademico',
@@ -32,6 +126,12 @@ class Config:
         'Psicologo'
     ]
     
+    # Prefijos de la sort key de Historial ('<contexto>#<UUID v7>'). 'General'
+    # agrupa los registros anteriores a que el historial guardara el contexto;
+    # todos los agentes lo leen para completar un historial propio corto
+    HISTORIAL_CONTEXTO_GENERAL = 'General'
+    HISTORIAL_CONTEXTOS = CONTEXTOS_DISPONIBLES + [HISTORIAL_CONTEXTO_GENERAL]
+    
     # Mapeo de contextos a tablas requeridas
     CONTEXTO_TABLAS_MAP: Dict[str, List[str]] = {
         'MentorAcademico': [
@@ -55,6 +155,42 @@ class Config:
         ]
     }
     
+    # Cómo se carga cada tabla de un contexto a partir del usuarioId: DAO,
+    # método de lectura y clave en el diccionario de datos del contexto.
+    # La tabla de usuarios no aparece: es la raíz de la que sale el usuarioId.
+    # 'por_contexto': el método recibe además el nombre del contexto.
+    TABLA_DAO_MAP: Dict[str, Dict] = {
+        TABLE_HISTORIAL: {
+            'dao': 'historial',
+            'metodo': 'get_historial_contexto',
+            'clave': 'historial',
+            'por_contexto': True
+        },
+        TABLE_DATOS_ACADEMICOS: {
+            'dao': 'datos_academicos',
+            'metodo': 'get_datos_por_usuario',
+            'clave': 'datos_academicos'
+        },
+        TABLE_DATOS_EMOCIONALES: {
+            'dao': 'datos_emocionales',
+            'metodo': 'get_datos_por_usuario',
+            'clave': 'datos_emocionales'
+        },
+        TABLE_DATOS_SOCIOECONOMICOS: {
+            'dao': 'datos_socioeconomicos',
+            'metodo': 'get_datos_por_usuario',
+            'clave': 'datos_socioeconomicos'
+        },
+        TABLE_TAREAS: {
+            'dao': 'tareas',
+            'metodo': 'get_tareas_por_usuario',
+            'clave': 'tareas'
+        }
+    }
+    
+    # Hilos para cargar en paralelo las tablas de un contexto
+    CONTEXTO_MAX_WORKERS = int(os.getenv('CONTEXTO_MAX_WORKERS', '4'))
+    
     # ===== DESCRIPCIÓN DE CONTEXTOS =====
     CONTEXTOS_DESCRIPCIONES = {
         'MentorAcademico': {
@@ -84,6 +220,20 @@ class Config:
     AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
     AWS_ACCOUNT_ID = os.getenv('AWS_ACCOUNT_ID')
     
+    # Conexión DynamoDB única del proceso (dao/conexion.py). El pool admite a
+    # la vez el scan paralelo y los hilos de la compactación, que son los que
+    # más conexiones abren (la carga de un contexto usa CONTEXTO_MAX_WORKERS)
+    DYNAMODB_MAX_POOL_CONNECTIONS = int(os.getenv(
+        'DYNAMODB_MAX_POOL_CONNECTIONS',
+        str(max(CONTEXTO_MAX_WORKERS, SCAN_PARALELO_SEGMENTOS + MEMORIA_MAX_WORKERS))
+    ))
+    DYNAMODB_CONNECT_TIMEOUT = float(os.getenv('DYNAMODB_CONNECT_TIMEOUT', '2'))
+    DYNAMODB_READ_TIMEOUT = float(os.getenv('DYNAMODB_READ_TIMEOUT', '5'))
+    # Intentos totales por llamada; el modo adaptativo frena ante throttling
+    DYNAMODB_MAX_INTENTOS = int(os.getenv('DYNAMODB_MAX_INTENTOS', '5'))
+    # Endpoint alternativo (DynamoDB Local); vacío para el de AWS
+    DYNAMODB_ENDPOINT = os.getenv('DYNAMODB_ENDPOINT') or None
+    
     # ===== ORGANIZATION =====
     ORG_NAME = os.getenv('ORG_NAME', 'Tecsup')
     
@@ -132,4 +282,30 @@ class Config:
         Returns:
             Lista de nombres de tablas
         """
-        return cls.CONTEXTO_TABLAS_MAP.get(nombre_contexto, [])
\ No newline at end of file
+        return cls.CONTEXTO_TABLAS_MAP.get(nombre_contexto, [])
+    
+    @classmethod
+    def get_retencion_historial(cls, nombre_contexto: str) -> int:
+        """
+        Obtiene los días de retención del historial de un contexto
+        
+        Args:
+            nombre_contexto: Nombre del contexto
+        
+        Returns:
+            Días de retención (0 = sin expiración)
+        """
+        return cls.HISTORIAL_RETENCION_DIAS_POR_CONTEXTO.get(nombre_contexto, cls.HISTORIAL_RETENCION_DIAS)
+    
+    @classmethod
+    def get_estrategia_resumen(cls, nombre_contexto: str) -> str:
+        """
+        Obtiene la estrategia de resumen de historial de un contexto
+        
+        Args:
+            nombre_contexto: Nombre del contexto
+        
+        Returns:
+            'extractivo' o 'llm'
+        """
+        return cls.RESUMEN_ESTRATEGIA_POR_CONTEXTO.get(nombre_contexto, cls.RESUMEN_ESTRATEGIA)
\ No newline at end of file
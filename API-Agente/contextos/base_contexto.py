@@ -4,12 +4,21 @@ Clase base abstracta para todos los contextos del agente académico
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional
 from dao.base import DAOFactory
+from dao.contexto_solicitud import ContextoSolicitud
+from config import Config
+from .cargador_datos import CargadorDatosContexto
 
 
 class BaseContexto(ABC):
     """Clase base para procesadores de contexto académico"""
     
-    def __init__(self):
+    # Nombre del contexto en Config.CONTEXTO_TABLAS_MAP
+    NOMBRE: str = ''
+    
+    def __init__(self, contexto_solicitud: Optional[ContextoSolicitud] = None):
+        # Contexto de la solicitud: memoiza las lecturas de los DAOs
+        self.contexto_solicitud = contexto_solicitud or ContextoSolicitud()
+        
         # Inicializar DAOs necesarios
         self.usuarios_dao = DAOFactory.get_dao('usuarios')
         self.historial_dao = DAOFactory.get_dao('historial')
@@ -24,18 +33,21 @@ class BaseContexto(ABC):
         """
         pass
     
-    @abstractmethod
     def build_context_data(self, correo: str) -> Dict:
         """
         Construye el diccionario de datos del contexto
         
+        Las tablas se toman de Config.CONTEXTO_TABLAS_MAP[NOMBRE] y se leen
+        en paralelo.
+        
         Args:
             correo: Email del usuario
         
         Returns:
             Diccionario con todos los datos necesarios para el contexto
         """
-        pass
+        cargador = CargadorDatosContexto(contexto_solicitud=self.contexto_solicitud)
+        return cargador.cargar(correo, self.NOMBRE)
     
     @abstractmethod
     def get_system_prompt(self) -> str:
@@ -105,12 +117,28 @@ Autorización de datos: {usuario.get('autorizacion', False)}
 """
     
     def _formatear_historial(self, historial: List[Dict]) -> str:
-        """Formatea el historial de interacciones"""
+        """
+        Formatea el historial de interacciones: la memoria consolidada de las
+        interacciones antiguas (tamaño acotado) y las últimas 5, o las
+        TOP_K más relevantes ya seleccionadas con la recuperación por
+        relevancia (services/recuperacion_historial.py)
+        """
         if not historial:
             return "No hay interacciones previas registradas."
         
-        historial_formateado = []
-        for idx, item in enumerate(historial[:5], 1):  # Últimas 5 interacciones
+        memorias = [item for item in historial if item.get('tipo') == 'memoria']
+        recientes = [item for item in historial if item.get('tipo') != 'memoria']
+        limite = (
+            Config.HISTORIAL_RECUPERACION_TOP_K
+            if Config.HISTORIAL_RECUPERACION_HABILITADA
+            else 5
+        )
+        
+        historial_formateado = [
+            f"Memoria de interacciones anteriores: {memoria.get('texto', '')}"
+            for memoria in memorias
+        ]
+        for idx, item in enumerate(recientes[:limite], 1):
             texto = item.get('texto', 'Sin contenido')
             historial_formateado.append(f"{idx}. {texto[:150]}...")
         
@@ -138,10 +166,15 @@ Autorización de datos: {usuario.get('autorizacion', False)}
             correo: Email del usuario
         
         Returns:
-            Diccionario con usuario e historial
-        """
-        usuario = self.usuarios_dao.get_usuario_por_correo(correo)
-        historial = self.historial_dao.get_historial_usuario(correo) if usuario else []
+            Diccionario con usuario e historial (memoria consolidada del
+            contexto más las últimas interacciones)
+        """
+        with self.contexto_solicitud:
+            usuario = self.usuarios_dao.get_usuario_por_correo(correo)
+            historial = (
+                self.historial_dao.get_historial_contexto(usuario.get('id'), self.NOMBRE)
+                if usuario else []
+            )
         
         return {
             'usuario': usuario,
@@ -182,12 +215,17 @@ class ContextoFactory:
             }
     
     @classmethod
-    def get_contexto(cls, nombre_contexto: str) -> BaseContexto:
+    def get_contexto(
+        cls,
+        nombre_contexto: str,
+        contexto_solicitud: Optional[ContextoSolicitud] = None
+    ) -> BaseContexto:
         """
         Obtiene una instancia del contexto solicitado
         
         Args:
             nombre_contexto: Nombre del contexto
+            contexto_solicitud: Contexto de la solicitud en curso (memoiza lecturas)
         
         Returns:
             Instancia del contexto
@@ -203,7 +241,7 @@ class ContextoFactory:
                 f"Contextos disponibles: {list(cls._contextos.keys())}"
             )
         
-        return cls._contextos[nombre_contexto]()
+        return cls._contextos[nombre_contexto](contexto_solicitud=contexto_solicitud)
     
     @classmethod
     def get_contextos_disponibles(cls) -> List[str]:
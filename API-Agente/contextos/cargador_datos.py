@@ -0,0 +1,142 @@
+"""
+Cargador declarativo de los datos de un contexto
+
+Lee Config.CONTEXTO_TABLAS_MAP para saber qué tablas necesita cada contexto y
+las consulta en paralelo, en lugar de encadenar un round-trip a DynamoDB por
+tabla antes de llamar a Gemini.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from dao.base import DAOFactory
+from dao.contexto_solicitud import ContextoSolicitud
+from config import Config
+
+
+# Pool compartido entre invocaciones del contenedor (crear hilos por solicitud
+# costaría más que las propias lecturas)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Crea el pool de hilos la primera vez que se necesita (seguro entre hilos)"""
+    global _executor
+    if _executor is not None:
+        return _executor
+
+    # Doble verificación: solo un hilo crea el pool
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=Config.CONTEXTO_MAX_WORKERS,
+                thread_name_prefix='cargador-contexto'
+            )
+        return _executor
+
+
+class CargadorDatosContexto:
+    """Carga en paralelo las tablas declaradas para un contexto"""
+
+    def __init__(self, contexto_solicitud: Optional[ContextoSolicitud] = None):
+        """
+        Args:
+            contexto_solicitud: Contexto de la solicitud en curso (memoiza lecturas)
+        """
+        self.contexto_solicitud = contexto_solicitud or ContextoSolicitud()
+        self.usuarios_dao = DAOFactory.get_dao('usuarios')
+
+    def get_lecturas(self, nombre_contexto: str) -> List[Dict[str, Any]]:
+        """
+        Traduce las tablas declaradas para un contexto a lecturas de DAO
+
+        Args:
+            nombre_contexto: Nombre del contexto
+
+        Returns:
+            Lista de lecturas ({'dao', 'metodo', 'clave'[, 'por_contexto']})
+            a ejecutar por usuarioId
+        """
+        lecturas = []
+        for tabla in Config.get_tablas_por_contexto(nombre_contexto):
+            if tabla == Config.TABLE_USUARIOS:
+                continue
+
+            lectura = Config.TABLA_DAO_MAP.get(tabla)
+            if lectura is None:
+                print(f"⚠️ Tabla {tabla} sin lectura configurada en TABLA_DAO_MAP")
+                continue
+            lecturas.append(lectura)
+        return lecturas
+
+    def cargar(self, correo: str, nombre_contexto: str) -> Dict:
+        """
+        Carga usuario, historial y datos específicos de un contexto
+
+        El usuario se lee primero (de él sale el usuarioId); el resto de tablas
+        se leen a la vez.
+
+        Args:
+            correo: Email del usuario
+            nombre_contexto: Nombre del contexto
+
+        Returns:
+            Diccionario con 'usuario', 'historial' y una clave por tabla del
+            contexto (p. ej. 'datos_academicos', 'tareas')
+        """
+        with self.contexto_solicitud:
+            usuario = self.usuarios_dao.get_usuario_por_correo(correo)
+            if not usuario:
+                return {'usuario': None, 'historial': []}
+
+            usuario_id = usuario.get('id')
+            lecturas = self.get_lecturas(nombre_contexto)
+            inicio = time.perf_counter()
+
+            # Cada tarea corre en una copia del contexto actual para que los
+            # hilos vean el ContextoSolicitud activo
+            executor = _get_executor()
+            futuros = {
+                lectura['clave']: executor.submit(
+                    contextvars.copy_context().run,
+                    self._leer_tabla,
+                    lectura,
+                    usuario_id,
+                    nombre_contexto
+                )
+                for lectura in lecturas
+            }
+
+            datos = {'usuario': usuario, 'historial': []}
+            for clave, futuro in futuros.items():
+                datos[clave] = futuro.result()
+
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        print(f"⚡ {len(lecturas)} tablas de {nombre_contexto} cargadas en paralelo en {duracion_ms:.1f} ms")
+        return datos
+
+    @staticmethod
+    def _leer_tabla(lectura: Dict[str, Any], usuario_id: str, nombre_contexto: str):
+        """
+        Ejecuta la lectura de una tabla para un usuario
+
+        Args:
+            lectura: Descripción de la lectura ({'dao', 'metodo', 'clave'[, 'por_contexto']})
+            usuario_id: ID del usuario
+            nombre_contexto: Nombre del contexto (para las lecturas 'por_contexto')
+
+        Returns:
+            Resultado del método del DAO, o None si falla
+        """
+        try:
+            dao = DAOFactory.get_dao(lectura['dao'])
+            metodo = getattr(dao, lectura['metodo'])
+            if lectura.get('por_contexto'):
+                return metodo(usuario_id, nombre_contexto)
+            return metodo(usuario_id)
+        except Exception as e:
+            print(f"❌ Error cargando {lectura['clave']}: {str(e)}")
+            return None
\ No newline at end of file
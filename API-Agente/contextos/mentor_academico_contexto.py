@@ -3,7 +3,6 @@ Contexto para el Mentor Académico
 """
 from typing import Dict, List
 from .base_contexto import BaseContexto
-from dao.base import DAOFactory
 
 
 class MentorAcademicoContexto(BaseContexto):
@@ -18,36 +17,11 @@ class MentorAcademicoContexto(BaseContexto):
     - Tarea (pendientes, assignments)
     """
     
-    def __init__(self):
-        super().__init__()
-        self.datos_academicos_dao = DAOFactory.get_dao('datos_academicos')
-        self.tareas_dao = DAOFactory.get_dao('tareas')
+    NOMBRE = 'MentorAcademico'
     
     def get_tablas_requeridas(self) -> List[str]:
         return ['usuarios', 'datos_academicos', 'historial', 'tareas']
     
-    def build_context_data(self, correo: str) -> Dict:
-        """Construye datos para contexto de mentor académico"""
-        datos_base = self.cargar_datos_base(correo)
-        usuario = datos_base.get('usuario')
-        
-        if not usuario:
-            return datos_base
-        
-        usuario_id = usuario.get('id')
-        
-        # Cargar datos académicos
-        datos_academicos = self.datos_academicos_dao.get_datos_por_usuario(usuario_id)
-        
-        # Cargar tareas pendientes
-        tareas = self.tareas_dao.get_tareas_por_usuario(usuario_id)
-        
-        return {
-            **datos_base,
-            'datos_academicos': datos_academicos,
-            'tareas': tareas
-        }
-    
     def get_system_prompt(self) -> str:
         return """
 Eres un Mentor Académico especializado en ayudar a estudiantes a mejorar su desempeño académico.
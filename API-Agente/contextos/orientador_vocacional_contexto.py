@@ -3,7 +3,6 @@ Contexto para el Orientador Vocacional
 """
 from typing import Dict, List
 from .base_contexto import BaseContexto
-from dao.base import DAOFactory
 
 
 class OrientadorVocacionalContexto(BaseContexto):
@@ -19,36 +18,11 @@ class OrientadorVocacionalContexto(BaseContexto):
     - Historial (versión resumida de intervenciones previas)
     """
     
-    def __init__(self):
-        super().__init__()
-        self.datos_academicos_dao = DAOFactory.get_dao('datos_academicos')
-        self.datos_socioeconomicos_dao = DAOFactory.get_dao('datos_socioeconomicos')
+    NOMBRE = 'OrientadorVocacional'
     
     def get_tablas_requeridas(self) -> List[str]:
         return ['usuarios', 'datos_academicos', 'datos_socioeconomicos', 'historial']
     
-    def build_context_data(self, correo: str) -> Dict:
-        """Construye datos para contexto de orientador vocacional"""
-        datos_base = self.cargar_datos_base(correo)
-        usuario = datos_base.get('usuario')
-        
-        if not usuario:
-            return datos_base
-        
-        usuario_id = usuario.get('id')
-        
-        # Cargar datos académicos (enfoque en carrera y rendimiento general)
-        datos_academicos = self.datos_academicos_dao.get_datos_por_usuario(usuario_id)
-        
-        # Cargar datos socioeconómicos
-        datos_socioeconomicos = self.datos_socioeconomicos_dao.get_datos_por_usuario(usuario_id)
-        
-        return {
-            **datos_base,
-            'datos_academicos': datos_academicos,
-            'datos_socioeconomicos': datos_socioeconomicos
-        }
-    
     def get_system_prompt(self) -> str:
         return """
 Eres un Orientador Vocacional especializado en ayudar a estudiantes a descubrir 
@@ -3,7 +3,6 @@ Contexto para el Especialista en Psicología
 """
 from typing import Dict, List
 from .base_contexto import BaseContexto
-from dao.base import DAOFactory
 
 
 class PsicologoContexto(BaseContexto):
@@ -19,11 +18,7 @@ class PsicologoContexto(BaseContexto):
     - Historial (completo)
     """
     
-    def __init__(self):
-        super().__init__()
-        self.datos_academicos_dao = DAOFactory.get_dao('datos_academicos')
-        self.datos_emocionales_dao = DAOFactory.get_dao('datos_emocionales')
-        self.datos_socioeconomicos_dao = DAOFactory.get_dao('datos_socioeconomicos')
+    NOMBRE = 'Psicologo'
     
     def get_tablas_requeridas(self) -> List[str]:
         return [
@@ -34,28 +29,6 @@ class PsicologoContexto(BaseContexto):
             'historial'
         ]
     
-    def build_context_data(self, correo: str) -> Dict:
-        """Construye datos para contexto de psicólogo"""
-        datos_base = self.cargar_datos_base(correo)
-        usuario = datos_base.get('usuario')
-        
-        if not usuario:
-            return datos_base
-        
-        usuario_id = usuario.get('id')
-        
-        # Cargar todos los datos relevantes para apoyo emocional
-        datos_academicos = self.datos_academicos_dao.get_datos_por_usuario(usuario_id)
-        datos_emocionales = self.datos_emocionales_dao.get_datos_por_usuario(usuario_id)
-        datos_socioeconomicos = self.datos_socioeconomicos_dao.get_datos_por_usuario(usuario_id)
-        
-        return {
-            **datos_base,
-            'datos_academicos': datos_academicos,
-            'datos_emocionales': datos_emocionales,
-            'datos_socioeconomicos': datos_socioeconomicos
-        }
-    
     def get_system_prompt(self) -> str:
         return """
 Eres un Especialista en Psicología enfocado en el bienestar emocional de estudiantes universitarios.
@@ -1,20 +1,55 @@
 """
 Clase base para todos los DAOs con operaciones comunes de DynamoDB
 """
-import boto3
-from typing import Dict, List, Optional, Any
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
 from decimal import Decimal
 import json
+import threading
+
+from .cache import CacheTTL
+from .conexion import get_dynamodb
+from .contexto_solicitud import ContextoSolicitud
+from config import Config
+
+
+# Errores de un Query sobre un índice que aún no existe (tabla sin migrar):
+# los únicos que justifican un scan de respaldo
+ERRORES_INDICE_FALTANTE = ('ValidationException', 'ResourceNotFoundException')
 
 
 class BaseDAO:
     """Clase base para acceso a datos en DynamoDB"""
     
+    # Los DAOs de registros que cambian poco lo activan para mantener un caché
+    # TTL/LRU que sobrevive entre invocaciones del contenedor Lambda
+    USA_CACHE = False
+    # Cachear también "no existe" (None); se invalida igual al escribir el registro
+    CACHE_AUSENCIAS = True
+    
     def __init__(self, table_name: str):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.table = self.dynamodb.Table(table_name)
+        # Recurso y pool de conexiones compartidos por todos los DAOs. Los
+        # DAOs son singletons que se usan desde varios hilos (carga de
+        # contextos, limpieza, compactación): todas las operaciones van por el
+        # cliente de bajo nivel, seguro entre hilos, y nunca por un Table
+        self.dynamodb = get_dynamodb()
+        self.cliente = self.dynamodb.meta.client
         self.table_name = table_name
+        self.cache: Optional[CacheTTL] = None
+        # Esquema de claves (DescribeTable en el primer uso, bajo lock)
+        self._key_schema: Optional[List[Dict]] = None
+        self._key_schema_lock = threading.Lock()
+        
+        if self.USA_CACHE and Config.CACHE_HABILITADO:
+            self.cache = CacheTTL(
+                table_name,
+                ttl_segundos=Config.CACHE_TTL_SEGUNDOS,
+                max_entradas=Config.CACHE_MAX_ENTRADAS
+            )
     
     def get_by_key(self, partition_key: str, sort_key: Optional[str] = None) -> Optional[Dict]:
         """
@@ -37,12 +72,77 @@ class BaseDAO:
                 sort_name = self._get_sort_key_name()
                 key[sort_name] = sort_key
             
-            response = self.table.get_item(Key=key)
+            response = self.cliente.get_item(TableName=self.table_name, Key=key)
             return self._decimal_to_float(response.get('Item'))
         except Exception as e:
             print(f"Error en get_by_key: {str(e)}")
             return None
     
+    def iter_partition(
+        self,
+        partition_value: str,
+        sort_key_condition: Optional[Any] = None,
+        scan_index_forward: bool = True,
+        page_size: Optional[int] = None,
+        projection: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Recorre una partición siguiendo LastEvaluatedKey página por página, a
+        medida que se consume (solo la página actual vive en memoria)
+        
+        Args:
+            partition_value: Valor de la partition key
+            sort_key_condition: Condición adicional para sort key
+            scan_index_forward: True para orden ascendente, False para descendente
+            page_size: Registros por llamada a DynamoDB (None: hasta 1 MB)
+            projection: Atributos a leer (None para todos)
+            limit: Máximo de registros a entregar; con él no se piden más
+                   registros de los necesarios
+        
+        Yields:
+            Registros de la partición en el orden de la sort key
+        
+        Raises:
+            Exception: Si una página falla (los registros ya entregados quedan
+                       entregados)
+        """
+        key_name = self._get_partition_key_name()
+        key_condition = Key(key_name).eq(partition_value)
+        
+        if sort_key_condition:
+            key_condition = key_condition & sort_key_condition
+        
+        query_params = {
+            'TableName': self.table_name,
+            'KeyConditionExpression': key_condition,
+            'ScanIndexForward': scan_index_forward
+        }
+        
+        if projection:
+            # Prefijo #p para no chocar con los #n que genera boto3 en la condición
+            nombres = {f'#p{i}': campo for i, campo in enumerate(projection)}
+            query_params['ProjectionExpression'] = ', '.join(nombres)
+            query_params['ExpressionAttributeNames'] = nombres
+        
+        entregados = 0
+        while True:
+            tamano = page_size
+            if limit:
+                restantes = limit - entregados
+                tamano = min(tamano, restantes) if tamano else restantes
+            if tamano:
+                query_params['Limit'] = tamano
+            
+            response = self.cliente.query(**query_params)
+            for item in response.get('Items', []):
+                yield self._decimal_to_float(item)
+                entregados += 1
+            
+            if 'LastEvaluatedKey' not in response or (limit and entregados >= limit):
+                return
+            query_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
     def query_by_partition(
         self, 
         partition_value: str, 
@@ -51,7 +151,8 @@ class BaseDAO:
         scan_index_forward: bool = True
     ) -> List[Dict]:
         """
-        Query por partition key con opciones adicionales
+        Query por partition key con opciones adicionales (todas las páginas
+        hasta completar limit; para particiones grandes, iterar iter_partition)
         
         Args:
             partition_value: Valor de la partition key
@@ -63,29 +164,82 @@ class BaseDAO:
             Lista de registros
         """
         try:
-            key_name = self._get_partition_key_name()
-            key_condition = Key(key_name).eq(partition_value)
-            
-            if sort_key_condition:
-                key_condition = key_condition & sort_key_condition
-            
-            query_params = {
-                'KeyConditionExpression': key_condition,
-                'ScanIndexForward': scan_index_forward
-            }
-            
-            if limit:
-                query_params['Limit'] = limit
-            
-            response = self.table.query(**query_params)
-            return [self._decimal_to_float(item) for item in response.get('Items', [])]
+            return list(self.iter_partition(
+                partition_value,
+                sort_key_condition=sort_key_condition,
+                scan_index_forward=scan_index_forward,
+                limit=limit
+            ))
         except Exception as e:
             print(f"Error en query_by_partition: {str(e)}")
             return []
     
+    def query_index(
+        self,
+        index_name: str,
+        key_name: str,
+        key_value: Any,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Query sobre un índice secundario global por su partition key
+        
+        Args:
+            index_name: Nombre del GSI
+            key_name: Nombre del atributo partition key del índice
+            key_value: Valor a buscar
+            limit: Límite de registros a retornar
+        
+        Returns:
+            Lista de registros
+        
+        Raises:
+            ClientError: Si el índice no existe o la consulta falla (permite
+                         que el DAO específico decida su fallback)
+        """
+        query_params = {
+            'TableName': self.table_name,
+            'IndexName': index_name,
+            'KeyConditionExpression': Key(key_name).eq(key_value)
+        }
+        
+        if limit:
+            query_params['Limit'] = limit
+        
+        response = self.cliente.query(**query_params)
+        return [self._decimal_to_float(item) for item in response.get('Items', [])]
+    
+    def scan_first(self, filter_expression: Any) -> Optional[Dict]:
+        """
+        Escanea la tabla página por página hasta encontrar el primer registro
+        que cumpla el filtro (sin Limit, que DynamoDB aplica antes del filtro)
+        
+        Args:
+            filter_expression: Expresión de filtro
+        
+        Returns:
+            Primer registro encontrado o None
+        """
+        try:
+            scan_params = {'TableName': self.table_name, 'FilterExpression': filter_expression}
+            
+            while True:
+                response = self.cliente.scan(**scan_params)
+                items = response.get('Items', [])
+                if items:
+                    return self._decimal_to_float(items[0])
+                
+                if 'LastEvaluatedKey' not in response:
+                    return None
+                scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        except Exception as e:
+            print(f"Error en scan_first: {str(e)}")
+            return None
+    
     def scan_all(self, limit: Optional[int] = None, filter_expression: Optional[Any] = None) -> List[Dict]:
         """
-        Escanea toda la tabla (usar con cuidado)
+        Escanea toda la tabla (usar con cuidado; para no cargarla entera en
+        memoria, iterar parallel_scan)
         
         Args:
             limit: Límite de registros
@@ -95,21 +249,22 @@ class BaseDAO:
             Lista de registros
         """
         try:
-            scan_params = {}
+            if not limit:
+                # Tabla completa: segmentos en paralelo
+                return list(self.parallel_scan(filter_expression=filter_expression))
             
-            if limit:
-                scan_params['Limit'] = limit
+            scan_params = {'TableName': self.table_name, 'Limit': limit}
             
             if filter_expression:
                 scan_params['FilterExpression'] = filter_expression
             
-            response = self.table.scan(**scan_params)
+            response = self.cliente.scan(**scan_params)
             items = response.get('Items', [])
             
             # Manejar paginación si hay más items
             while 'LastEvaluatedKey' in response and (not limit or len(items) < limit):
                 scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
-                response = self.table.scan(**scan_params)
+                response = self.cliente.scan(**scan_params)
                 items.extend(response.get('Items', []))
             
             return [self._decimal_to_float(item) for item in items]
@@ -117,6 +272,133 @@ class BaseDAO:
             print(f"Error en scan_all: {str(e)}")
             return []
     
+    def parallel_scan(
+        self,
+        total_segments: Optional[int] = None,
+        projection: Optional[List[str]] = None,
+        filter_expression: Optional[Any] = None,
+        estadisticas: Optional[Dict] = None
+    ) -> Iterator[Dict]:
+        """
+        Scan segmentado (Segment/TotalSegments) con un hilo por segmento que
+        entrega los registros a medida que llegan las páginas, sin acumular
+        la tabla en memoria
+        
+        Cada segmento llama al cliente compartido (seguro entre hilos, como
+        en el resto del DAO). La cola entre hilos y consumidor
+        es acotada: si el consumidor es lento, los segmentos esperan. Al dejar
+        de iterar (break o excepción) los hilos se detienen.
+        
+        Args:
+            total_segments: Segmentos en paralelo (Config.SCAN_PARALELO_SEGMENTOS
+                            por defecto)
+            projection: Atributos a leer (None para todos)
+            filter_expression: Expresión de filtro (boto3.dynamodb.conditions)
+            estadisticas: Diccionario opcional que se completa al terminar con
+                          registros, paginas, escaneados, capacidad_consumida,
+                          segundos y registros_por_segundo
+        
+        Yields:
+            Registros de la tabla (sin orden)
+        
+        Raises:
+            Exception: El error del segmento que falló (a diferencia de scan_all,
+                       un resultado parcial no pasa por la tabla completa)
+        """
+        segmentos = max(1, total_segments or Config.SCAN_PARALELO_SEGMENTOS)
+        cliente = self.cliente
+        
+        scan_params = {
+            'TableName': self.table_name,
+            'TotalSegments': segmentos,
+            'ReturnConsumedCapacity': 'TOTAL'
+        }
+        if projection:
+            # Prefijo #p para no chocar con los #n que genera boto3 en el filtro
+            nombres = {f'#p{i}': campo for i, campo in enumerate(projection)}
+            scan_params['ProjectionExpression'] = ', '.join(nombres)
+            scan_params['ExpressionAttributeNames'] = nombres
+        if filter_expression is not None:
+            scan_params['FilterExpression'] = filter_expression
+        
+        cola: queue.Queue = queue.Queue(maxsize=segmentos * 2)
+        detener = threading.Event()
+        fin_segmento = object()
+        contadores = {'paginas': 0, 'escaneados': 0, 'capacidad_consumida': 0.0}
+        lock = threading.Lock()
+        
+        def entregar(valor: Any) -> bool:
+            while not detener.is_set():
+                try:
+                    cola.put(valor, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def escanear_segmento(segmento: int):
+            params = dict(scan_params, Segment=segmento)
+            try:
+                while not detener.is_set():
+                    response = cliente.scan(**params)
+                    with lock:
+                        contadores['paginas'] += 1
+                        contadores['escaneados'] += response.get('ScannedCount', 0)
+                        contadores['capacidad_consumida'] += response.get(
+                            'ConsumedCapacity', {}
+                        ).get('CapacityUnits', 0.0)
+                    if response.get('Items') and not entregar(response['Items']):
+                        return
+                    if 'LastEvaluatedKey' not in response:
+                        return
+                    params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            except Exception as e:
+                entregar(e)
+            finally:
+                entregar(fin_segmento)
+        
+        executor = ThreadPoolExecutor(max_workers=segmentos, thread_name_prefix=f'scan-{self.table_name}')
+        inicio = time.perf_counter()
+        registros = 0
+        completo = False
+        try:
+            for segmento in range(segmentos):
+                executor.submit(escanear_segmento, segmento)
+            
+            pendientes = segmentos
+            while pendientes:
+                valor = cola.get()
+                if valor is fin_segmento:
+                    pendientes -= 1
+                    continue
+                if isinstance(valor, Exception):
+                    raise valor
+                for item in valor:
+                    registros += 1
+                    yield self._decimal_to_float(item)
+            completo = True
+        finally:
+            detener.set()
+            executor.shutdown(wait=False)
+            
+            segundos = time.perf_counter() - inicio
+            resumen = dict(
+                contadores,
+                registros=registros,
+                segmentos=segmentos,
+                segundos=round(segundos, 3),
+                registros_por_segundo=round(registros / segundos, 1) if segundos > 0 else 0.0,
+                completo=completo
+            )
+            if estadisticas is not None:
+                estadisticas.update(resumen)
+            print(
+                f"📊 parallel_scan {self.table_name}: {registros} registros, "
+                f"{resumen['paginas']} páginas, {resumen['capacidad_consumida']:.1f} RCU "
+                f"en {resumen['segundos']}s ({resumen['registros_por_segundo']} registros/s"
+                f"{'' if completo else ', interrumpido'})"
+            )
+    
     def put_item(self, item: Dict) -> bool:
         """
         Inserta o actualiza un registro
@@ -128,12 +410,77 @@ class BaseDAO:
             True si fue exitoso, False en caso contrario
         """
         try:
-            self.table.put_item(Item=self._float_to_decimal(item))
+            self.cliente.put_item(TableName=self.table_name, Item=self._float_to_decimal(item))
+            self._invalidar_lecturas(item)
             return True
         except Exception as e:
             print(f"Error en put_item: {str(e)}")
             return False
     
+    def update_fields(
+        self,
+        key: Dict,
+        changes: Dict,
+        condition: Optional[Any] = None,
+        return_new: bool = True
+    ) -> Optional[Dict]:
+        """
+        Asigna solo los campos indicados con un UpdateItem (sin leer ni
+        reescribir el registro completo)
+        
+        Args:
+            key: Clave primaria completa del registro
+            changes: Campos a asignar (los de la clave se ignoran)
+            condition: ConditionExpression opcional (p. ej. Attr('id').exists()
+                       para no crear el registro si no existe)
+            return_new: True para retornar el registro actualizado (ALL_NEW)
+        
+        Returns:
+            Registro actualizado (o {} si return_new es False), None si falló
+            o no se cumplió la condición
+        """
+        changes = {campo: valor for campo, valor in changes.items() if campo not in key}
+        if not changes:
+            print("Error en update_fields: no hay campos que actualizar")
+            return None
+        
+        # Prefijos #f/:f para no chocar con los #n/:v que genera boto3 al
+        # serializar una condición de boto3.dynamodb.conditions
+        nombres = {}
+        valores = {}
+        asignaciones = []
+        for i, (campo, valor) in enumerate(changes.items()):
+            nombres[f'#f{i}'] = campo
+            valores[f':f{i}'] = self._float_to_decimal(valor)
+            asignaciones.append(f'#f{i} = :f{i}')
+        
+        update_params = {
+            'TableName': self.table_name,
+            'Key': key,
+            'UpdateExpression': 'SET ' + ', '.join(asignaciones),
+            'ExpressionAttributeNames': nombres,
+            'ExpressionAttributeValues': valores,
+            'ReturnValues': 'ALL_NEW' if return_new else 'NONE'
+        }
+        
+        if condition is not None:
+            update_params['ConditionExpression'] = condition
+        
+        try:
+            response = self.cliente.update_item(**update_params)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                print(f"Condición no cumplida en update_fields sobre {self.table_name}: {key}")
+            else:
+                print(f"Error en update_fields: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"Error en update_fields: {str(e)}")
+            return None
+        
+        self._invalidar_lecturas(key)
+        return self._decimal_to_float(response.get('Attributes', {}))
+    
     def delete_item(self, partition_key: str, sort_key: Optional[str] = None) -> bool:
         """
         Elimina un registro
@@ -153,16 +500,166 @@ class BaseDAO:
                 sort_name = self._get_sort_key_name()
                 key[sort_name] = sort_key
             
-            self.table.delete_item(Key=key)
+            self.cliente.delete_item(TableName=self.table_name, Key=key)
+            self._invalidar_lecturas(key)
             return True
         except Exception as e:
             print(f"Error en delete_item: {str(e)}")
             return False
     
+    def delete_keys(self, keys: Iterable[Dict]) -> int:
+        """
+        Elimina registros por clave con BatchWriteItem (25 claves por llamada)
+        
+        Puede llamarse desde varios hilos a la vez (cliente compartido). Las
+        claves no procesadas (throttling) se
+        reintentan con espera exponencial.
+        
+        Args:
+            keys: Claves primarias completas (p. ej. de una lectura con
+                  proyección de solo claves)
+        
+        Returns:
+            Número de registros eliminados
+        
+        Raises:
+            Exception: Si una llamada falla o quedan claves sin procesar tras
+                       los reintentos
+        """
+        cliente = self.cliente
+        eliminados = 0
+        lote: List[Dict] = []
+        
+        def enviar(solicitudes: List[Dict]) -> int:
+            total = len(solicitudes)
+            espera = 0.05
+            for _ in range(8):
+                response = cliente.batch_write_item(RequestItems={self.table_name: solicitudes})
+                solicitudes = response.get('UnprocessedItems', {}).get(self.table_name, [])
+                if not solicitudes:
+                    return total
+                time.sleep(espera)
+                espera = min(espera * 2, 2.0)
+            raise RuntimeError(f"{len(solicitudes)} claves sin procesar en {self.table_name}")
+        
+        for key in keys:
+            lote.append({'DeleteRequest': {'Key': key}})
+            if len(lote) == 25:
+                eliminados += enviar(lote)
+                lote = []
+        if lote:
+            eliminados += enviar(lote)
+        
+        if eliminados:
+            self._invalidar_lecturas()
+        return eliminados
+    
+    # Memoización por solicitud y caché entre invocaciones
+    def _leer(
+        self,
+        clave: tuple,
+        cargador: Callable[[], Any],
+        usar_cache: bool = True
+    ) -> Any:
+        """
+        Ejecuta una lectura pasando por el ContextoSolicitud activo (si existe)
+        y luego por el caché entre invocaciones del DAO (si lo usa), de modo que
+        la misma tabla/clave se lea una sola vez por invocación y, con el
+        contenedor caliente, ni siquiera eso
+        
+        Args:
+            clave: Identificador hashable de la lectura dentro de la tabla
+            cargador: Función que realiza la lectura real en DynamoDB
+            usar_cache: False para ignorar el caché entre invocaciones (lecturas
+                        previas a una escritura); el valor leído lo refresca
+        
+        Returns:
+            Resultado de la lectura (cacheado, memoizado o recién leído)
+        """
+        contexto = ContextoSolicitud.actual()
+        
+        def cargar() -> Any:
+            if self.cache is not None and usar_cache:
+                encontrado, valor = self.cache.obtener(clave)
+                if encontrado:
+                    if contexto is not None:
+                        contexto.contar_acierto_cache()
+                    return valor
+            
+            valor = cargador()
+            if contexto is not None:
+                contexto.contar_lectura(self.table_name)
+            if self.cache is not None and (valor is not None or self.CACHE_AUSENCIAS):
+                self.cache.guardar(clave, valor)
+            return valor
+        
+        if contexto is None:
+            return cargar()
+        return contexto.obtener(self.table_name, clave, cargar)
+    
+    def _invalidar_lecturas(self, item: Optional[Dict] = None):
+        """
+        Descarta las lecturas memoizadas de esta tabla y las entradas del caché
+        afectadas por la escritura de un registro
+        
+        Args:
+            item: Registro escrito o clave eliminada
+        """
+        contexto = ContextoSolicitud.actual()
+        if contexto is not None:
+            contexto.invalidar(self.table_name)
+        
+        self.invalidar_cache(item)
+    
+    def _claves_cache(self, item: Dict) -> List[tuple]:
+        """
+        Claves de caché que dependen de un registro. Los DAOs con caché la
+        sobrescriben según cómo construyen sus claves en _leer.
+        
+        Args:
+            item: Registro (o clave primaria) escrito/eliminado
+        
+        Returns:
+            Lista de claves a invalidar
+        """
+        return []
+    
+    def invalidar_cache(self, item: Optional[Dict] = None):
+        """
+        Invalida explícitamente el caché del DAO
+        
+        Args:
+            item: Registro cuyas entradas invalidar (None para vaciar el caché)
+        """
+        if self.cache is None:
+            return
+        
+        claves = self._claves_cache(item) if item is not None else []
+        if not claves:
+            # Sin claves conocidas no se puede acotar la invalidación
+            self.cache.limpiar()
+            return
+        for clave in claves:
+            self.cache.invalidar(clave)
+    
     # Métodos auxiliares
+    def _esquema_clave(self) -> List[Dict]:
+        """
+        KeySchema de la tabla, leído con DescribeTable una sola vez por DAO
+        aunque varios hilos lo pidan a la vez en el primer uso
+        """
+        if self._key_schema is not None:
+            return self._key_schema
+        
+        with self._key_schema_lock:
+            if self._key_schema is None:
+                response = self.cliente.describe_table(TableName=self.table_name)
+                self._key_schema = response['Table']['KeySchema']
+            return self._key_schema
+    
     def _get_partition_key_name(self) -> str:
         """Obtiene el nombre de la partition key desde el esquema de la tabla"""
-        key_schema = self.table.key_schema
+        key_schema = self._esquema_clave()
         for key in key_schema:
             if key['KeyType'] == 'HASH':
                 return key['AttributeName']
@@ -170,7 +667,7 @@ class BaseDAO:
     
     def _get_sort_key_name(self) -> Optional[str]:
         """Obtiene el nombre de la sort key si existe"""
-        key_schema = self.table.key_schema
+        key_schema = self._esquema_clave()
         for key in key_schema:
             if key['KeyType'] == 'RANGE':
                 return key['AttributeName']
@@ -182,7 +679,7 @@ class BaseDAO:
     
     def _get_key_schema(self) -> List[str]:
         """Retorna lista de nombres de atributos clave"""
-        return [key['AttributeName'] for key in self.table.key_schema]
+        return [key['AttributeName'] for key in self._esquema_clave()]
     
     @staticmethod
     def _decimal_to_float(obj):
@@ -209,9 +706,10 @@ class BaseDAO:
 
 # ===== FACTORY PARA DAOS =====
 class DAOFactory:
-    """Factory para crear y cachear instancias de DAOs"""
+    """Factory para crear y cachear instancias de DAOs (seguro entre hilos)"""
     
     _instances = {}
+    _lock = threading.Lock()
     
     @classmethod
     def get_dao(cls, dao_type: str):
@@ -220,7 +718,8 @@ class DAOFactory:
         
         Args:
             dao_type: Tipo de DAO ('usuarios', 'datos_academicos', 'datos_emocionales', 
-                                   'datos_socioeconomicos', 'historial', 'tareas')
+                                   'datos_socioeconomicos', 'historial', 'tareas',
+                                   'cache_respuestas')
         
         Returns:
             Instancia del DAO solicitado
@@ -228,19 +727,25 @@ class DAOFactory:
         Raises:
             ValueError: Si el tipo de DAO no existe
         """
-        if dao_type not in cls._instances:
-            # Lazy import para evitar circular dependencies
-            dao_map = cls._get_dao_map()
-            
-            if dao_type not in dao_map:
-                raise ValueError(
-                    f"DAO tipo '{dao_type}' no existe. "
-                    f"DAOs disponibles: {list(dao_map.keys())}"
-                )
-            
-            cls._instances[dao_type] = dao_map[dao_type]()
+        instancia = cls._instances.get(dao_type)
+        if instancia is not None:
+            return instancia
         
-        return cls._instances[dao_type]
+        # Doble verificación: solo un hilo crea cada DAO (y su caché)
+        with cls._lock:
+            if dao_type not in cls._instances:
+                # Lazy import para evitar circular dependencies
+                dao_map = cls._get_dao_map()
+                
+                if dao_type not in dao_map:
+                    raise ValueError(
+                        f"DAO tipo '{dao_type}' no existe. "
+                        f"DAOs disponibles: {list(dao_map.keys())}"
+                    )
+                
+                cls._instances[dao_type] = dao_map[dao_type]()
+            
+            return cls._instances[dao_type]
     
     @classmethod
     def _get_dao_map(cls):
@@ -254,6 +759,7 @@ class DAOFactory:
         from dao.datos_socioeconomicos_dao import DatosSocioeconomicosDAO
         from dao.historial_dao import HistorialDAO
         from dao.tareas_dao import TareasDAO
+        from dao.cache_respuestas_dao import CacheRespuestasDAO
         
         return {
             'usuarios': UsuariosDAO,
@@ -261,13 +767,29 @@ class DAOFactory:
             'datos_emocionales': DatosEmocionalesDAO,
             'datos_socioeconomicos': DatosSocioeconomicosDAO,
             'historial': HistorialDAO,
-            'tareas': TareasDAO
+            'tareas': TareasDAO,
+            'cache_respuestas': CacheRespuestasDAO
         }
     
     @classmethod
     def clear_cache(cls):
         """Limpia el caché de instancias (útil para testing)"""
-        cls._instances = {}
+        with cls._lock:
+            cls._instances = {}
+    
+    @classmethod
+    def get_cache_stats(cls) -> List[Dict]:
+        """
+        Contadores de los cachés de los DAOs instanciados (para métricas)
+        
+        Returns:
+            Lista con las estadísticas de cada caché activo
+        """
+        return [
+            dao.cache.estadisticas()
+            for dao in list(cls._instances.values())
+            if dao.cache is not None
+        ]
     
     @classmethod
     def get_available_daos(cls) -> List[str]:
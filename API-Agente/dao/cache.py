@@ -0,0 +1,118 @@
+"""
+Caché en memoria con TTL y desalojo LRU para registros de DynamoDB
+
+Vive a nivel de proceso, por lo que sobrevive entre invocaciones de un mismo
+contenedor Lambda "caliente".
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class CacheTTL:
+    """Caché acotado por número de entradas y tiempo de vida"""
+
+    def __init__(self, nombre: str, ttl_segundos: float, max_entradas: int):
+        """
+        Args:
+            nombre: Nombre del caché (para métricas)
+            ttl_segundos: Tiempo de vida de cada entrada
+            max_entradas: Número máximo de entradas antes de desalojar (LRU)
+        """
+        self.nombre = nombre
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._entradas: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expirados = 0
+        self.desalojos = 0
+        self.invalidaciones = 0
+
+    def obtener(self, clave: Hashable) -> Tuple[bool, Any]:
+        """
+        Busca una entrada vigente
+
+        Args:
+            clave: Clave de la entrada
+
+        Returns:
+            Tupla (encontrado, valor). El valor es una copia, de modo que el
+            llamador puede modificarlo sin alterar el caché.
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return False, None
+
+            expira, valor = entrada
+            if expira <= ahora:
+                del self._entradas[clave]
+                self.expirados += 1
+                self.fallos += 1
+                return False, None
+
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+        return True, copy.deepcopy(valor)
+
+    def guardar(self, clave: Hashable, valor: Any, ttl_segundos: Optional[float] = None):
+        """
+        Guarda una entrada, desalojando la menos usada si se supera el límite
+
+        Args:
+            clave: Clave de la entrada
+            valor: Valor a guardar (se guarda una copia)
+            ttl_segundos: Vida restante del valor en su origen; acota el TTL
+                          del caché (None: el TTL del caché)
+        """
+        ttl = self.ttl_segundos if ttl_segundos is None else min(self.ttl_segundos, ttl_segundos)
+        if ttl <= 0 or self.max_entradas <= 0:
+            return
+
+        entrada = (time.monotonic() + ttl, copy.deepcopy(valor))
+        with self._lock:
+            self._entradas[clave] = entrada
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+
+    def invalidar(self, clave: Hashable):
+        """Elimina una entrada del caché (tras una escritura)"""
+        with self._lock:
+            if self._entradas.pop(clave, None) is not None:
+                self.invalidaciones += 1
+
+    def limpiar(self):
+        """Vacía el caché por completo"""
+        with self._lock:
+            self.invalidaciones += len(self._entradas)
+            self._entradas.clear()
+
+    def estadisticas(self) -> Dict:
+        """
+        Contadores del caché para métricas
+
+        Returns:
+            Diccionario con aciertos, fallos, tasa de aciertos y tamaño
+        """
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'cache': self.nombre,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0.0,
+                'expirados': self.expirados,
+                'desalojos': self.desalojos,
+                'invalidaciones': self.invalidaciones,
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'ttl_segundos': self.ttl_segundos
+            }
\ No newline at end of file
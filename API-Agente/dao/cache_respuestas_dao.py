@@ -0,0 +1,76 @@
+"""
+DAO para la tabla de caché de respuestas del agente
+"""
+import time
+from typing import Dict, Optional
+from .base import BaseDAO
+from config import Config
+
+
+class CacheRespuestasDAO(BaseDAO):
+    """DAO para la tabla de respuestas cacheadas (TTL nativo sobre 'expira')"""
+
+    def __init__(self):
+        super().__init__(Config.TABLE_CACHE_RESPUESTAS)
+
+    def get_entrada(self, clave: str) -> Optional[Dict]:
+        """
+        Obtiene una respuesta cacheada vigente
+
+        El TTL de DynamoDB borra los ítems vencidos con retraso, así que
+        también se descarta aquí cualquier entrada con 'expira' en el pasado.
+
+        Args:
+            clave: Hash de la consulta
+
+        Returns:
+            Diccionario con la entrada o None
+        """
+        entrada = self.get_by_key(clave)
+        if not entrada or entrada.get('expira', 0) <= time.time():
+            return None
+        return entrada
+
+    def guardar_entrada(self, entrada: Dict) -> bool:
+        """
+        Guarda una respuesta en la caché
+
+        Args:
+            entrada: Diccionario con clave, contexto, respuesta, latencia_ms,
+                     creado y expira (epoch en segundos)
+
+        Returns:
+            True si fue exitoso
+        """
+        campos_requeridos = ['clave', 'contexto', 'respuesta', 'latencia_ms', 'creado', 'expira']
+        for campo in campos_requeridos:
+            if campo not in entrada:
+                print(f"Error: Campo requerido '{campo}' faltante en caché de respuestas")
+                return False
+
+        return self.put_item(entrada)
+
+    def registrar_acierto(self, clave: str, cantidad: int = 1) -> bool:
+        """
+        Incrementa el contador de aciertos de una entrada
+        (aciertos × latencia_ms = tiempo de generación ahorrado)
+
+        Args:
+            clave: Hash de la consulta
+            cantidad: Aciertos acumulados en el contenedor desde el último volcado
+
+        Returns:
+            True si fue exitoso
+        """
+        try:
+            self.cliente.update_item(
+                TableName=self.table_name,
+                Key={'clave': clave},
+                UpdateExpression='ADD aciertos :uno',
+                ConditionExpression='attribute_exists(clave)',
+                ExpressionAttributeValues={':uno': cantidad}
+            )
+            return True
+        except Exception as e:
+            print(f"Error registrando acierto de caché: {str(e)}")
+            return False
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Conexión DynamoDB compartida por todos los DAOs del proceso
+
+Crear un recurso de boto3 por DAO costaba en cada arranque en frío una
+sesión, la carga de los modelos del servicio y un pool HTTP por tabla (una
+consulta del Psicólogo abría cinco). Aquí se crea un único recurso, en la
+primera llamada y bajo lock. Los recursos y sus Table no son seguros entre
+hilos, así que lo único que se comparte es su cliente (meta.client, seguro
+entre hilos y con la misma conversión de tipos): BaseDAO hace todas sus
+operaciones con él. La configuración de botocore dimensiona el pool para los hilos de
+carga, reutiliza las conexiones (TCP keep-alive), reintenta con backoff
+adaptativo ante throttling y acota los tiempos de conexión y lectura.
+"""
+import threading
+
+import boto3
+from botocore.config import Config as BotoConfig
+
+from config import Config
+
+
+_dynamodb = None
+_lock = threading.Lock()
+
+
+def configuracion_boto() -> BotoConfig:
+    """Configuración de botocore para DynamoDB (desde Config)"""
+    return BotoConfig(
+        max_pool_connections=Config.DYNAMODB_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=Config.DYNAMODB_CONNECT_TIMEOUT,
+        read_timeout=Config.DYNAMODB_READ_TIMEOUT,
+        retries={'total_max_attempts': Config.DYNAMODB_MAX_INTENTOS, 'mode': 'adaptive'}
+    )
+
+
+def get_dynamodb():
+    """
+    Recurso DynamoDB del proceso (se crea en la primera llamada)
+
+    Returns:
+        boto3 ServiceResource compartido
+    """
+    global _dynamodb
+    if _dynamodb is not None:
+        return _dynamodb
+
+    with _lock:
+        if _dynamodb is None:
+            # Sesión propia: la sesión por defecto de boto3 no es segura
+            # entre hilos mientras se crea
+            _dynamodb = boto3.session.Session().resource(
+                'dynamodb',
+                endpoint_url=Config.DYNAMODB_ENDPOINT,
+                config=configuracion_boto()
+            )
+            print(f"🔌 Conexión DynamoDB creada (pool de {Config.DYNAMODB_MAX_POOL_CONNECTIONS} conexiones)")
+        return _dynamodb
+
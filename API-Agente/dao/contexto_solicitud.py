@@ -0,0 +1,107 @@
+"""
+Contexto por solicitud (unidad de trabajo) para memoizar lecturas de DAOs
+"""
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+_contexto_actual: ContextVar[Optional['ContextoSolicitud']] = ContextVar(
+    'contexto_solicitud',
+    default=None
+)
+
+
+class ContextoSolicitud:
+    """
+    Memoiza las lecturas de DynamoDB dentro de una misma invocación
+
+    Mientras está activo (``with contexto:``), los DAOs lo consultan antes de ir
+    a DynamoDB, de modo que cada tabla/clave se lee como máximo una vez por
+    solicitud. Lleva la cuenta de lecturas reales por tabla y de las que
+    resolvió el caché entre invocaciones de los DAOs.
+    """
+
+    def __init__(self):
+        self._lecturas: Dict[tuple, Any] = {}
+        self._lock = threading.RLock()
+        self._tokens: List = []
+        self.lecturas_por_tabla: Dict[str, int] = {}
+        self.aciertos = 0
+        self.aciertos_cache = 0
+
+    # ===== ACTIVACIÓN =====
+    def __enter__(self) -> 'ContextoSolicitud':
+        self._tokens.append(_contexto_actual.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _contexto_actual.reset(self._tokens.pop())
+        return False
+
+    @staticmethod
+    def actual() -> Optional['ContextoSolicitud']:
+        """Retorna el contexto de solicitud activo o None"""
+        return _contexto_actual.get()
+
+    # ===== MEMOIZACIÓN =====
+    def obtener(self, tabla: str, clave: Hashable, cargador: Callable[[], Any]) -> Any:
+        """
+        Retorna el valor memoizado para tabla/clave o lo carga una sola vez
+
+        Args:
+            tabla: Nombre de la tabla DynamoDB
+            clave: Clave de la lectura (debe ser hashable)
+            cargador: Función que realiza la lectura (debe llamar a
+                      contar_lectura si llega a DynamoDB)
+
+        Returns:
+            Resultado de la lectura
+        """
+        llave = (tabla, clave)
+        with self._lock:
+            if llave in self._lecturas:
+                self.aciertos += 1
+                return self._lecturas[llave]
+
+        # La lectura se hace fuera del lock para no serializar cargas paralelas
+        valor = cargador()
+
+        with self._lock:
+            return self._lecturas.setdefault(llave, valor)
+
+    def contar_lectura(self, tabla: str):
+        """Registra una lectura que llegó a DynamoDB"""
+        with self._lock:
+            self.lecturas_por_tabla[tabla] = self.lecturas_por_tabla.get(tabla, 0) + 1
+
+    def contar_acierto_cache(self):
+        """Registra una lectura resuelta por el caché entre invocaciones"""
+        with self._lock:
+            self.aciertos_cache += 1
+
+    def registrar(self, tabla: str, clave: Hashable, valor: Any):
+        """Registra un valor ya leído sin contarlo como lectura"""
+        with self._lock:
+            self._lecturas[(tabla, clave)] = valor
+
+    def invalidar(self, tabla: str):
+        """Descarta las lecturas memoizadas de una tabla (tras una escritura)"""
+        with self._lock:
+            for llave in [k for k in self._lecturas if k[0] == tabla]:
+                del self._lecturas[llave]
+
+    # ===== MÉTRICAS =====
+    @property
+    def total_lecturas(self) -> int:
+        """Número de lecturas que llegaron a DynamoDB en esta solicitud"""
+        return sum(self.lecturas_por_tabla.values())
+
+    def resumen(self) -> Dict:
+        """Resumen de lecturas de la solicitud (útil para logs y tests)"""
+        return {
+            'lecturas': self.total_lecturas,
+            'lecturas_por_tabla': dict(self.lecturas_por_tabla),
+            'aciertos': self.aciertos,
+            'aciertos_cache': self.aciertos_cache
+        }
@@ -11,6 +11,8 @@ from config import Config
 class DatosAcademicosDAO(BaseDAO):
     """DAO para la tabla de datos académicos"""
     
+    USA_CACHE = True
+    
     def __init__(self):
         super().__init__(Config.TABLE_DATOS_ACADEMICOS)
     
@@ -24,17 +26,25 @@ class DatosAcademicosDAO(BaseDAO):
         Returns:
             Diccionario con datos académicos o None
         """
-        try:
-            datos_list = self.query_by_partition(
-                usuario_id,
-                limit=1,
-                scan_index_forward=False  # Más reciente primero
-            )
-            return datos_list[0] if datos_list else None
-        except Exception as e:
-            print(f"Error obteniendo datos académicos: {str(e)}")
-            return None
+        def cargar() -> Optional[Dict]:
+            try:
+                datos_list = self.query_by_partition(
+                    usuario_id,
+                    limit=1,
+                    scan_index_forward=False  # Más reciente primero
+                )
+                return datos_list[0] if datos_list else None
+            except Exception as e:
+                print(f"Error obteniendo datos académicos: {str(e)}")
+                return None
+        
+        return self._leer(('usuario', usuario_id), cargar)
     
     def actualizar_datos_academicos(self, datos: Dict) -> bool:
         """Actualiza o inserta datos académicos"""
-        return self.put_item(datos)
\ No newline at end of file
+        return self.put_item(datos)
+    
+    def _claves_cache(self, item: Dict) -> List[tuple]:
+        """Las lecturas de datos se cachean por usuarioId"""
+        usuario_id = item.get('usuarioId')
+        return [('usuario', usuario_id)] if usuario_id else []
\ No newline at end of file
@@ -11,22 +11,32 @@ from config import Config
 class DatosSocioeconomicosDAO(BaseDAO):
     """DAO para la tabla de datos socioeconómicos"""
     
+    USA_CACHE = True
+    
     def __init__(self):
         super().__init__(Config.TABLE_DATOS_SOCIOECONOMICOS)
     
     def get_datos_por_usuario(self, usuario_id: str) -> Optional[Dict]:
         """Obtiene los datos socioeconómicos de un usuario"""
-        try:
-            datos_list = self.query_by_partition(
-                usuario_id,
-                limit=1,
-                scan_index_forward=False
-            )
-            return datos_list[0] if datos_list else None
-        except Exception as e:
-            print(f"Error obteniendo datos socioeconómicos: {str(e)}")
-            return None
+        def cargar() -> Optional[Dict]:
+            try:
+                datos_list = self.query_by_partition(
+                    usuario_id,
+                    limit=1,
+                    scan_index_forward=False
+                )
+                return datos_list[0] if datos_list else None
+            except Exception as e:
+                print(f"Error obteniendo datos socioeconómicos: {str(e)}")
+                return None
+        
+        return self._leer(('usuario', usuario_id), cargar)
     
     def actualizar_datos_socioeconomicos(self, datos: Dict) -> bool:
         """Actualiza o inserta datos socioeconómicos"""
-        return self.put_item(datos)
\ No newline at end of file
+        return self.put_item(datos)
+    
+    def _claves_cache(self, item: Dict) -> List[tuple]:
+        """Las lecturas de datos se cachean por usuarioId"""
+        usuario_id = item.get('usuarioId')
+        return [('usuario', usuario_id)] if usuario_id else []
\ No newline at end of file
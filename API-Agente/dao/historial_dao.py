@@ -1,9 +1,66 @@
 """
 DAO para la tabla de Historial
+
+Sort key: '<contexto>#<UUID v7>' para las interacciones y '<contexto>#memoria'
+para la memoria consolidada del contexto. Cada agente lee solo su contexto
+con begins_with y, como 'memoria' ordena después de cualquier UUID (hex en
+minúsculas), una sola consulta descendente entrega la memoria seguida de
+las interacciones más recientes.
+
+Cada registro lleva 'expira' (epoch en segundos, TTL nativo de la tabla)
+según la retención de su contexto: DynamoDB los borra sin costo de escritura.
 """
-from typing import Dict, List, Optional
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
 from .base import BaseDAO
 from config import Config
+from utils.identificadores import cota_inferior, cota_superior, uuid7
+
+SEPARADOR = '#'
+ID_MEMORIA = 'memoria'
+# Mayor UUID posible: cota superior de las interacciones de un contexto
+ID_MAXIMO = 'ffffffff-ffff-ffff-ffff-ffffffffffff'
+
+
+def id_interaccion(contexto: Optional[str], identificador: Optional[str] = None) -> str:
+    """
+    Sort key de una interacción: '<contexto>#<UUID v7>'
+    
+    Args:
+        contexto: Contexto del agente (vacío: contexto general)
+        identificador: UUID v7 ya generado (p. ej. el del mensaje encolado,
+                       para que los reintentos sobrescriban el mismo registro)
+    """
+    return f"{contexto or Config.HISTORIAL_CONTEXTO_GENERAL}{SEPARADOR}{identificador or uuid7()}"
+
+
+def id_memoria(contexto: str) -> str:
+    """Sort key de la memoria consolidada de un contexto: '<contexto>#memoria'"""
+    return f"{contexto}{SEPARADOR}{ID_MEMORIA}"
+
+
+def contexto_de_id(identificador: str) -> str:
+    """Contexto codificado en la sort key"""
+    return identificador.split(SEPARADOR, 1)[0]
+
+
+def _instante_de_id(registro: Dict) -> str:
+    """Parte UUID v7 de la sort key (ordena por tiempo entre contextos)"""
+    return registro['id'].split(SEPARADOR, 1)[-1]
+
+
+def _con_expiracion(registro: Dict, contexto: Optional[str]) -> Dict:
+    """Registro con 'expira' según la retención del contexto (si la tiene)"""
+    dias = Config.get_retencion_historial(contexto or Config.HISTORIAL_CONTEXTO_GENERAL)
+    if dias <= 0:
+        return registro
+    return {**registro, 'expira': int(time.time()) + dias * 86400}
 
 
 class HistorialDAO(BaseDAO):
@@ -12,10 +69,38 @@ class HistorialDAO(BaseDAO):
     def __init__(self):
         super().__init__(Config.TABLE_HISTORIAL)
     
+    @staticmethod
+    def _rango_contexto(
+        contexto: str,
+        desde: Optional[Union[datetime, float]] = None,
+        hasta: Optional[Union[datetime, float]] = None
+    ):
+        """
+        Condición de sort key de las interacciones de un contexto en un rango
+        de tiempo (sin la memoria consolidada)
+        """
+        prefijo = f"{contexto}{SEPARADOR}"
+        inicio = prefijo + (cota_inferior(desde) if desde is not None else '')
+        fin = prefijo + (cota_superior(hasta) if hasta is not None else ID_MAXIMO)
+        return Key('id').between(inicio, fin)
+    
+    def _fusionar_contextos(
+        self,
+        lecturas: Iterable[Iterator[Dict]],
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Mezcla las lecturas de varios contextos (cada una de la más reciente a
+        la más antigua) en una sola lista ordenada por tiempo
+        """
+        fusion = heapq.merge(*lecturas, key=_instante_de_id, reverse=True)
+        return list(islice(fusion, limit)) if limit else list(fusion)
+    
     def get_historial_usuario(
-        self, 
+        self,
         correo: str,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        contexto: Optional[str] = None
     ) -> List[Dict]:
         """
         Obtiene el historial de interacciones de un usuario
@@ -23,67 +108,281 @@ class HistorialDAO(BaseDAO):
         Args:
             correo: Email del usuario
             limit: Límite de registros (default desde Config)
+            contexto: Contexto del agente: su memoria consolidada y sus
+                      interacciones (None para las de todos los contextos)
         
         Returns:
             Lista de registros del historial ordenados del más reciente al más antiguo
         """
         try:
             # Primero obtener el usuario para conseguir su ID
-            from dao.usuarios_dao import UsuariosDAO
-            usuarios_dao = UsuariosDAO()
-            usuario = usuarios_dao.get_usuario_por_correo(correo)
+            # (DAO compartido: la lectura se memoiza dentro de la solicitud)
+            from dao.base import DAOFactory
+            usuario = DAOFactory.get_dao('usuarios').get_usuario_por_correo(correo)
             
             if not usuario:
                 print(f"Usuario con correo {correo} no encontrado")
                 return []
             
-            usuario_id = usuario.get('id')
+            if contexto:
+                return self.get_historial_contexto(usuario.get('id'), contexto, limit=limit)
+            return self.get_historial_por_usuario_id(usuario.get('id'), limit=limit)
+        except Exception as e:
+            print(f"Error obteniendo historial: {str(e)}")
+            return []
+    
+    def get_historial_contexto(
+        self,
+        usuario_id: str,
+        contexto: str,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Obtiene lo que el agente de un contexto usa del historial con una sola
+        consulta (begins_with '<contexto>#', descendente): su memoria
+        consolidada, si existe, y sus últimas interacciones
+        
+        Si el contexto tiene menos interacciones que el límite, se completa
+        con el historial General (registros anteriores a que el historial
+        guardara el contexto, ver DataGenerator/MigrarHistorialContexto.py) en
+        una segunda consulta: su memoria y sus interacciones más recientes.
+        Los usuarios con historial propio suficiente no la hacen.
+        
+        Args:
+            usuario_id: ID del usuario
+            contexto: Nombre del contexto del agente
+            limit: Límite de interacciones (default desde Config; con la
+                   recuperación por relevancia, todos los candidatos)
+        
+        Returns:
+            Memorias (tipo 'memoria') e interacciones del contexto, seguidas
+            de las del historial General; las interacciones de la más
+            reciente a la más antigua
+        """
+        limite = limit or (
+            Config.HISTORIAL_RECUPERACION_CANDIDATOS
+            if Config.HISTORIAL_RECUPERACION_HABILITADA
+            else Config.LIMITE_HISTORIAL
+        )
+        general = Config.HISTORIAL_CONTEXTO_GENERAL
+        
+        try:
+            registros = self._leer(
+                ('contexto', usuario_id, contexto, limite),
+                lambda: self._leer_contexto(usuario_id, contexto, limite)
+            )
+            faltantes = limite - sum(1 for r in registros if r['id'] != id_memoria(contexto))
+            if contexto == general or faltantes <= 0:
+                return registros
             
-            # Query por partition key (usuarioId)
-            return self.query_by_partition(
-                usuario_id,
-                limit=limit or Config.LIMITE_HISTORIAL,
-                scan_index_forward=False  # False = más recientes primero
+            return registros + self._leer(
+                ('contexto', usuario_id, general, faltantes),
+                lambda: self._leer_contexto(usuario_id, general, faltantes)
             )
         except Exception as e:
-            print(f"Error obteniendo historial: {str(e)}")
+            print(f"Error obteniendo historial de {contexto}: {str(e)}")
             return []
     
+    def _leer_contexto(self, usuario_id: str, contexto: str, limite: int) -> List[Dict]:
+        """Memoria (si existe) y últimas `limite` interacciones de un contexto"""
+        registros = list(self.iter_partition(
+            usuario_id,
+            sort_key_condition=Key('id').begins_with(f"{contexto}{SEPARADOR}"),
+            scan_index_forward=False,
+            limit=limite + 1  # La memoria ocupa el primer lugar si existe
+        ))
+        if registros and registros[0]['id'] == id_memoria(contexto):
+            return registros
+        return registros[:limite]
+    
     def get_historial_por_usuario_id(
         self,
         usuario_id: str,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        contexto: Optional[str] = None
     ) -> List[Dict]:
         """
-        Obtiene el historial directamente por usuarioId (más eficiente si ya tienes el ID)
+        Obtiene las interacciones de un usuario directamente por usuarioId
         
         Args:
             usuario_id: ID del usuario
             limit: Límite de registros
+            contexto: Contexto del agente (None para todos: una consulta
+                      acotada por contexto, mezcladas por tiempo)
         
         Returns:
-            Lista de registros del historial
+            Lista de registros del historial (sin las memorias consolidadas),
+            del más reciente al más antiguo
         """
+        limite = limit or Config.LIMITE_HISTORIAL
+        contextos = [contexto] if contexto else Config.HISTORIAL_CONTEXTOS
         try:
-            return self.query_by_partition(
-                usuario_id,
-                limit=limit or Config.LIMITE_HISTORIAL,
-                scan_index_forward=False
+            return self._leer(
+                ('usuario', usuario_id, contexto, limite),
+                lambda: self._fusionar_contextos(
+                    (self.iter_interacciones(usuario_id, c, limit=limite) for c in contextos),
+                    limite
+                )
             )
         except Exception as e:
             print(f"Error obteniendo historial por ID: {str(e)}")
             return []
     
+    def iter_interacciones(
+        self,
+        usuario_id: str,
+        contexto: str,
+        projection: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Recorre las interacciones de un contexto de la más reciente a la más
+        antigua, sin la memoria consolidada
+        
+        Args:
+            usuario_id: ID del usuario
+            contexto: Contexto del agente
+            projection: Atributos a leer (None para todos)
+            limit: Máximo de registros
+        
+        Yields:
+            Registros del historial
+        
+        Raises:
+            Exception: Si falla la lectura de una página
+        """
+        return self.iter_partition(
+            usuario_id,
+            sort_key_condition=self._rango_contexto(contexto),
+            scan_index_forward=False,
+            projection=projection,
+            limit=limit
+        )
+    
+    def get_memoria(self, usuario_id: str, contexto: str) -> Optional[Dict]:
+        """
+        Obtiene la memoria consolidada de un contexto
+        
+        Args:
+            usuario_id: ID del usuario
+            contexto: Contexto del agente
+        
+        Returns:
+            Registro de la memoria o None si no existe
+        """
+        return self.get_by_key(usuario_id, id_memoria(contexto))
+    
+    def guardar_memoria(self, memoria: Dict, hasta_previo: Optional[str] = None) -> bool:
+        """
+        Escribe la memoria consolidada de un contexto si nadie la cambió desde
+        que se leyó (dos compactaciones simultáneas no pisan sus conteos)
+        
+        Args:
+            memoria: Registro completo de la memoria
+            hasta_previo: 'hasta' de la memoria leída; None si no existía
+        
+        Returns:
+            True si se escribió
+        """
+        if hasta_previo is None:
+            condicion = Attr('id').not_exists()
+        else:
+            condicion = Attr('hasta').eq(hasta_previo)
+        
+        try:
+            self.cliente.put_item(
+                TableName=self.table_name,
+                # La retención de la memoria se cuenta desde su última compactación
+                Item=self._float_to_decimal(_con_expiracion(memoria, memoria.get('contexto'))),
+                ConditionExpression=condicion
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                print(f"⚠️ Memoria {memoria.get('id')} de {memoria.get('usuarioId')} modificada por otra compactación")
+            else:
+                print(f"Error guardando memoria del historial: {str(e)}")
+            return False
+        except Exception as e:
+            print(f"Error guardando memoria del historial: {str(e)}")
+            return False
+        
+        self._invalidar_lecturas(memoria)
+        return True
+    
+    def eliminar_interacciones(self, usuario_id: str, ids: Iterable[str]) -> int:
+        """
+        Elimina interacciones de un usuario en lotes de BatchWriteItem
+        
+        Args:
+            usuario_id: ID del usuario
+            ids: Ids (sort keys) a eliminar
+        
+        Returns:
+            Número de registros eliminados
+        """
+        try:
+            return self.delete_keys({'usuarioId': usuario_id, 'id': i} for i in ids)
+        except Exception as e:
+            print(f"Error eliminando interacciones: {str(e)}")
+            return 0
+    
+    def get_historial_entre(
+        self,
+        usuario_id: str,
+        desde: Optional[Union[datetime, float]] = None,
+        hasta: Optional[Union[datetime, float]] = None,
+        limit: Optional[int] = None,
+        contexto: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Obtiene las interacciones de un usuario en un rango de tiempo con una
+        condición sobre la sort key (los ids UUID v7 ordenan por tiempo)
+        
+        Args:
+            usuario_id: ID del usuario
+            desde: Inicio del rango (datetime o epoch); None sin cota inferior
+            hasta: Fin del rango (datetime o epoch); None sin cota superior
+            limit: Límite de registros (los más recientes del rango)
+            contexto: Contexto del agente (None para todos)
+        
+        Returns:
+            Lista de registros del rango, del más reciente al más antiguo
+        """
+        contextos = [contexto] if contexto else Config.HISTORIAL_CONTEXTOS
+        try:
+            return self._fusionar_contextos(
+                (
+                    self.iter_partition(
+                        usuario_id,
+                        sort_key_condition=self._rango_contexto(c, desde, hasta),
+                        scan_index_forward=False,
+                        limit=limit
+                    )
+                    for c in contextos
+                ),
+                limit
+            )
+        except Exception as e:
+            print(f"Error obteniendo historial por rango: {str(e)}")
+            return []
+    
     def agregar_interaccion(self, registro: Dict) -> bool:
         """
         Agrega una nueva interacción al historial
         
         Args:
-            registro: Diccionario con usuarioId, id, texto
+            registro: Diccionario con usuarioId, id, texto y contexto (id de
+                      id_interaccion: '<contexto>#<UUID v7>', el orden de la
+                      sort key dentro del contexto es el orden cronológico).
+                      Si no trae 'expira' se calcula con la retención del
+                      contexto (Config.get_retencion_historial). Con la
+                      recuperación por relevancia lleva además 'vector'
+                      (bytes float16 del resumen)
                      {
                          "usuarioId": "uuid-del-usuario",
-                         "id": "uuid-de-la-interaccion",
-                         "texto": "Resumen de la interacción"
+                         "id": "MentorAcademico#uuid7-de-la-interaccion",
+                         "texto": "Resumen de la interacción",
+                         "contexto": "MentorAcademico"
                      }
         
         Returns:
@@ -96,6 +395,9 @@ class HistorialDAO(BaseDAO):
                 print(f"Error: Campo requerido '{campo}' faltante en historial")
                 return False
         
+        if 'expira' not in registro:
+            registro = _con_expiracion(registro, contexto_de_id(registro['id']))
+        
         return self.put_item(registro)
     
     def limpiar_historial_antiguo(
@@ -104,59 +406,63 @@ class HistorialDAO(BaseDAO):
         mantener_ultimos: int = 50
     ) -> int:
         """
-        Limpia el historial antiguo de un usuario, manteniendo solo los últimos N registros
+        Limpia el historial antiguo de un usuario, manteniendo solo los últimos
+        N registros de cada contexto
+        
+        La expiración normal la resuelve el TTL; esto es para recortes
+        explícitos. Cada contexto se procesa en un hilo: recorre sus claves
+        de la más reciente a la más antigua (proyección de solo claves),
+        salta las primeras N y borra el resto con BatchWriteItem a medida que
+        llegan las páginas.
         
         Args:
             usuario_id: ID del usuario
-            mantener_ultimos: Cantidad de registros más recientes a mantener
+            mantener_ultimos: Cantidad de registros más recientes a mantener por contexto
         
         Returns:
             Número de registros eliminados
         """
+        def limpiar_contexto(contexto: str) -> int:
+            claves = self.iter_interacciones(usuario_id, contexto, projection=['usuarioId', 'id'])
+            return self.delete_keys(islice(claves, mantener_ultimos, None))
+        
         try:
-            # Obtener todo el historial del usuario
-            historial_completo = self.query_by_partition(
-                usuario_id,
-                scan_index_forward=False  # Más recientes primero
-            )
-            
-            # Si hay menos registros que el límite, no hacer nada
-            if len(historial_completo) <= mantener_ultimos:
-                return 0
-            
-            # Identificar registros a eliminar (los más antiguos)
-            registros_a_eliminar = historial_completo[mantener_ultimos:]
+            with ThreadPoolExecutor(
+                max_workers=len(Config.HISTORIAL_CONTEXTOS),
+                thread_name_prefix='limpiar-historial'
+            ) as executor:
+                eliminados = sum(executor.map(limpiar_contexto, Config.HISTORIAL_CONTEXTOS))
             
-            # Eliminar uno por uno
-            eliminados = 0
-            for registro in registros_a_eliminar:
-                if self.delete_item(usuario_id, registro['id']):
-                    eliminados += 1
-            
-            print(f"Limpieza de historial: {eliminados} registros eliminados de usuario {usuario_id}")
+            if eliminados:
+                print(f"Limpieza de historial: {eliminados} registros eliminados de usuario {usuario_id}")
             return eliminados
         
         except Exception as e:
             print(f"Error limpiando historial: {str(e)}")
             return 0
     
-    def obtener_ultimo_registro(self, usuario_id: str) -> Optional[Dict]:
+    def obtener_ultimo_registro(
+        self,
+        usuario_id: str,
+        contexto: Optional[str] = None
+    ) -> Optional[Dict]:
         """
         Obtiene el registro más reciente del historial de un usuario
         
         Args:
             usuario_id: ID del usuario
+            contexto: Contexto del agente (None para todos)
         
         Returns:
             Diccionario con el último registro o None
         """
+        contextos = [contexto] if contexto else Config.HISTORIAL_CONTEXTOS
         try:
-            registros = self.query_by_partition(
-                usuario_id,
-                limit=1,
-                scan_index_forward=False  # Más reciente
+            ultimos = self._fusionar_contextos(
+                (self.iter_interacciones(usuario_id, c, limit=1) for c in contextos),
+                1
             )
-            return registros[0] if registros else None
+            return ultimos[0] if ultimos else None
         except Exception as e:
             print(f"Error obteniendo último registro: {str(e)}")
-            return None
\ No newline at end of file
+            return None
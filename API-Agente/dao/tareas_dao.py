@@ -29,11 +29,20 @@ class TareasDAO(BaseDAO):
         Returns:
             Lista de tareas
         """
-        return self.query_by_partition(
-            usuario_id,
-            limit=limit or Config.LIMITE_TAREAS,
-            scan_index_forward=False
-        )
+        limite = limit or Config.LIMITE_TAREAS
+        
+        def cargar() -> List[Dict]:
+            try:
+                return list(self.iter_partition(
+                    usuario_id,
+                    scan_index_forward=False,
+                    limit=limite
+                ))
+            except Exception as e:
+                print(f"Error obteniendo tareas: {str(e)}")
+                return []
+        
+        return self._leer(('usuario', usuario_id, limite), cargar)
     
     def agregar_tarea(self, tarea: Dict) -> bool:
         """Agrega una nueva tarea"""
@@ -1,37 +1,71 @@
 """
 DAO para la tabla de Usuarios
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from boto3.dynamodb.conditions import Attr
-from .base import BaseDAO
+from botocore.exceptions import ClientError
+from .base import BaseDAO, ERRORES_INDICE_FALTANTE
 from config import Config
 
 
 class UsuariosDAO(BaseDAO):
     """DAO para la tabla de usuarios"""
     
+    # Sin caché entre invocaciones: 'autorizacion' la cambia toggleAutorizacion
+    # (y API-Analisis el resto del registro) desde otros contenedores, cuya
+    # invalidación no llega a este; revocar el consentimiento debe surtir
+    # efecto en la siguiente consulta. Dentro de una solicitud el usuario se
+    # sigue leyendo una sola vez (ContextoSolicitud)
+    USA_CACHE = False
+    
     def __init__(self):
         super().__init__(Config.TABLE_USUARIOS)
     
-    def get_usuario_por_correo(self, correo: str) -> Optional[Dict]:
+    def get_usuario_por_correo(self, correo: str, usar_cache: bool = True) -> Optional[Dict]:
         """
-        Busca usuario por correo electrónico usando scan con filtro
+        Busca usuario por correo electrónico con un Query sobre el índice CorreoIndex
+        
+        Si el índice aún no existe (tabla sin migrar), recurre a un scan con
+        filtro; cualquier otro error de DynamoDB devuelve None sin escanear.
+        
+        Los usuarios no se cachean entre invocaciones (USA_CACHE = False):
+        cada solicitud lee DynamoDB una vez y las demás lecturas del mismo
+        correo en la solicitud salen del ContextoSolicitud.
         
         Args:
             correo: Email del usuario
+            usar_cache: Se mantiene por compatibilidad con BaseDAO._leer; sin
+                        caché en este DAO no cambia el resultado
         
         Returns:
             Diccionario con datos del usuario o None
         """
-        try:
-            response = self.scan_all(
-                filter_expression=Attr('correo').eq(correo),
-                limit=1
-            )
-            return response[0] if response else None
-        except Exception as e:
-            print(f"Error buscando usuario por correo: {str(e)}")
-            return None
+        def cargar() -> Optional[Dict]:
+            try:
+                usuarios = self.query_index(
+                    Config.INDEX_USUARIOS_CORREO,
+                    'correo',
+                    correo,
+                    limit=1
+                )
+                return usuarios[0] if usuarios else None
+            except ClientError as e:
+                codigo = e.response['Error']['Code']
+                # Solo un índice faltante justifica el scan: con throttling o
+                # AccessDenied cada búsqueda sería un scan de la tabla completa
+                if codigo not in ERRORES_INDICE_FALTANTE:
+                    print(f"Error buscando usuario por correo ({codigo}): {str(e)}")
+                    return None
+                print(
+                    f"⚠️ Índice {Config.INDEX_USUARIOS_CORREO} no disponible "
+                    f"({codigo}), usando scan"
+                )
+                return self.scan_first(Attr('correo').eq(correo))
+            except Exception as e:
+                print(f"Error buscando usuario por correo: {str(e)}")
+                return None
+        
+        return self._leer(('correo', correo), cargar, usar_cache=usar_cache)
     
     def existe_usuario(self, correo: str) -> bool:
         """
@@ -78,34 +112,43 @@ class UsuariosDAO(BaseDAO):
         
         return self.put_item(usuario)
     
-    def actualizar_autorizacion(self, correo: str, autorizacion: bool) -> bool:
+    def actualizar_autorizacion(
+        self,
+        correo: str,
+        autorizacion: bool,
+        usuario_id: Optional[str] = None
+    ) -> Optional[Dict]:
         """
-        Actualiza solo el campo de autorización de un usuario
+        Actualiza solo el campo de autorización de un usuario (un UpdateItem,
+        sin reescribir el registro)
         
         Args:
             correo: Email del usuario
             autorizacion: Nuevo valor de autorización
+            usuario_id: ID del usuario si ya se conoce (evita buscarlo por correo)
         
         Returns:
-            True si fue exitoso
+            Usuario actualizado o None si no existe o falló la escritura
         """
         try:
-            # Primero obtener el usuario completo
-            usuario = self.get_usuario_por_correo(correo)
+            if usuario_id is None:
+                # Lectura sin caché solo para obtener el id; la escritura
+                # condicional falla si el usuario se eliminó entretanto
+                usuario = self.get_usuario_por_correo(correo)
+                if not usuario:
+                    print(f"Usuario con correo {correo} no encontrado")
+                    return None
+                usuario_id = usuario['id']
             
-            if not usuario:
-                print(f"Usuario con correo {correo} no encontrado")
-                return False
-            
-            # Actualizar campo de autorización
-            usuario['autorizacion'] = autorizacion
-            
-            # Guardar usuario actualizado
-            return self.put_item(usuario)
+            return self.update_fields(
+                {'id': usuario_id, 'correo': correo},
+                {'autorizacion': autorizacion},
+                condition=Attr('id').exists()
+            )
         
         except Exception as e:
             print(f"Error actualizando autorización: {str(e)}")
-            return False
+            return None
     
     def crear_usuario(self, usuario: Dict) -> bool:
         """
@@ -130,4 +173,10 @@ class UsuariosDAO(BaseDAO):
             print(f"Usuario con correo {usuario['correo']} ya existe")
             return False
         
-        return self.put_item(usuario)
\ No newline at end of file
+        # Partition key de ListadoCorreoIndex (listado paginado por correo)
+        return self.put_item({**usuario, 'listado': Config.LISTADO_USUARIOS})
+    
+    def _claves_cache(self, item: Dict) -> List[tuple]:
+        """Las lecturas de usuarios se memoizan por correo en la solicitud"""
+        correo = item.get('correo')
+        return [('correo', correo)] if correo else []
\ No newline at end of file
@@ -3,11 +3,17 @@ Handler principal para consultas a los agentes académicos
 """
 import json
 import traceback
-import uuid
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 from services.agente_service import AgenteService
+from services.gemini_service import get_metricas_inicializacion
+from services.cache_respuestas import get_cache_respuestas
+from services.cache_semantico import get_cache_semantica
+from services.recuperacion_historial import seleccionar_historial
 from dao.base import DAOFactory
+from dao.contexto_solicitud import ContextoSolicitud
+from config import Config
 from utils.formatters import formatear_respuesta_exitosa, formatear_respuesta_error
 from utils.validators import validar_email, validar_contexto
 
@@ -28,7 +34,7 @@ def handler(event, context):
     2. Verifica autorización del usuario
     3. Carga el historial previo automáticamente
     4. Genera respuesta con el agente
-    5. Guarda un resumen en el historial
+    5. Guarda un resumen en el historial (o lo encola si RESUMEN_MODO='diferido')
     """
     try:
         # 1. Parsear body
@@ -39,96 +45,79 @@ def handler(event, context):
         contexto = body.get('contexto')
         mensaje = body.get('mensaje')
         
-        if not correo or not validar_email(correo):
-            return formatear_respuesta_error(
-                400,
-                'Email inválido',
-                'Se requiere un email válido'
+        error = validar_solicitud(correo, contexto, mensaje)
+        if error:
+            return error
+        
+        # Las lecturas de DynamoDB se memoizan durante toda la solicitud:
+        # usuario e historial se leen una sola vez aunque los use también el contexto
+        contexto_solicitud = ContextoSolicitud()
+        with contexto_solicitud:
+            # 3. Obtener usuario por correo
+            usuarios_dao = DAOFactory.get_dao('usuarios')
+            # Lectura directa: la autorización se revoca desde otra Lambda
+            usuario = usuarios_dao.get_usuario_por_correo(correo, usar_cache=False)
+        
+            if not usuario:
+                return formatear_respuesta_error(
+                    404,
+                    'Usuario no encontrado',
+                    f'No existe usuario con correo {correo}'
+                )
+        
+            # 4. Verificar autorización
+            if not usuario.get('autorizacion', False):
+                return formatear_respuesta_error(
+                    403,
+                    'Autorización requerida',
+                    'El usuario no ha autorizado la recopilación de datos. '
+                    'Debe activar la autorización antes de usar los agentes.'
+                )
+        
+            usuario_id = usuario['id']
+        
+            # 5. Cargar historial previo del contexto (memoria consolidada y
+            # últimas interacciones; la misma lectura que usa el contexto)
+            historial_dao = DAOFactory.get_dao('historial')
+            historial_previo = historial_dao.get_historial_contexto(usuario_id, contexto)
+        
+            # Convertir historial a formato de conversación (con la
+            # recuperación por relevancia, solo lo relacionado con el mensaje)
+            conversacion_previa = historial_a_conversacion(
+                seleccionar_historial(historial_previo, mensaje)
             )
         
-        if not contexto or not validar_contexto(contexto):
-            return formatear_respuesta_error(
-                400,
-                'Contexto inválido',
-                f'El contexto debe ser uno de: MentorAcademico, OrientadorVocacional, Psicologo'
+            # 6. Procesar consulta con el servicio del agente
+            agente_service = AgenteService(contexto_solicitud=contexto_solicitud)
+            resultado = agente_service.procesar_consulta(
+                correo=correo,
+                contexto=contexto,
+                mensaje_usuario=mensaje,
+                historial_conversacion=conversacion_previa
             )
         
-        if not mensaje or len(mensaje.strip()) == 0:
-            return formatear_respuesta_error(
-                400,
-                'Mensaje requerido',
-                'Se requiere un mensaje no vacío'
+            # 7-8. Resumir la interacción y guardarla en historial
+            exito_guardado, resumen_diferido = registrar_resumen(
+                agente_service,
+                usuario_id=usuario_id,
+                mensaje=mensaje,
+                respuesta=resultado['respuesta'],
+                contexto=contexto
             )
         
-        if len(mensaje) > 5000:
-            return formatear_respuesta_error(
-                400,
-                'Mensaje muy largo',
-                'El mensaje no puede exceder 5000 caracteres'
-            )
-        
-        # 3. Obtener usuario por correo
-        usuarios_dao = DAOFactory.get_dao('usuarios')
-        usuario = usuarios_dao.get_usuario_por_correo(correo)
-        
-        if not usuario:
-            return formatear_respuesta_error(
-                404,
-                'Usuario no encontrado',
-                f'No existe usuario con correo {correo}'
-            )
-        
-        # 4. Verificar autorización
-        if not usuario.get('autorizacion', False):
-            return formatear_respuesta_error(
-                403,
-                'Autorización requerida',
-                'El usuario no ha autorizado la recopilación de datos. '
-                'Debe activar la autorización antes de usar los agentes.'
-            )
-        
-        usuario_id = usuario['id']
-        
-        # 5. Cargar historial previo automáticamente
-        historial_dao = DAOFactory.get_dao('historial')
-        historial_previo = historial_dao.get_historial_usuario(correo, limit=10)
+            if not exito_guardado:
+                print(f"⚠️ No se pudo guardar en historial para usuario {correo}")
         
-        # Convertir historial a formato de conversación
-        # El historial contiene resúmenes de interacciones previas
-        conversacion_previa = []
-        for item in historial_previo:
-            conversacion_previa.append({
-                'role': 'assistant',
-                'content': f"[Interacción previa]: {item.get('texto', '')}"
-            })
+        print(f"📊 Lecturas DynamoDB por solicitud: {contexto_solicitud.resumen()}")
+        print(f"🗄️ Caché de DAOs: {DAOFactory.get_cache_stats()}")
+        print(f"🧊 Inicialización de Gemini: {get_metricas_inicializacion()}")
+        cache_respuestas = get_cache_respuestas()
+        if cache_respuestas is not None:
+            print(f"♻️ Caché de respuestas: {cache_respuestas.estadisticas()}")
         
-        # 6. Procesar consulta con el servicio del agente
-        agente_service = AgenteService()
-        resultado = agente_service.procesar_consulta(
-            correo=correo,
-            contexto=contexto,
-            mensaje_usuario=mensaje,
-            historial_conversacion=conversacion_previa
-        )
-        
-        # 7. Generar resumen de la interacción
-        resumen = agente_service.generar_resumen_interaccion(
-            mensaje_usuario=mensaje,
-            respuesta_agente=resultado['respuesta'],
-            contexto=contexto
-        )
-        
-        # 8. Guardar resumen en historial
-        registro_historial = {
-            'usuarioId': usuario_id,
-            'id': str(uuid.uuid4()),
-            'texto': resumen
-        }
-        
-        exito_guardado = historial_dao.agregar_interaccion(registro_historial)
-        
-        if not exito_guardado:
-            print(f"⚠️ No se pudo guardar en historial para usuario {correo}")
+        cache_semantica = get_cache_semantica()
+        if cache_semantica is not None:
+            print(f"🧭 Caché semántica: {cache_semantica.estadisticas()}")
         
         # 9. Retornar respuesta
         return formatear_respuesta_exitosa({
@@ -136,6 +125,8 @@ def handler(event, context):
             'contexto': contexto,
             'timestamp': datetime.now().isoformat(),
             'historial_guardado': exito_guardado,
+            'resumen_diferido': resumen_diferido,
+            'desde_cache': resultado.get('desde_cache', False),
             'usuario': {
                 'correo': correo,
                 'id': usuario_id
@@ -163,4 +154,101 @@ def handler(event, context):
             500,
             'Error interno del servidor',
             'Ocurrió un error procesando la consulta'
-        )
\ No newline at end of file
+        )
+
+
+def validar_solicitud(correo: str, contexto: str, mensaje: str) -> Optional[Dict]:
+    """
+    Valida los campos de una consulta
+    
+    Returns:
+        Respuesta de error formateada, o None si la solicitud es válida
+    """
+    if not correo or not validar_email(correo):
+        return formatear_respuesta_error(
+            400,
+            'Email inválido',
+            'Se requiere un email válido'
+        )
+    
+    if not contexto or not validar_contexto(contexto):
+        return formatear_respuesta_error(
+            400,
+            'Contexto inválido',
+            f'El contexto debe ser uno de: MentorAcademico, OrientadorVocacional, Psicologo'
+        )
+    
+    if not mensaje or len(mensaje.strip()) == 0:
+        return formatear_respuesta_error(
+            400,
+            'Mensaje requerido',
+            'Se requiere un mensaje no vacío'
+        )
+    
+    if len(mensaje) > 5000:
+        return formatear_respuesta_error(
+            400,
+            'Mensaje muy largo',
+            'El mensaje no puede exceder 5000 caracteres'
+        )
+    
+    return None
+
+
+def historial_a_conversacion(historial: List[Dict]) -> List[Dict]:
+    """
+    Convierte el historial a formato de conversación
+    (el historial contiene resúmenes de interacciones previas)
+    """
+    return [
+        {
+            'role': 'assistant',
+            'content': (
+                f"[Memoria de interacciones anteriores]: {item.get('texto', '')}"
+                if item.get('tipo') == 'memoria'
+                else f"[Interacción previa]: {item.get('texto', '')}"
+            )
+        }
+        for item in historial
+    ]
+
+
+def registrar_resumen(
+    agente_service: AgenteService,
+    usuario_id: str,
+    mensaje: str,
+    respuesta: str,
+    contexto: str
+) -> Tuple[bool, bool]:
+    """
+    Guarda el resumen de la interacción en el historial, o lo encola si
+    RESUMEN_MODO='diferido' (si encolar falla, se resume en línea)
+    
+    Returns:
+        Tupla (guardado o encolado, resumen diferido)
+    """
+    resumen_diferido = Config.RESUMEN_MODO == 'diferido'
+    exito_guardado = False
+    
+    if resumen_diferido:
+        # Se encola el intercambio crudo; el worker procesar_resumen
+        # genera el resumen fuera del camino crítico de la respuesta
+        exito_guardado = agente_service.encolar_resumen_interaccion(
+            usuario_id=usuario_id,
+            mensaje_usuario=mensaje,
+            respuesta_agente=respuesta,
+            contexto=contexto
+        )
+        if not exito_guardado:
+            print(f"⚠️ No se pudo encolar el resumen para {usuario_id}, se resume en línea")
+            resumen_diferido = False
+    
+    if not resumen_diferido:
+        exito_guardado = agente_service.guardar_resumen_interaccion(
+            usuario_id=usuario_id,
+            mensaje_usuario=mensaje,
+            respuesta_agente=respuesta,
+            contexto=contexto
+        )
+    
+    return exito_guardado, resumen_diferido
\ No newline at end of file
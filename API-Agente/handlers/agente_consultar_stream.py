@@ -0,0 +1,283 @@
+"""
+Handler de consultas a los agentes con respuesta en streaming (SSE)
+
+La respuesta de Gemini se reenvía al cliente fragmento a fragmento como eventos
+text/event-stream; el resumen del historial se guarda cuando el stream termina.
+
+El runtime administrado de Python no expone la API de response streaming de
+Lambda, así que el streaming real se sirve con un servidor HTTP mínimo detrás
+de Lambda Web Adapter (Function URL con invokeMode RESPONSE_STREAM):
+
+    python -m handlers.agente_consultar_stream      # también sirve para probar en local
+    curl -N -X POST localhost:8080/agente/consultar/stream -d '{...}'
+
+`handler` mantiene la misma lógica para API Gateway, pero con la respuesta
+SSE completa en un solo body (sin beneficio de latencia).
+"""
+import json
+import os
+import traceback
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, Optional
+
+from services.agente_service import (
+    AgenteService,
+    AutorizacionRequeridaError,
+    ContextoInvalidoError,
+    UsuarioNoEncontradoError
+)
+from dao.base import DAOFactory
+from dao.contexto_solicitud import ContextoSolicitud
+from services.recuperacion_historial import seleccionar_historial
+from handlers.agente_consultar import (
+    historial_a_conversacion,
+    registrar_resumen,
+    validar_solicitud
+)
+from utils.formatters import formatear_evento_sse, formatear_respuesta_error
+
+
+def iniciar_consulta(body: Dict):
+    """
+    Valida la consulta y prepara el stream (todo lo que puede fallar con un
+    código HTTP ocurre aquí, antes de enviar el primer byte)
+
+    Args:
+        body: Body JSON de la solicitud
+
+    Returns:
+        Tupla (respuesta de error o None, generador de eventos SSE o None)
+    """
+    correo = body.get('correo')
+    contexto = body.get('contexto')
+    mensaje = body.get('mensaje')
+
+    error = validar_solicitud(correo, contexto, mensaje)
+    if error:
+        return error, None
+
+    contexto_solicitud = ContextoSolicitud()
+    agente_service = AgenteService(contexto_solicitud=contexto_solicitud)
+
+    try:
+        with contexto_solicitud:
+            historial_dao = DAOFactory.get_dao('historial')
+            historial_previo = historial_dao.get_historial_usuario(correo, contexto=contexto)
+
+            consulta = agente_service.procesar_consulta_streaming(
+                correo=correo,
+                contexto=contexto,
+                mensaje_usuario=mensaje,
+                historial_conversacion=historial_a_conversacion(
+                    seleccionar_historial(historial_previo, mensaje)
+                )
+            )
+    except UsuarioNoEncontradoError:
+        return formatear_respuesta_error(
+            404,
+            'Usuario no encontrado',
+            f'No existe usuario con correo {correo}'
+        ), None
+    except AutorizacionRequeridaError:
+        return formatear_respuesta_error(
+            403,
+            'Autorización requerida',
+            'El usuario no ha autorizado la recopilación de datos. '
+            'Debe activar la autorización antes de usar los agentes.'
+        ), None
+    except ContextoInvalidoError as e:
+        return formatear_respuesta_error(400, 'Contexto inválido', str(e)), None
+
+    print(f"📊 Lecturas DynamoDB por solicitud: {contexto_solicitud.resumen()}")
+    return None, _eventos_consulta(agente_service, consulta, mensaje)
+
+
+def _eventos_consulta(agente_service: AgenteService, consulta: Dict, mensaje: str):
+    """
+    Genera los eventos SSE de una consulta: inicio, fragmentos y fin
+
+    El resumen del historial se guarda después del último fragmento, fuera
+    del tiempo hasta el primer token. Si Gemini falla (aun a mitad del
+    stream) se emite 'error' en lugar de 'fin' y no se guarda nada.
+    """
+    usuario = consulta['usuario']
+    contexto = consulta['contexto']
+    fragmentos = []
+
+    yield formatear_evento_sse('inicio', {
+        'contexto': contexto,
+        'usuario': usuario
+    })
+
+    try:
+        for fragmento in consulta['fragmentos']:
+            fragmentos.append(fragmento)
+            yield formatear_evento_sse('fragmento', {'texto': fragmento})
+    except Exception as e:
+        print(f"❌ Error durante el streaming: {str(e)}")
+        print(traceback.format_exc())
+        yield formatear_evento_sse('error', {
+            'mensaje': 'Ocurrió un error generando la respuesta'
+        })
+        return
+
+    respuesta = ''.join(fragmentos)
+    exito_guardado, resumen_diferido = registrar_resumen(
+        agente_service,
+        usuario_id=usuario['id'],
+        mensaje=mensaje,
+        respuesta=respuesta,
+        contexto=contexto
+    )
+
+    if not exito_guardado:
+        print(f"⚠️ No se pudo guardar en historial para usuario {usuario['correo']}")
+
+    yield formatear_evento_sse('fin', {
+        'timestamp': datetime.now().isoformat(),
+        'historial_guardado': exito_guardado,
+        'resumen_diferido': resumen_diferido
+    })
+
+
+def transmitir_consulta(body: Dict, escribir: Callable[[str], None]) -> Optional[Dict]:
+    """
+    Adaptador SSE: escribe cada evento en cuanto está disponible
+
+    Args:
+        body: Body JSON de la solicitud
+        escribir: Función que envía un evento al cliente (y lo vacía)
+
+    Returns:
+        Respuesta de error formateada si la consulta no pudo iniciarse, None si
+        el stream se completó
+    """
+    error, eventos = iniciar_consulta(body)
+    if error:
+        return error
+
+    for evento in eventos:
+        escribir(evento)
+    return None
+
+
+def handler(event, context):
+    """
+    Handler para API Gateway (respuesta SSE completa en un solo body)
+
+    Espera el mismo body JSON que agente_consultar.
+    """
+    try:
+        body = json.loads(event.get('body', '{}'))
+        eventos = []
+
+        error = transmitir_consulta(body, eventos.append)
+        if error:
+            return error
+
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'text/event-stream; charset=utf-8',
+                'Cache-Control': 'no-cache',
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Credentials': True
+            },
+            'body': ''.join(eventos)
+        }
+
+    except json.JSONDecodeError:
+        return formatear_respuesta_error(
+            400,
+            'JSON inválido',
+            'El body debe ser JSON válido'
+        )
+
+    except Exception as e:
+        print(f"❌ Error en agente_consultar_stream: {str(e)}")
+        print(traceback.format_exc())
+        return formatear_respuesta_error(
+            500,
+            'Error interno del servidor',
+            'Ocurrió un error procesando la consulta'
+        )
+
+
+# ===== SERVIDOR HTTP PARA LAMBDA WEB ADAPTER =====
+class StreamingRequestHandler(BaseHTTPRequestHandler):
+    """Sirve la consulta como text/event-stream con transferencia chunked"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """Health check del adaptador"""
+        self._responder_json(200, {'status': 'ok'})
+
+    def do_OPTIONS(self):
+        """Preflight CORS"""
+        self.send_response(204)
+        self._cabeceras_cors()
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):
+        try:
+            longitud = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(longitud) or b'{}')
+            error, eventos = iniciar_consulta(body)
+        except json.JSONDecodeError:
+            error, eventos = formatear_respuesta_error(
+                400, 'JSON inválido', 'El body debe ser JSON válido'
+            ), None
+        except Exception as e:
+            print(f"❌ Error en agente_consultar_stream: {str(e)}")
+            print(traceback.format_exc())
+            error, eventos = formatear_respuesta_error(
+                500, 'Error interno del servidor', 'Ocurrió un error procesando la consulta'
+            ), None
+
+        if error:
+            self._responder_json(error['statusCode'], json.loads(error['body']))
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self._cabeceras_cors()
+        self.end_headers()
+
+        for evento in eventos:
+            self._escribir_chunk(evento.encode('utf-8'))
+        self._escribir_chunk(b'')
+
+    def _escribir_chunk(self, datos: bytes):
+        """Envía un chunk HTTP/1.1 y lo vacía de inmediato"""
+        self.wfile.write(f"{len(datos):X}\r\n".encode('ascii') + datos + b"\r\n")
+        self.wfile.flush()
+
+    def _responder_json(self, codigo: int, datos: Dict):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self._cabeceras_cors()
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _cabeceras_cors(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+
+
+def main():
+    """Arranca el servidor de streaming (Lambda Web Adapter o local)"""
+    puerto = int(os.getenv('PORT', '8080'))
+    print(f"🚀 Servidor de streaming escuchando en el puerto {puerto}")
+    HTTPServer(('0.0.0.0', puerto), StreamingRequestHandler).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
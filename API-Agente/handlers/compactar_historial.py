@@ -0,0 +1,32 @@
+"""
+Tarea programada que compacta el historial de interacciones
+"""
+import traceback
+
+from services.memoria_historial import CompactadorHistorial
+
+
+def handler(event, context):
+    """
+    Pliega en la memoria consolidada de cada usuario y contexto las
+    interacciones anteriores a las últimas MEMORIA_MANTENER_RECIENTES y borra
+    los registros plegados (evento programado de EventBridge)
+
+    Un evento con "usuarioId" compacta solo ese usuario.
+
+    Returns:
+        Estadísticas de la compactación
+    """
+    try:
+        compactador = CompactadorHistorial()
+
+        usuario_id = (event or {}).get('usuarioId')
+        if usuario_id:
+            return {'usuarios': 1, 'plegados': compactador.compactar_usuario(usuario_id)}
+
+        return compactador.compactar_todos()
+
+    except Exception as e:
+        print(f"❌ Error compactando historial: {str(e)}")
+        print(traceback.format_exc())
+        raise
@@ -0,0 +1,62 @@
+"""
+Worker que genera y guarda los resúmenes de interacciones diferidos
+"""
+import json
+import traceback
+
+from services.agente_service import AgenteService
+
+
+def handler(event, context):
+    """
+    Consumidor de la cola de resúmenes (evento SQS)
+
+    Cada mensaje contiene el intercambio crudo encolado por agente_consultar:
+    {
+        "usuarioId": "...",
+        "id": "id del registro de historial",
+        "contexto": "MentorAcademico" | "OrientadorVocacional" | "Psicologo",
+        "mensaje": "mensaje del usuario",
+        "respuesta": "respuesta del agente",
+        "timestamp": "..."
+    }
+
+    Proceso:
+    1. Genera el resumen con la estrategia del contexto
+       (Config.get_estrategia_resumen: 'extractivo' por defecto, o 'llm')
+    2. Guarda el resumen en el historial (el id viene del mensaje, así que
+       un reintento sobrescribe el mismo registro)
+
+    Returns:
+        Respuesta parcial de lote: solo los mensajes fallidos vuelven a la cola
+    """
+    fallidos = []
+    agente_service = None
+
+    for registro in event.get('Records', []):
+        message_id = registro.get('messageId')
+        try:
+            mensaje = json.loads(registro.get('body', '{}'))
+
+            if agente_service is None:
+                agente_service = AgenteService()
+
+            exito = agente_service.guardar_resumen_interaccion(
+                usuario_id=mensaje['usuarioId'],
+                mensaje_usuario=mensaje.get('mensaje', ''),
+                respuesta_agente=mensaje.get('respuesta', ''),
+                contexto=mensaje.get('contexto', ''),
+                interaccion_id=mensaje.get('id')
+            )
+
+            if not exito:
+                raise RuntimeError(f"No se pudo guardar el historial de {mensaje['usuarioId']}")
+
+            print(f"✅ Resumen guardado para usuario {mensaje['usuarioId']}")
+
+        except Exception as e:
+            print(f"❌ Error procesando resumen {message_id}: {str(e)}")
+            print(traceback.format_exc())
+            fallidos.append({'itemIdentifier': message_id})
+
+    return {'batchItemFailures': fallidos}
\ No newline at end of file
@@ -21,8 +21,8 @@ def handler(event, context):
     }
     
     Proceso:
-    1. Busca el usuario por correo
-    2. Actualiza el campo autorizacion
+    1. Busca el usuario por correo (la clave id + correo)
+    2. Actualiza solo el campo autorizacion con un UpdateItem
     3. Retorna el nuevo estado
     """
     try:
@@ -47,7 +47,8 @@ def handler(event, context):
                 'El campo "autorizacion" debe ser true o false'
             )
         
-        # 3. Obtener usuario por correo
+        # 3. Obtener la clave del usuario por correo (lectura directa de
+        # DynamoDB: los usuarios no se cachean entre invocaciones)
         usuarios_dao = DAOFactory.get_dao('usuarios')
         usuario = usuarios_dao.get_usuario_por_correo(correo)
         
@@ -58,12 +59,15 @@ def handler(event, context):
                 f'No existe usuario con correo {correo}'
             )
         
-        # 4. Actualizar autorización
-        usuario['autorizacion'] = autorizacion
-        
-        exito = usuarios_dao.actualizar_usuario(usuario)
+        # 4. Actualizar autorización: un UpdateItem condicionado a que el
+        # usuario exista, que retorna el registro actualizado (sin releer)
+        usuario = usuarios_dao.actualizar_autorizacion(
+            correo,
+            autorizacion,
+            usuario_id=usuario['id']
+        )
         
-        if not exito:
+        if not usuario:
             return formatear_respuesta_error(
                 500,
                 'Error al actualizar',
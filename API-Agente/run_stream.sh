@@ -0,0 +1,5 @@
+#!/bin/bash
+# Punto de entrada de agenteConsultarStream bajo Lambda Web Adapter:
+# el adaptador reenvía la invocación al servidor HTTP y transmite su respuesta
+cd "$LAMBDA_TASK_ROOT"
+exec python3 -m handlers.agente_consultar_stream
@@ -1,13 +1,21 @@
 """
 Servicio principal del sistema de agentes académicos
 """
-import uuid
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 from dao.base import DAOFactory
+from dao.historial_dao import id_interaccion
+from dao.contexto_solicitud import ContextoSolicitud
 from contextos.base_contexto import ContextoFactory
 from services.gemini_service import GeminiService
+from services.cola_resumenes import get_cola_resumenes
+from services.cache_respuestas import get_cache_respuestas
+from services.cache_semantico import get_cache_semantica, huella_perfil
+from services.recuperacion_historial import codificar_vector, seleccionar_historial
+from services.resumen_extractivo import ResumidorExtractivo
+from utils.identificadores import uuid7
 from config import Config
 
 
@@ -31,9 +39,18 @@ class AutorizacionRequeridaError(Exception):
 class AgenteService:
     """Servicio principal que orquesta la lógica del agente académico"""
     
-    def __init__(self):
-        """Inicializa el servicio y sus dependencias"""
+    def __init__(self, contexto_solicitud: Optional[ContextoSolicitud] = None):
+        """
+        Inicializa el servicio y sus dependencias
+        
+        Args:
+            contexto_solicitud: Contexto de la solicitud en curso. Memoiza las
+                                lecturas de DAOs para que cada tabla/clave se lea
+                                una sola vez por invocación.
+        """
+        self.contexto_solicitud = contexto_solicitud or ContextoSolicitud()
         self.gemini_service = GeminiService()
+        self.resumidor_extractivo = ResumidorExtractivo()
         self.usuarios_dao = DAOFactory.get_dao('usuarios')
         self.historial_dao = DAOFactory.get_dao('historial')
     
@@ -61,6 +78,123 @@ class AgenteService:
             ContextoInvalidoError: Si el contexto no es válido
             AutorizacionRequeridaError: Si el usuario no ha autorizado
         """
+        with self.contexto_solicitud:
+            usuario, datos_contexto, mensajes = self._preparar_mensajes(
+                correo, contexto, mensaje_usuario, historial_conversacion
+            )
+        
+            # 8. Buscar en la caché de respuestas (si está habilitada)
+            cache = get_cache_respuestas()
+            clave_cache = None
+            entrada_cache = None
+            
+            if cache is not None:
+                clave_cache = cache.calcular_clave(contexto, mensaje_usuario, mensajes[:-1])
+                entrada_cache = cache.obtener(clave_cache)
+            
+            # 8b. Si no hay coincidencia exacta, buscar una pregunta parecida
+            # del mismo estudiante con los mismos datos
+            cache_semantica = get_cache_semantica()
+            huella = None
+            
+            if entrada_cache is None and cache_semantica is not None:
+                huella = huella_perfil(datos_contexto)
+                entrada_cache = cache_semantica.buscar(contexto, huella, mensaje_usuario)
+                if entrada_cache is not None:
+                    print(f"🧭 Pregunta similar (coseno {entrada_cache['similitud']}): '{entrada_cache['mensaje']}'")
+            
+            if entrada_cache is not None:
+                respuesta_agente = entrada_cache['respuesta']
+                print(f"♻️ Respuesta desde caché (ahorra ~{entrada_cache.get('latencia_ms', 0)} ms)")
+            else:
+                # 9. Generar respuesta con Gemini
+                inicio = time.perf_counter()
+                respuesta_agente = self.gemini_service.generar_respuesta(mensajes)
+                latencia_ms = (time.perf_counter() - inicio) * 1000
+                
+                # Las respuestas de fallback (error de Gemini) no se cachean
+                if respuesta_agente != self.gemini_service.respuesta_fallback():
+                    if cache is not None:
+                        cache.guardar(clave_cache, contexto, respuesta_agente, latencia_ms)
+                    if cache_semantica is not None:
+                        cache_semantica.guardar(contexto, huella, mensaje_usuario, respuesta_agente, latencia_ms)
+        
+            # 10. Retornar resultado
+            return {
+                'respuesta': respuesta_agente,
+                'contexto': contexto,
+                'timestamp': datetime.now().isoformat(),
+                'desde_cache': entrada_cache is not None,
+                'usuario': {
+                    'correo': correo,
+                    'id': usuario.get('id')
+                }
+            }
+    
+    def procesar_consulta_streaming(
+        self,
+        correo: str,
+        contexto: str,
+        mensaje_usuario: str,
+        historial_conversacion: Optional[List[Dict]] = None
+    ) -> Dict:
+        """
+        Procesa una consulta entregando la respuesta a medida que Gemini la genera
+        
+        Las validaciones y la carga de datos se hacen de inmediato (antes del
+        primer fragmento), de modo que los errores se pueden responder con su
+        código HTTP antes de abrir el stream.
+        
+        Args:
+            correo: Email del usuario
+            contexto: Tipo de contexto (MentorAcademico, OrientadorVocacional, Psicologo)
+            mensaje_usuario: Mensaje del usuario
+            historial_conversacion: Historial previo de conversaciones (ya cargado)
+        
+        Returns:
+            Diccionario con 'usuario' y 'fragmentos' (iterador de chunks de
+            texto que lanza la excepción de Gemini si la generación falla)
+        
+        Raises:
+            UsuarioNoEncontradoError: Si el usuario no existe
+            ContextoInvalidoError: Si el contexto no es válido
+            AutorizacionRequeridaError: Si el usuario no ha autorizado
+        """
+        with self.contexto_solicitud:
+            usuario, _, mensajes = self._preparar_mensajes(
+                correo, contexto, mensaje_usuario, historial_conversacion
+            )
+        
+        return {
+            'usuario': {
+                'correo': correo,
+                'id': usuario.get('id')
+            },
+            'contexto': contexto,
+            # Sin fallback: un fallo de Gemini llega al handler como excepción
+            # (evento 'error') y no como una disculpa que se resumiría al historial
+            'fragmentos': self.gemini_service.generar_respuesta_streaming(mensajes, con_fallback=False)
+        }
+    
+    def _preparar_mensajes(
+        self,
+        correo: str,
+        contexto: str,
+        mensaje_usuario: str,
+        historial_conversacion: Optional[List[Dict]] = None
+    ) -> Tuple[Dict, Dict, List[Dict]]:
+        """
+        Valida la consulta y construye los mensajes para Gemini
+        
+        Args:
+            correo: Email del usuario
+            contexto: Tipo de contexto
+            mensaje_usuario: Mensaje del usuario
+            historial_conversacion: Historial previo de conversaciones
+        
+        Returns:
+            Tupla (usuario, datos del contexto, mensajes)
+        """
         # 1. Validar contexto
         if contexto not in Config.CONTEXTOS_DISPONIBLES:
             raise ContextoInvalidoError(
@@ -69,7 +203,8 @@ class AgenteService:
             )
         
         # 2. Validar que usuario existe
-        usuario = self.usuarios_dao.get_usuario_por_correo(correo)
+        # Lectura directa: la autorización se revoca desde otra Lambda
+        usuario = self.usuarios_dao.get_usuario_por_correo(correo, usar_cache=False)
         if not usuario:
             raise UsuarioNoEncontradoError(
                 f"Usuario con correo '{correo}' no encontrado"
@@ -82,14 +217,21 @@ class AgenteService:
             )
         
         # 4. Obtener procesador de contexto
-        procesador = ContextoFactory.get_contexto(contexto)
+        procesador = ContextoFactory.get_contexto(
+            contexto,
+            contexto_solicitud=self.contexto_solicitud
+        )
         
         # 5. Construir datos del contexto
         datos_contexto = procesador.build_context_data(correo)
         
-        # 6. Construir prompt completo
+        # 6. Construir prompt completo (con la recuperación por relevancia,
+        # solo las interacciones más parecidas al mensaje)
         usuario_data = datos_contexto.get('usuario', usuario)
-        historial_data = datos_contexto.get('historial', [])
+        historial_data = seleccionar_historial(
+            datos_contexto.get('historial', []),
+            mensaje_usuario
+        )
         
         prompt_sistema = procesador.get_prompt_instructions(
             usuario=usuario_data,
@@ -117,19 +259,7 @@ class AgenteService:
             'content': mensaje_usuario
         })
         
-        # 8. Generar respuesta con Gemini
-        respuesta_agente = self.gemini_service.generar_respuesta(mensajes)
-        
-        # 9. Retornar resultado
-        return {
-            'respuesta': respuesta_agente,
-            'contexto': contexto,
-            'timestamp': datetime.now().isoformat(),
-            'usuario': {
-                'correo': correo,
-                'id': usuario.get('id')
-            }
-        }
+        return usuario, datos_contexto, mensajes
     
     def generar_resumen_interaccion(
         self,
@@ -140,6 +270,9 @@ class AgenteService:
         """
         Genera un resumen conciso de la interacción para guardar en historial
         
+        La estrategia se elige por contexto (Config.RESUMEN_ESTRATEGIA_POR_CONTEXTO):
+        'extractivo' lo resuelve localmente; 'llm' usa Gemini.
+        
         Args:
             mensaje_usuario: Mensaje original del usuario
             respuesta_agente: Respuesta generada por el agente
@@ -148,6 +281,13 @@ class AgenteService:
         Returns:
             String con el resumen de la interacción
         """
+        if Config.get_estrategia_resumen(contexto) != 'llm':
+            return self.resumidor_extractivo.resumir(
+                mensaje_usuario=mensaje_usuario,
+                respuesta_agente=respuesta_agente,
+                contexto=contexto
+            )
+        
         try:
             # Construir prompt para generar resumen
             prompt_resumen = f"""
@@ -167,12 +307,13 @@ Formato del resumen: "[{contexto}] Usuario consultó sobre X. Se orientó sobre
 Resumen:
 """
             
-            # Generar resumen con Gemini
+            # Generar resumen con Gemini (sin el mensaje de disculpa: si falla,
+            # el resumen extractivo de abajo es el respaldo)
             mensajes_resumen = [
                 {'role': 'user', 'content': prompt_resumen}
             ]
             
-            resumen = self.gemini_service.generar_respuesta(mensajes_resumen)
+            resumen = self.gemini_service.generar_respuesta(mensajes_resumen, con_fallback=False)
             
             # Limpiar y limitar longitud
             resumen = resumen.strip().replace('\n', ' ')
@@ -183,20 +324,94 @@ Resumen:
         
         except Exception as e:
             print(f"⚠️ Error generando resumen: {str(e)}")
-            # Fallback: crear resumen manual simple
-            contexto_emoji = {
-                'MentorAcademico': '🎓',
-                'OrientadorVocacional': '🧭',
-                'Psicologo': '🧠'
-            }.get(contexto, '💬')
-            
-            mensaje_corto = mensaje_usuario[:50].strip()
-            return f"{contexto_emoji} [{contexto}] Usuario: {mensaje_corto}..."
+            # Fallback: resumen extractivo local
+            return self.resumidor_extractivo.resumir(
+                mensaje_usuario=mensaje_usuario,
+                respuesta_agente=respuesta_agente,
+                contexto=contexto
+            )
+    
+    def guardar_resumen_interaccion(
+        self,
+        usuario_id: str,
+        mensaje_usuario: str,
+        respuesta_agente: str,
+        contexto: str,
+        interaccion_id: Optional[str] = None
+    ) -> bool:
+        """
+        Genera el resumen de una interacción y lo guarda en el historial
+        
+        Args:
+            usuario_id: ID del usuario
+            mensaje_usuario: Mensaje original del usuario
+            respuesta_agente: Respuesta generada por el agente
+            contexto: Contexto del agente utilizado
+            interaccion_id: UUID v7 del registro de historial (reintentos
+                            idempotentes); la sort key le antepone el contexto
+        
+        Returns:
+            True si se guardó en el historial
+        """
+        resumen = self.generar_resumen_interaccion(
+            mensaje_usuario=mensaje_usuario,
+            respuesta_agente=respuesta_agente,
+            contexto=contexto
+        )
+        
+        registro_historial = {
+            'usuarioId': usuario_id,
+            # '<contexto>#<UUID v7>': cada agente lee solo su contexto
+            'id': id_interaccion(contexto, interaccion_id),
+            'texto': resumen,
+            'contexto': contexto
+        }
+        if Config.HISTORIAL_RECUPERACION_HABILITADA:
+            # Vector del resumen para seleccionar el historial por relevancia
+            registro_historial['vector'] = codificar_vector(resumen)
+        
+        return self.historial_dao.agregar_interaccion(registro_historial)
+    
+    def encolar_resumen_interaccion(
+        self,
+        usuario_id: str,
+        mensaje_usuario: str,
+        respuesta_agente: str,
+        contexto: str
+    ) -> bool:
+        """
+        Encola el intercambio crudo para que el worker genere y guarde el resumen
+        
+        Args:
+            usuario_id: ID del usuario
+            mensaje_usuario: Mensaje original del usuario
+            respuesta_agente: Respuesta generada por el agente
+            contexto: Contexto del agente utilizado
+        
+        Returns:
+            True si quedó encolado (False sin cola disponible: el llamador
+            resume en línea)
+        """
+        mensaje = {
+            'usuarioId': usuario_id,
+            # Id ordenado por tiempo: fija el orden de la interacción en el
+            # historial aunque el worker la procese más tarde
+            'id': uuid7(),
+            'contexto': contexto,
+            'mensaje': mensaje_usuario,
+            'respuesta': respuesta_agente,
+            'timestamp': datetime.now().isoformat()
+        }
+        cola = get_cola_resumenes()
+        if cola is None:
+            return False
+        return cola.enviar(mensaje)
     
     def obtener_historial_usuario(
         self,
         correo: str,
-        limite: Optional[int] = None
+        limite: Optional[int] = None,
+        contexto: Optional[str] = None
     ) -> List[Dict]:
         """
         Obtiene el historial de interacciones de un usuario
@@ -204,6 +419,7 @@ Resumen:
         Args:
             correo: Email del usuario
             limite: Número máximo de registros a retornar
+            contexto: Contexto del agente (None para todos los contextos)
         
         Returns:
             Lista de interacciones
@@ -211,7 +427,8 @@ Resumen:
         try:
             return self.historial_dao.get_historial_usuario(
                 correo,
-                limit=limite or Config.LIMITE_HISTORIAL
+                limit=limite or Config.LIMITE_HISTORIAL,
+                contexto=contexto
             )
         except Exception as e:
             print(f"Error obteniendo historial: {str(e)}")
@@ -0,0 +1,189 @@
+"""
+Caché de respuestas del agente por coincidencia exacta
+
+La clave es un hash de:
+- el contexto,
+- el mensaje normalizado (minúsculas, sin tildes ni puntuación),
+- una huella del prompt con el que se generaría la respuesta (instrucciones,
+  datos del contexto e historial), de modo que cualquier cambio en el perfil o
+  el historial del estudiante produce otra clave.
+
+L1: CacheTTL en memoria del contenedor. L2: tabla DynamoDB con TTL nativo.
+
+Los aciertos se cuentan en memoria y se vuelcan a la tabla, tanto al guardar
+una respuesta nueva como en un acierto, cuando pasaron
+CACHE_RESPUESTAS_VOLCADO_SEGUNDOS o hay CACHE_RESPUESTAS_VOLCADO_MAX_PENDIENTES
+sin volcar: la mayoría de los aciertos no escribe en DynamoDB y, si el
+contenedor se recicla, se pierden a lo sumo los de ese intervalo.
+
+Una entrada promovida de L2 a L1 vive en L1 como máximo hasta su 'expira'.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dao.base import DAOFactory
+from dao.cache import CacheTTL
+from config import Config
+from utils.formatters import normalizar_texto
+
+
+def huella_prompt(mensajes: List[Dict]) -> str:
+    """
+    Huella de los mensajes que preceden a la consulta (prompt del sistema con
+    datos del contexto e historial, y conversación previa)
+
+    Args:
+        mensajes: Mensajes para Gemini sin el mensaje actual del usuario
+
+    Returns:
+        sha256 hexadecimal
+    """
+    serializado = json.dumps(mensajes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+
+class CacheRespuestas:
+    """Caché de dos niveles para respuestas del agente"""
+
+    def __init__(self):
+        self.l1 = CacheTTL(
+            'respuestas',
+            ttl_segundos=Config.CACHE_RESPUESTAS_L1_TTL_SEGUNDOS,
+            max_entradas=Config.CACHE_RESPUESTAS_L1_MAX_ENTRADAS
+        )
+        self.dao = DAOFactory.get_dao('cache_respuestas')
+        self.aciertos_l2 = 0
+        self.latencia_ahorrada_ms = 0.0
+        self.aciertos_pendientes: Counter = Counter()
+        self.ultimo_volcado = time.time()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def calcular_clave(contexto: str, mensaje_usuario: str, mensajes_previos: List[Dict]) -> str:
+        """
+        Calcula la clave de caché de una consulta
+
+        Args:
+            contexto: Contexto del agente
+            mensaje_usuario: Mensaje actual del usuario
+            mensajes_previos: Mensajes del prompt que preceden al mensaje actual
+
+        Returns:
+            sha256 hexadecimal
+        """
+        partes = '\n'.join([
+            contexto,
+            normalizar_texto(mensaje_usuario),
+            huella_prompt(mensajes_previos)
+        ])
+        return hashlib.sha256(partes.encode('utf-8')).hexdigest()
+
+    def obtener(self, clave: str) -> Optional[Dict]:
+        """
+        Busca una respuesta cacheada (L1 y luego L2)
+
+        Args:
+            clave: Clave de la consulta
+
+        Returns:
+            Entrada con 'respuesta' y 'latencia_ms', o None
+        """
+        encontrado, entrada = self.l1.obtener(clave)
+
+        if not encontrado:
+            entrada = self.dao.get_entrada(clave)
+            if entrada is None:
+                return None
+            self.aciertos_l2 += 1
+            self.l1.guardar(clave, entrada, ttl_segundos=float(entrada['expira']) - time.time())
+
+        with self._lock:
+            self.aciertos_pendientes[clave] += 1
+        self.latencia_ahorrada_ms += float(entrada.get('latencia_ms', 0))
+        self._volcar_si_corresponde()
+        return entrada
+
+    def guardar(self, clave: str, contexto: str, respuesta: str, latencia_ms: float) -> bool:
+        """
+        Guarda una respuesta generada en ambos niveles
+
+        Args:
+            clave: Clave de la consulta
+            contexto: Contexto del agente
+            respuesta: Respuesta generada por Gemini
+            latencia_ms: Lo que tardó generarla (lo que ahorra cada acierto)
+
+        Returns:
+            True si se guardó en DynamoDB
+        """
+        entrada = {
+            'clave': clave,
+            'contexto': contexto,
+            'respuesta': respuesta,
+            'latencia_ms': round(latencia_ms, 1),
+            'aciertos': 0,
+            'creado': datetime.now().isoformat(),
+            'expira': int(time.time()) + Config.CACHE_RESPUESTAS_TTL_SEGUNDOS
+        }
+        self.l1.guardar(clave, entrada, ttl_segundos=Config.CACHE_RESPUESTAS_TTL_SEGUNDOS)
+        guardado = self.dao.guardar_entrada(entrada)
+
+        self._volcar_si_corresponde()
+        return guardado
+
+    def _volcar_si_corresponde(self):
+        """Vuelca los aciertos si pasó el intervalo o se acumularon demasiados"""
+        with self._lock:
+            pendientes = sum(self.aciertos_pendientes.values())
+            vencido = time.time() - self.ultimo_volcado >= Config.CACHE_RESPUESTAS_VOLCADO_SEGUNDOS
+        if pendientes and (vencido or pendientes >= Config.CACHE_RESPUESTAS_VOLCADO_MAX_PENDIENTES):
+            self.volcar_aciertos()
+
+    def volcar_aciertos(self) -> int:
+        """
+        Suma a la tabla los aciertos contados en memoria (un UpdateItem por clave)
+
+        Returns:
+            Número de entradas actualizadas
+        """
+        with self._lock:
+            pendientes = self.aciertos_pendientes
+            self.aciertos_pendientes = Counter()
+            self.ultimo_volcado = time.time()
+
+        return sum(
+            1 for clave, cantidad in pendientes.items()
+            if self.dao.registrar_acierto(clave, cantidad)
+        )
+
+    def estadisticas(self) -> Dict:
+        """Contadores del caché de respuestas (para métricas)"""
+        return {
+            **self.l1.estadisticas(),
+            'aciertos_l2': self.aciertos_l2,
+            'aciertos_pendientes': sum(self.aciertos_pendientes.values()),
+            'latencia_ahorrada_ms': round(self.latencia_ahorrada_ms, 1)
+        }
+
+
+_cache_respuestas: Optional[CacheRespuestas] = None
+
+
+def get_cache_respuestas() -> Optional[CacheRespuestas]:
+    """
+    Obtiene la caché de respuestas (singleton por contenedor)
+
+    Returns:
+        CacheRespuestas, o None si CACHE_RESPUESTAS_HABILITADO es false
+    """
+    global _cache_respuestas
+    if not Config.CACHE_RESPUESTAS_HABILITADO:
+        return None
+    if _cache_respuestas is None:
+        _cache_respuestas = CacheRespuestas()
+    return _cache_respuestas
\ No newline at end of file
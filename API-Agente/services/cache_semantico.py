@@ -0,0 +1,483 @@
+"""
+Caché semántica de respuestas del agente (preguntas casi duplicadas)
+
+Complementa la caché exacta: "cómo subo mis notas" y "qué hago para mejorar
+mi promedio" normalizan distinto, pero sus vectores (utils.vectorizador) son
+casi iguales. Cada contexto tiene un índice en memoria con los mensajes ya
+respondidos; una consulta reutiliza la respuesta del vecino más cercano si:
+- pertenece a la misma huella de perfil (mismo estudiante y mismos datos), y
+- la similitud coseno supera el umbral (CACHE_SEMANTICO_UMBRAL).
+
+El índice desaloja la entrada menos usada al llenarse, descarta las vencidas y
+se persiste como .npz en disco local o S3 (CACHE_SEMANTICO_URI).
+
+Benchmark contra una traza de mensajes:
+
+    python -m services.cache_semantico                       # traza de ejemplo
+    python -m services.cache_semantico --traza traza.jsonl --umbral 0.6 0.7 0.8
+
+Cada línea de la traza es {"contexto", "mensaje", "huella"?, "grupo"?}; si
+trae "grupo" (intención etiquetada) se reporta también la precisión.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from utils.vectorizador import VectorizadorHashing
+
+
+def huella_perfil(datos_contexto: Dict) -> str:
+    """
+    Huella de los datos del estudiante que usa el contexto (sin el historial,
+    que cambia en cada consulta)
+
+    Args:
+        datos_contexto: Datos cargados por el contexto
+
+    Returns:
+        sha256 hexadecimal
+    """
+    perfil = {k: v for k, v in datos_contexto.items() if k != 'historial'}
+    serializado = json.dumps(perfil, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+
+class IndiceSemantico:
+    """Índice de vecinos más cercanos (coseno) particionado por huella de perfil"""
+
+    def __init__(self, dimension: int, max_entradas: int, ttl_segundos: int):
+        """
+        Args:
+            dimension: Dimensión de los vectores
+            max_entradas: Filas máximas antes de desalojar la menos usada
+            ttl_segundos: Vigencia de cada entrada
+        """
+        self.dimension = dimension
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+
+        self.vectores = np.zeros((max_entradas, dimension), dtype=np.float32)
+        self.ultimo_uso = np.zeros(max_entradas, dtype=np.float64)
+        self.creado = np.zeros(max_entradas, dtype=np.float64)
+        self.entradas: List[Optional[Dict]] = [None] * max_entradas
+        self.filas_por_huella: Dict[str, List[int]] = {}
+        self.filas_libres = list(range(max_entradas - 1, -1, -1))
+        self.desalojos = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.max_entradas - len(self.filas_libres)
+
+    def buscar(self, vector: np.ndarray, huella: str, umbral: float) -> Optional[Tuple[Dict, float]]:
+        """
+        Busca el mensaje más parecido respondido para la misma huella
+
+        Args:
+            vector: Vector normalizado del mensaje
+            huella: Huella de perfil
+            umbral: Similitud coseno mínima
+
+        Returns:
+            Tupla (entrada, similitud) o None
+        """
+        with self._lock:
+            filas = self.filas_por_huella.get(huella)
+            if not filas or not vector.any():
+                return None
+
+            ahora = time.time()
+            vencidas = [f for f in filas if ahora - self.creado[f] > self.ttl_segundos]
+            for fila in vencidas:
+                self._liberar(fila)
+            filas = self.filas_por_huella.get(huella)
+            if not filas:
+                return None
+
+            similitudes = self.vectores[filas] @ vector
+            mejor = int(np.argmax(similitudes))
+            similitud = float(similitudes[mejor])
+            if similitud < umbral:
+                return None
+
+            fila = filas[mejor]
+            self.ultimo_uso[fila] = ahora
+            return dict(self.entradas[fila]), similitud
+
+    def agregar(self, vector: np.ndarray, huella: str, entrada: Dict):
+        """
+        Agrega un mensaje respondido (desaloja la fila menos usada si está lleno)
+
+        Args:
+            vector: Vector normalizado del mensaje
+            huella: Huella de perfil
+            entrada: Datos a devolver en un acierto (respuesta, mensaje, ...)
+        """
+        if not vector.any():
+            return
+
+        with self._lock:
+            if not self.filas_libres:
+                ocupadas = np.flatnonzero(self.creado > 0)
+                self._liberar(int(ocupadas[np.argmin(self.ultimo_uso[ocupadas])]))
+                self.desalojos += 1
+
+            fila = self.filas_libres.pop()
+            ahora = time.time()
+            self.vectores[fila] = vector
+            self.creado[fila] = ahora
+            self.ultimo_uso[fila] = ahora
+            self.entradas[fila] = {**entrada, 'huella': huella}
+            self.filas_por_huella.setdefault(huella, []).append(fila)
+
+    def _liberar(self, fila: int):
+        """Quita una fila del índice (debe llamarse con el lock tomado)"""
+        huella = self.entradas[fila]['huella']
+        filas = self.filas_por_huella[huella]
+        filas.remove(fila)
+        if not filas:
+            del self.filas_por_huella[huella]
+
+        self.vectores[fila] = 0
+        self.creado[fila] = 0
+        self.ultimo_uso[fila] = 0
+        self.entradas[fila] = None
+        self.filas_libres.append(fila)
+
+    def serializar(self) -> bytes:
+        """
+        Serializa las filas ocupadas como .npz comprimido (sin pickle)
+
+        Returns:
+            Contenido del archivo .npz
+        """
+        with self._lock:
+            filas = [f for f in range(self.max_entradas) if self.entradas[f] is not None]
+            metadatos = json.dumps([self.entradas[f] for f in filas], ensure_ascii=False, default=str)
+            buffer = io.BytesIO()
+            np.savez_compressed(
+                buffer,
+                vectores=self.vectores[filas],
+                creado=self.creado[filas],
+                ultimo_uso=self.ultimo_uso[filas],
+                metadatos=np.frombuffer(metadatos.encode('utf-8'), dtype=np.uint8)
+            )
+            return buffer.getvalue()
+
+    def deserializar(self, contenido: bytes):
+        """
+        Carga filas desde un .npz (las vencidas o de otra dimensión se ignoran)
+
+        Args:
+            contenido: Contenido del archivo .npz
+        """
+        with np.load(io.BytesIO(contenido), allow_pickle=False) as datos:
+            vectores = datos['vectores']
+            creado = datos['creado']
+            ultimo_uso = datos['ultimo_uso']
+            entradas = json.loads(datos['metadatos'].tobytes().decode('utf-8'))
+
+        if vectores.ndim != 2 or vectores.shape[1] != self.dimension:
+            print(f"⚠️ Índice semántico con dimensión {vectores.shape}, se ignora")
+            return
+
+        ahora = time.time()
+        # Las más usadas al final, para que sobrevivan si no caben todas
+        for i in np.argsort(ultimo_uso):
+            if ahora - creado[i] > self.ttl_segundos:
+                continue
+            entrada = dict(entradas[i])
+            huella = entrada.pop('huella')
+            self.agregar(vectores[i], huella, entrada)
+            fila = self.filas_por_huella[huella][-1]
+            self.creado[fila] = creado[i]
+            self.ultimo_uso[fila] = ultimo_uso[i]
+
+
+class CacheSemantica:
+    """Un IndiceSemantico por contexto, con persistencia en disco local o S3"""
+
+    def __init__(
+        self,
+        umbral: float = None,
+        max_entradas: int = None,
+        ttl_segundos: int = None,
+        uri: Optional[str] = None,
+        dimension: int = None
+    ):
+        self.umbral = umbral if umbral is not None else Config.CACHE_SEMANTICO_UMBRAL
+        self.max_entradas = max_entradas or Config.CACHE_SEMANTICO_MAX_ENTRADAS
+        self.ttl_segundos = ttl_segundos or Config.CACHE_SEMANTICO_TTL_SEGUNDOS
+        self.uri = uri if uri is not None else Config.CACHE_SEMANTICO_URI
+        self.vectorizador = VectorizadorHashing(dimension or Config.CACHE_SEMANTICO_DIMENSION)
+        self.indices: Dict[str, IndiceSemantico] = {}
+        self.modificados = set()
+        self.ultima_persistencia = time.time()
+        self.aciertos = 0
+        self.fallos = 0
+        self.latencia_ahorrada_ms = 0.0
+        self._lock = threading.Lock()
+
+    def _indice(self, contexto: str) -> IndiceSemantico:
+        """Obtiene (o crea y carga) el índice de un contexto"""
+        with self._lock:
+            if contexto not in self.indices:
+                indice = IndiceSemantico(
+                    self.vectorizador.dimension,
+                    self.max_entradas,
+                    self.ttl_segundos
+                )
+                contenido = self._leer(contexto)
+                if contenido:
+                    try:
+                        indice.deserializar(contenido)
+                        print(f"✅ Índice semántico '{contexto}' cargado: {len(indice)} entradas")
+                    except Exception as e:
+                        print(f"⚠️ No se pudo cargar el índice semántico '{contexto}': {str(e)}")
+                self.indices[contexto] = indice
+            return self.indices[contexto]
+
+    def buscar(self, contexto: str, huella: str, mensaje_usuario: str) -> Optional[Dict]:
+        """
+        Busca una respuesta a una pregunta casi idéntica
+
+        Args:
+            contexto: Contexto del agente
+            huella: Huella de perfil del estudiante
+            mensaje_usuario: Mensaje actual del usuario
+
+        Returns:
+            Entrada con 'respuesta', 'mensaje', 'latencia_ms' y 'similitud', o None
+        """
+        vector = self.vectorizador.vectorizar(mensaje_usuario)
+        resultado = self._indice(contexto).buscar(vector, huella, self.umbral)
+
+        if resultado is None:
+            self.fallos += 1
+            return None
+
+        entrada, similitud = resultado
+        self.aciertos += 1
+        self.latencia_ahorrada_ms += float(entrada.get('latencia_ms', 0))
+        entrada['similitud'] = round(similitud, 4)
+        return entrada
+
+    def guardar(self, contexto: str, huella: str, mensaje_usuario: str, respuesta: str, latencia_ms: float):
+        """
+        Agrega una respuesta generada al índice del contexto
+
+        Args:
+            contexto: Contexto del agente
+            huella: Huella de perfil del estudiante
+            mensaje_usuario: Mensaje que originó la respuesta
+            respuesta: Respuesta generada por Gemini
+            latencia_ms: Lo que tardó generarla
+        """
+        vector = self.vectorizador.vectorizar(mensaje_usuario)
+        self._indice(contexto).agregar(vector, huella, {
+            'mensaje': mensaje_usuario,
+            'respuesta': respuesta,
+            'latencia_ms': round(latencia_ms, 1)
+        })
+        self.modificados.add(contexto)
+
+        if time.time() - self.ultima_persistencia >= Config.CACHE_SEMANTICO_PERSISTIR_SEGUNDOS:
+            self.persistir()
+
+    def persistir(self) -> bool:
+        """
+        Escribe los índices modificados en CACHE_SEMANTICO_URI
+
+        Returns:
+            True si todos se escribieron (o no hay destino configurado)
+        """
+        self.ultima_persistencia = time.time()
+        if not self.uri:
+            self.modificados.clear()
+            return True
+
+        exito = True
+        for contexto in list(self.modificados):
+            try:
+                self._escribir(contexto, self.indices[contexto].serializar())
+                self.modificados.discard(contexto)
+            except Exception as e:
+                print(f"Error persistiendo índice semántico '{contexto}': {str(e)}")
+                exito = False
+        return exito
+
+    def _ruta(self, contexto: str) -> str:
+        return f"{self.uri.rstrip('/')}/{contexto}.npz"
+
+    def _leer(self, contexto: str) -> Optional[bytes]:
+        """Lee el .npz de un contexto (None si no existe o no hay URI)"""
+        if not self.uri:
+            return None
+        ruta = self._ruta(contexto)
+
+        try:
+            if ruta.startswith('s3://'):
+                bucket, clave = ruta[5:].split('/', 1)
+                return _s3().get_object(Bucket=bucket, Key=clave)['Body'].read()
+            if os.path.exists(ruta):
+                with open(ruta, 'rb') as archivo:
+                    return archivo.read()
+        except Exception as e:
+            print(f"⚠️ No se pudo leer {ruta}: {str(e)}")
+        return None
+
+    def _escribir(self, contexto: str, contenido: bytes):
+        """Escribe el .npz de un contexto en S3 o disco (escritura atómica)"""
+        ruta = self._ruta(contexto)
+
+        if ruta.startswith('s3://'):
+            bucket, clave = ruta[5:].split('/', 1)
+            _s3().put_object(Bucket=bucket, Key=clave, Body=contenido)
+            return
+
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'wb') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+
+    def estadisticas(self) -> Dict:
+        """Contadores de la caché semántica (para métricas)"""
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / consultas, 3) if consultas else 0.0,
+            'latencia_ahorrada_ms': round(self.latencia_ahorrada_ms, 1),
+            'entradas': {contexto: len(indice) for contexto, indice in self.indices.items()},
+            'desalojos': sum(indice.desalojos for indice in self.indices.values()),
+            'umbral': self.umbral
+        }
+
+
+def _s3():
+    import boto3
+    return boto3.client('s3', region_name=Config.AWS_REGION)
+
+
+_cache_semantica: Optional[CacheSemantica] = None
+
+
+def get_cache_semantica() -> Optional[CacheSemantica]:
+    """
+    Obtiene la caché semántica (singleton por contenedor)
+
+    Returns:
+        CacheSemantica, o None si CACHE_SEMANTICO_HABILITADO es false
+    """
+    global _cache_semantica
+    if not Config.CACHE_SEMANTICO_HABILITADO:
+        return None
+    if _cache_semantica is None:
+        _cache_semantica = CacheSemantica()
+    return _cache_semantica
+
+
+# ===== BENCHMARK =====
+TRAZA_EJEMPLO = [
+    ('MentorAcademico', 'promedio', 'cómo subo mis notas'),
+    ('MentorAcademico', 'promedio', 'qué hago para mejorar mi promedio'),
+    ('MentorAcademico', 'promedio', 'Cómo puedo mejorar mis calificaciones?'),
+    ('MentorAcademico', 'estudio', 'qué técnicas de estudio me recomiendas'),
+    ('MentorAcademico', 'estudio', 'cuáles son buenas técnicas para estudiar'),
+    ('MentorAcademico', 'reprobar', 'me jalaron en cálculo, qué hago'),
+    ('MentorAcademico', 'reprobar', 'desaprobé cálculo y no sé qué hacer'),
+    ('MentorAcademico', 'tiempo', 'cómo organizo mi tiempo para los exámenes'),
+    ('MentorAcademico', 'tiempo', 'cómo organizar mi tiempo en semana de parciales'),
+    ('MentorAcademico', 'promedio', 'quiero subir mi promedio este ciclo'),
+    ('OrientadorVocacional', 'carrera', 'qué carrera me conviene estudiar'),
+    ('OrientadorVocacional', 'carrera', 'qué profesión debería elegir'),
+    ('OrientadorVocacional', 'cambio', 'estoy pensando en cambiarme de carrera'),
+    ('OrientadorVocacional', 'cambio', 'debería cambiar de carrera?'),
+    ('OrientadorVocacional', 'trabajo', 'qué salidas laborales tiene mi carrera'),
+    ('Psicologo', 'ansiedad', 'me siento muy ansioso por los exámenes'),
+    ('Psicologo', 'ansiedad', 'tengo mucha ansiedad antes de los parciales'),
+    ('Psicologo', 'estres', 'estoy muy estresado con la universidad'),
+    ('Psicologo', 'estres', 'el estrés de la universidad me supera'),
+    ('Psicologo', 'sueno', 'no puedo dormir bien'),
+    ('Psicologo', 'ansiedad', 'me pongo nervioso en los exámenes'),
+]
+
+
+def _leer_traza(ruta: Optional[str]) -> List[Dict]:
+    """Carga una traza JSONL o devuelve la de ejemplo"""
+    if not ruta:
+        return [
+            {'contexto': contexto, 'grupo': grupo, 'mensaje': mensaje, 'huella': 'demo'}
+            for contexto, grupo, mensaje in TRAZA_EJEMPLO
+        ]
+    with open(ruta, encoding='utf-8') as archivo:
+        return [json.loads(linea) for linea in archivo if linea.strip()]
+
+
+def benchmark(traza: List[Dict], umbral: float) -> Dict:
+    """
+    Reproduce una traza contra una caché vacía: cada fallo se "responde" y se
+    agrega al índice, cada acierto se compara con el grupo de la pregunta
+
+    Args:
+        traza: Consultas con contexto, mensaje y opcionalmente huella y grupo
+        umbral: Similitud coseno mínima
+
+    Returns:
+        Métricas del recorrido
+    """
+    cache = CacheSemantica(umbral=umbral, uri='', ttl_segundos=10 ** 9)
+    tiempos = []
+    correctos = 0
+    con_grupo = 0
+
+    for consulta in traza:
+        contexto = consulta['contexto']
+        huella = consulta.get('huella', 'traza')
+        mensaje = consulta['mensaje']
+        grupo = consulta.get('grupo')
+
+        inicio = time.perf_counter()
+        entrada = cache.buscar(contexto, huella, mensaje)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+        if entrada is None:
+            cache.guardar(contexto, huella, mensaje, grupo or mensaje, 0.0)
+        elif grupo is not None:
+            con_grupo += 1
+            correctos += entrada['respuesta'] == grupo
+
+    tiempos = np.asarray(tiempos)
+    return {
+        'umbral': umbral,
+        'consultas': len(traza),
+        'aciertos': cache.aciertos,
+        'tasa_aciertos': cache.estadisticas()['tasa_aciertos'],
+        'precision': round(correctos / con_grupo, 3) if con_grupo else None,
+        'busqueda_ms_p50': round(float(np.percentile(tiempos, 50)), 3) if len(tiempos) else 0.0,
+        'busqueda_ms_p99': round(float(np.percentile(tiempos, 99)), 3) if len(tiempos) else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la caché semántica')
+    parser.add_argument('--traza', help='Archivo JSONL con {contexto, mensaje, huella?, grupo?}')
+    parser.add_argument('--umbral', type=float, nargs='+', default=[Config.CACHE_SEMANTICO_UMBRAL])
+    args = parser.parse_args()
+
+    traza = _leer_traza(args.traza)
+    print(f"📊 Traza: {len(traza)} consultas")
+    for umbral in args.umbral:
+        print(json.dumps(benchmark(traza, umbral), ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
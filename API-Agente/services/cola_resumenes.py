@@ -0,0 +1,149 @@
+"""
+Cola de resúmenes diferidos de interacciones
+
+En modo diferido (Config.RESUMEN_MODO = 'diferido') agente_consultar encola el
+intercambio crudo y responde de inmediato; el worker procesar_resumen genera el
+resumen con la estrategia configurada para el contexto
+(Config.get_estrategia_resumen: extractivo local o Gemini) y escribe el
+registro de Historial.
+"""
+import json
+import os
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import boto3
+
+from config import Config
+
+
+class ColaSQS:
+    """Cola de resúmenes respaldada por Amazon SQS"""
+
+    def __init__(self, url_cola: str):
+        """
+        Args:
+            url_cola: URL de la cola SQS
+        """
+        self.url_cola = url_cola
+        self.sqs = boto3.client('sqs')
+
+    def enviar(self, mensaje: Dict) -> bool:
+        """
+        Encola un intercambio para resumir
+
+        Args:
+            mensaje: Intercambio crudo (ver AgenteService.encolar_resumen_interaccion)
+
+        Returns:
+            True si fue encolado
+        """
+        try:
+            self.sqs.send_message(
+                QueueUrl=self.url_cola,
+                MessageBody=json.dumps(mensaje, ensure_ascii=False)
+            )
+            return True
+        except Exception as e:
+            print(f"❌ Error encolando resumen en SQS: {str(e)}")
+            return False
+
+
+class ColaEnMemoria:
+    """
+    Sustituto en memoria de la cola SQS para desarrollo y pruebas locales
+
+    Los mensajes se quedan en el proceso hasta que se llama a procesar_pendientes,
+    que los entrega al worker con la misma forma que un evento SQS.
+    """
+
+    def __init__(self):
+        self._mensajes = deque()
+        self._lock = threading.Lock()
+
+    def enviar(self, mensaje: Dict) -> bool:
+        """Encola un intercambio para resumir"""
+        with self._lock:
+            self._mensajes.append(json.dumps(mensaje, ensure_ascii=False))
+        return True
+
+    def pendientes(self) -> int:
+        """Número de mensajes sin procesar"""
+        with self._lock:
+            return len(self._mensajes)
+
+    def procesar_pendientes(self, worker: Optional[Callable] = None, tamano_lote: int = 10) -> Dict:
+        """
+        Entrega los mensajes pendientes al worker en lotes con forma de evento SQS
+
+        Args:
+            worker: Handler a invocar (por defecto handlers.procesar_resumen.handler)
+            tamano_lote: Mensajes por evento
+
+        Returns:
+            Diccionario con mensajes procesados y fallidos (estos se reencolan)
+        """
+        if worker is None:
+            from handlers.procesar_resumen import handler as worker
+
+        procesados = 0
+        fallidos: List[str] = []
+
+        while True:
+            with self._lock:
+                lote = [self._mensajes.popleft() for _ in range(min(tamano_lote, len(self._mensajes)))]
+            if not lote:
+                break
+
+            registros = [
+                {'messageId': str(idx), 'body': cuerpo}
+                for idx, cuerpo in enumerate(lote)
+            ]
+            resultado = worker({'Records': registros}, None) or {}
+            ids_fallidos = {
+                falla['itemIdentifier']
+                for falla in resultado.get('batchItemFailures', [])
+            }
+
+            for registro in registros:
+                if registro['messageId'] in ids_fallidos:
+                    fallidos.append(registro['body'])
+                else:
+                    procesados += 1
+
+            if ids_fallidos:
+                break
+
+        with self._lock:
+            self._mensajes.extendleft(reversed(fallidos))
+
+        return {'procesados': procesados, 'fallidos': len(fallidos)}
+
+
+_cola = None
+
+
+def get_cola_resumenes():
+    """
+    Obtiene la cola de resúmenes configurada (singleton por contenedor)
+
+    La cola en memoria solo se usa fuera de Lambda: dentro, los mensajes se
+    acumularían sin límite y se perderían al reciclarse el contenedor mientras
+    la respuesta informa el historial como guardado.
+
+    Returns:
+        ColaSQS si RESUMEN_COLA_URL está configurada; si no, ColaEnMemoria en
+        local y None en Lambda (el llamador resume en línea)
+    """
+    global _cola
+    if _cola is None:
+        if Config.RESUMEN_COLA_URL:
+            _cola = ColaSQS(Config.RESUMEN_COLA_URL)
+        elif os.getenv('AWS_LAMBDA_FUNCTION_NAME'):
+            print("❌ RESUMEN_COLA_URL no configurada en Lambda: no se encolan resúmenes")
+            return None
+        else:
+            print("⚠️ RESUMEN_COLA_URL no configurada, usando cola en memoria")
+            _cola = ColaEnMemoria()
+    return _cola
\ No newline at end of file
@@ -3,61 +3,141 @@ Servicio para interactuar con la API de Gemini (o Claude)
 """
 import os
 import json
+import threading
+import time
 from typing import List, Dict, Optional
 import google.generativeai as genai
 from config import Config
 
+
+# Configuración por defecto del modelo
+GENERATION_CONFIG_DEFAULT = {
+    'temperature': 0.7,
+    'top_p': 0.95,
+    'top_k': 40,
+    'max_output_tokens': 2048,
+}
+
+SAFETY_SETTINGS = [
+    {
+        'category': 'HARM_CATEGORY_HARASSMENT',
+        'threshold': 'BLOCK_MEDIUM_AND_ABOVE'
+    },
+    {
+        'category': 'HARM_CATEGORY_HATE_SPEECH',
+        'threshold': 'BLOCK_MEDIUM_AND_ABOVE'
+    },
+    {
+        'category': 'HARM_CATEGORY_SEXUALLY_EXPLICIT',
+        'threshold': 'BLOCK_MEDIUM_AND_ABOVE'
+    },
+    {
+        'category': 'HARM_CATEGORY_DANGEROUS_CONTENT',
+        'threshold': 'BLOCK_MEDIUM_AND_ABOVE'
+    }
+]
+
+
+# ===== REGISTRO DE MODELOS (vive mientras el contenedor esté caliente) =====
+# genai.configure y cada GenerativeModel se crean una sola vez por contenedor,
+# de modo que las invocaciones calientes reutilizan el cliente y sus conexiones
+_modelos: Dict[str, 'genai.GenerativeModel'] = {}
+_configurado = False
+_lock = threading.Lock()
+_metricas = {
+    'configuracion_ms': None,
+    'modelos_ms': {},
+    'reutilizaciones': 0
+}
+
+
+def _clave_modelo(generation_config: Dict) -> str:
+    """Clave del registro: modelo + configuración de generación"""
+    return f"{Config.GEMINI_MODEL}|{json.dumps(generation_config, sort_keys=True)}"
+
+
+def obtener_modelo(generation_config: Dict) -> 'genai.GenerativeModel':
+    """
+    Obtiene (o crea la primera vez) el modelo para una configuración de generación
+    
+    Args:
+        generation_config: Configuración de generación (temperature, top_p, ...)
+    
+    Returns:
+        Instancia compartida de GenerativeModel
+    """
+    global _configurado
+    clave = _clave_modelo(generation_config)
+    
+    modelo = _modelos.get(clave)
+    if modelo is not None:
+        with _lock:
+            _metricas['reutilizaciones'] += 1
+        return modelo
+    
+    with _lock:
+        if not _configurado:
+            inicio = time.perf_counter()
+            Config.validar_configuracion()
+            genai.configure(api_key=Config.GEMINI_API_KEY)
+            _metricas['configuracion_ms'] = round((time.perf_counter() - inicio) * 1000, 2)
+            _configurado = True
+        
+        if clave not in _modelos:
+            inicio = time.perf_counter()
+            _modelos[clave] = genai.GenerativeModel(
+                model_name=Config.GEMINI_MODEL,
+                generation_config=dict(generation_config),
+                safety_settings=SAFETY_SETTINGS
+            )
+            duracion_ms = round((time.perf_counter() - inicio) * 1000, 2)
+            _metricas['modelos_ms'][clave] = duracion_ms
+            print(f"🧊 Modelo Gemini inicializado en {duracion_ms} ms ({clave})")
+        
+        return _modelos[clave]
+
+
+def get_metricas_inicializacion() -> Dict:
+    """
+    Costo de la inicialización de Gemini en este contenedor (métricas de cold start)
+    
+    Returns:
+        Diccionario con ms de configuración, ms por modelo creado y reutilizaciones
+    """
+    with _lock:
+        return {
+            'configuracion_ms': _metricas['configuracion_ms'],
+            'modelos_ms': dict(_metricas['modelos_ms']),
+            'modelos_en_registro': len(_modelos),
+            'reutilizaciones': _metricas['reutilizaciones']
+        }
+
+
 class GeminiService:
     """Cliente para la API de Gemini"""
     
     def __init__(self):
-        """Inicializa el cliente de Gemini"""
-        Config.validar_configuracion()
-        
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-        
+        """Inicializa el cliente de Gemini (reutiliza el modelo del registro)"""
         # Configuración del modelo
-        self.generation_config = {
-            'temperature': 0.7,
-            'top_p': 0.95,
-            'top_k': 40,
-            'max_output_tokens': 2048,
-        }
+        self.generation_config = dict(GENERATION_CONFIG_DEFAULT)
+        self.safety_settings = SAFETY_SETTINGS
         
-        self.safety_settings = [
-            {
-                'category': 'HARM_CATEGORY_HARASSMENT',
-                'threshold': 'BLOCK_MEDIUM_AND_ABOVE'
-            },
-            {
-                'category': 'HARM_CATEGORY_HATE_SPEECH',
-                'threshold': 'BLOCK_MEDIUM_AND_ABOVE'
-            },
-            {
-                'category': 'HARM_CATEGORY_SEXUALLY_EXPLICIT',
-                'threshold': 'BLOCK_MEDIUM_AND_ABOVE'
-            },
-            {
-                'category': 'HARM_CATEGORY_DANGEROUS_CONTENT',
-                'threshold': 'BLOCK_MEDIUM_AND_ABOVE'
-            }
-        ]
-        
-        self.model = genai.GenerativeModel(
-            model_name=Config.GEMINI_MODEL,
-            generation_config=self.generation_config,
-            safety_settings=self.safety_settings
-        )
+        self.model = obtener_modelo(self.generation_config)
     
-    def generar_respuesta(self, mensajes: List[Dict]) -> str:
+    def generar_respuesta(self, mensajes: List[Dict], con_fallback: bool = True) -> str:
         """
         Genera una respuesta usando Gemini
         
         Args:
             mensajes: Lista de mensajes con formato [{'role': 'user'|'system', 'content': '...'}]
+            con_fallback: False para propagar el error en lugar de devolver el
+                          mensaje de disculpa (el llamador tiene su propio respaldo)
         
         Returns:
             Respuesta generada por el modelo
+        
+        Raises:
+            Exception: Si falla Gemini y con_fallback es False
         """
         try:
             # Convertir formato de mensajes a formato Gemini
@@ -70,17 +150,26 @@ class GeminiService:
         
         except Exception as e:
             print(f"Error al generar respuesta: {str(e)}")
+            if not con_fallback:
+                raise
             return self._generar_respuesta_fallback()
     
-    def generar_respuesta_streaming(self, mensajes: List[Dict]):
+    def generar_respuesta_streaming(self, mensajes: List[Dict], con_fallback: bool = True):
         """
         Genera respuesta en modo streaming para respuestas en tiempo real
         
         Args:
             mensajes: Lista de mensajes
+            con_fallback: False para propagar el error en lugar de entregar el
+                          mensaje de disculpa como un fragmento más (el
+                          llamador informa el error y no guarda el historial)
         
         Yields:
             Chunks de texto de la respuesta
+        
+        Raises:
+            Exception: Si falla Gemini (aun a mitad del stream) y con_fallback
+                       es False
         """
         try:
             prompt_completo = self._convertir_mensajes_a_prompt(mensajes)
@@ -96,6 +185,8 @@ class GeminiService:
         
         except Exception as e:
             print(f"Error en streaming: {str(e)}")
+            if not con_fallback:
+                raise
             yield self._generar_respuesta_fallback()
     
     def _convertir_mensajes_a_prompt(self, mensajes: List[Dict]) -> str:
@@ -130,6 +221,10 @@ class GeminiService:
             "Por favor, intenta nuevamente en unos momentos o reformula tu pregunta."
         )
     
+    def respuesta_fallback(self) -> str:
+        """Texto de la respuesta de fallback (para distinguirla de una respuesta real)"""
+        return self._generar_respuesta_fallback()
+    
     def get_modelo_actual(self) -> str:
         """Retorna el nombre del modelo actual"""
         return Config.GEMINI_MODEL
@@ -142,10 +237,6 @@ class GeminiService:
             temperatura: Valor entre 0 y 1
         """
         if 0 <= temperatura <= 1:
-            self.generation_config['temperature'] = temperatura
-            # Recrear el modelo con nueva configuración
-            self.model = genai.GenerativeModel(
-                model_name=Config.GEMINI_MODEL,
-                generation_config=self.generation_config,
-                safety_settings=self.safety_settings
-            )
\ No newline at end of file
+            self.generation_config = {**self.generation_config, 'temperature': temperatura}
+            # El modelo con esta configuración se crea una sola vez por contenedor
+            self.model = obtener_modelo(self.generation_config)
\ No newline at end of file
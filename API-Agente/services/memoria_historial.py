@@ -0,0 +1,245 @@
+"""
+Memoria consolidada del historial de interacciones
+
+Cada consulta agrega un resumen corto a Historial y el agente solo usa los
+más recientes, así que lo anterior se perdía y la partición crecía sin
+límite. La compactación pliega los resúmenes de cada contexto anteriores a
+los últimos N en un registro por usuario y contexto (id '<contexto>#memoria')
+que acumula cuántas veces apareció cada tema y cada orientación, y borra en
+lotes los registros plegados. El agente lee ese registro más los últimos N:
+el tamaño del prompt y el costo de lectura no crecen con la antigüedad del
+estudiante.
+"""
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Optional
+
+from dao.base import DAOFactory
+from dao.historial_dao import id_memoria
+from services.resumen_extractivo import terminos_resumen
+from config import Config
+
+
+# Términos que conserva cada conteo de la memoria (acota el tamaño del registro)
+MAX_TERMINOS = 40
+
+
+def formatear_memoria(
+    contexto: str,
+    interacciones: int,
+    temas: Dict[str, int],
+    orientaciones: Dict[str, int],
+    ultima: str,
+    longitud_maxima: Optional[int] = None
+) -> str:
+    """
+    Texto de la memoria para el prompt, con los términos más frecuentes
+
+    Returns:
+        "[contexto] N interacciones anteriores. Temas frecuentes: ...
+        Orientación frecuente: ... Última: ..." (máx. longitud_maxima)
+    """
+    longitud_maxima = longitud_maxima or Config.MEMORIA_MAX_CARACTERES
+    encabezado = f"[{contexto}] {interacciones} interacciones anteriores."
+
+    # Se reduce el número de términos hasta que el texto quepa
+    for cantidad in (12, 8, 5, 3, 1):
+        partes = [encabezado]
+        if temas:
+            lista = ', '.join(f"{t} ({n})" for t, n in list(temas.items())[:cantidad])
+            partes.append(f"Temas frecuentes: {lista}.")
+        if orientaciones:
+            partes.append(f"Orientación frecuente: {', '.join(list(orientaciones)[:cantidad])}.")
+        if ultima:
+            partes.append(f"Última: {ultima}")
+        texto = ' '.join(partes)
+        if len(texto) <= longitud_maxima:
+            return texto
+
+    return texto[:longitud_maxima - 3].rstrip() + "..."
+
+
+def plegar(
+    memoria: Optional[Dict],
+    registros: List[Dict],
+    usuario_id: str,
+    contexto: str
+) -> Dict:
+    """
+    Incorpora interacciones a la memoria consolidada de un contexto
+
+    Args:
+        memoria: Memoria actual (None si aún no existe)
+        registros: Interacciones a plegar, de la más antigua a la más reciente
+        usuario_id: ID del usuario
+        contexto: Contexto de la memoria
+
+    Returns:
+        Registro completo de la nueva memoria
+    """
+    memoria = memoria or {}
+    temas = Counter({t: int(n) for t, n in memoria.get('temas', {}).items()})
+    orientaciones = Counter({t: int(n) for t, n in memoria.get('orientaciones', {}).items()})
+
+    for registro in registros:
+        temas_registro, guia_registro = terminos_resumen(registro.get('texto', ''))
+        temas.update(temas_registro)
+        orientaciones.update(guia_registro)
+
+    interacciones = int(memoria.get('interacciones', 0)) + len(registros)
+    temas = dict(temas.most_common(MAX_TERMINOS))
+    orientaciones = dict(orientaciones.most_common(MAX_TERMINOS))
+    ultima = registros[-1].get('texto', '') if registros else memoria.get('ultima', '')
+
+    return {
+        'usuarioId': usuario_id,
+        'id': id_memoria(contexto),
+        'tipo': 'memoria',
+        'contexto': contexto,
+        'texto': formatear_memoria(contexto, interacciones, temas, orientaciones, ultima),
+        'interacciones': interacciones,
+        'temas': temas,
+        'orientaciones': orientaciones,
+        'ultima': ultima,
+        # Id de la interacción más reciente plegada: las que no lo superan ya
+        # están en la memoria (un reintento solo las borra)
+        'hasta': registros[-1]['id'] if registros else memoria.get('hasta'),
+        'actualizado': datetime.now().isoformat()
+    }
+
+
+class CompactadorHistorial:
+    """Pliega el historial antiguo de los usuarios en sus memorias consolidadas"""
+
+    def __init__(
+        self,
+        mantener_recientes: Optional[int] = None,
+        lote_minimo: Optional[int] = None
+    ):
+        """
+        Args:
+            mantener_recientes: Interacciones más recientes que no se pliegan
+            lote_minimo: Interacciones nuevas mínimas de un contexto para
+                         reescribir su memoria
+        """
+        self.mantener_recientes = (
+            Config.MEMORIA_MANTENER_RECIENTES if mantener_recientes is None else mantener_recientes
+        )
+        self.lote_minimo = Config.MEMORIA_LOTE_MINIMO if lote_minimo is None else lote_minimo
+        self.historial_dao = DAOFactory.get_dao('historial')
+        self.usuarios_dao = DAOFactory.get_dao('usuarios')
+
+    def compactar_usuario(self, usuario_id: str) -> int:
+        """
+        Compacta el historial de un usuario
+
+        Cada contexto se recorre de la interacción más reciente a la más
+        antigua leyendo solo id y texto; las primeras N se conservan (son las
+        que lee su agente) y el resto se pliega en la memoria del contexto.
+        Una vez escrita la memoria, los registros plegados se borran en lotes.
+        El error de un contexto se registra y no detiene a los demás (ni a la
+        compactación de los demás usuarios).
+
+        Args:
+            usuario_id: ID del usuario
+
+        Returns:
+            Número de interacciones plegadas
+        """
+        plegados = 0
+        contextos = 0
+
+        for contexto in Config.HISTORIAL_CONTEXTOS:
+            try:
+                plegados_contexto = self._compactar_contexto(usuario_id, contexto)
+            except Exception as e:
+                print(f"❌ Error compactando historial {contexto} de {usuario_id}: {str(e)}")
+                continue
+            if plegados_contexto:
+                plegados += plegados_contexto
+                contextos += 1
+
+        if plegados:
+            print(f"🗜️ Historial de {usuario_id}: {plegados} interacciones plegadas en {contextos} contextos")
+        return plegados
+
+    def _compactar_contexto(self, usuario_id: str, contexto: str) -> int:
+        """
+        Pliega las interacciones antiguas de un contexto en su memoria
+
+        Returns:
+            Número de interacciones plegadas
+
+        Raises:
+            Exception: Errores de DynamoDB (los registra compactar_usuario)
+        """
+        registros = self.historial_dao.iter_interacciones(
+            usuario_id,
+            contexto,
+            projection=['id', 'texto']
+        )
+        grupo = list(islice(registros, self.mantener_recientes, None))
+        if not grupo:
+            return 0
+
+        memoria = self.historial_dao.get_memoria(usuario_id, contexto)
+        hasta_previo = memoria.get('hasta') if memoria else None
+        grupo.reverse()  # Del más antiguo al más reciente
+        nuevos = [r for r in grupo if hasta_previo is None or r['id'] > hasta_previo]
+
+        # Plegar pocos registros no compensa reescribir la memoria; los ya
+        # plegados (compactación anterior interrumpida) se borran igual
+        if len(nuevos) < self.lote_minimo and len(nuevos) == len(grupo):
+            return 0
+
+        if nuevos:
+            nueva = plegar(memoria, nuevos, usuario_id, contexto)
+            if not self.historial_dao.guardar_memoria(nueva, hasta_previo):
+                return 0
+
+        # Si el borrado falla, la memoria ya está escrita: la próxima
+        # compactación borra los que queden (no superan 'hasta', no se repliegan)
+        self.historial_dao.eliminar_interacciones(usuario_id, [r['id'] for r in grupo])
+        return len(nuevos)
+
+    def compactar_todos(self) -> Dict:
+        """
+        Compacta el historial de todos los usuarios
+
+        Los ids de usuario se leen con un scan paralelo (solo la clave) y se
+        compactan varios usuarios a la vez, en lotes acotados a medida que
+        llegan del scan. El error de un usuario se registra y no detiene al
+        resto.
+
+        Returns:
+            Estadísticas: usuarios recorridos, interacciones plegadas y duración
+        """
+        inicio = time.perf_counter()
+        usuarios = (u['id'] for u in self.usuarios_dao.parallel_scan(projection=['id']))
+        # executor.map encolaría de una vez todos los usuarios del scan
+        tamano_lote = Config.MEMORIA_MAX_WORKERS * 4
+        resultados = []
+
+        with ThreadPoolExecutor(
+            max_workers=Config.MEMORIA_MAX_WORKERS,
+            thread_name_prefix='compactador-historial'
+        ) as executor:
+            while True:
+                lote = list(islice(usuarios, tamano_lote))
+                if not lote:
+                    break
+                resultados.extend(executor.map(self.compactar_usuario, lote))
+
+        estadisticas = {
+            'usuarios': len(resultados),
+            'plegados': sum(resultados),
+            'duracion_ms': round((time.perf_counter() - inicio) * 1000, 1)
+        }
+        print(
+            f"📊 Compactación de historial: {estadisticas['usuarios']} usuarios, "
+            f"{estadisticas['plegados']} interacciones plegadas en {estadisticas['duracion_ms']} ms"
+        )
+        return estadisticas
@@ -0,0 +1,96 @@
+"""
+Selección del historial por relevancia
+
+Sin este modo el agente recibe siempre las últimas interacciones del
+contexto, estén o no relacionadas con la pregunta. Con
+HISTORIAL_RECUPERACION_HABILITADA cada resumen se vectoriza al escribirse
+(VectorizadorHashing, local y sin red) y el vector se guarda junto al
+registro como float16 (atributo binario 'vector', 2 bytes por dimensión).
+Al consultar se leen los últimos HISTORIAL_RECUPERACION_CANDIDATOS del
+contexto y se conservan la memoria consolidada y las
+HISTORIAL_RECUPERACION_TOP_K interacciones más parecidas al mensaje: una
+sola multiplicación matriz-vector da la similitud coseno de todas.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import Config
+from utils.vectorizador import VectorizadorHashing
+
+
+# Sin estado: se comparte entre escrituras y consultas del contenedor
+_vectorizador = VectorizadorHashing(Config.HISTORIAL_VECTOR_DIMENSION)
+
+
+def codificar_vector(texto: str) -> bytes:
+    """
+    Vector del resumen para guardarlo en el historial
+
+    Args:
+        texto: Resumen de la interacción
+
+    Returns:
+        Vector de norma 1 como bytes float16 (little-endian)
+    """
+    return _vectorizador.vectorizar(texto).astype('<f2').tobytes()
+
+
+def _matriz_candidatos(candidatos: List[Dict]) -> np.ndarray:
+    """
+    Matriz (n, dimension) float32 con el vector de cada candidato
+
+    Los registros sin vector (escritos antes de habilitar el modo) o con otra
+    dimensión se vectorizan en el momento.
+    """
+    matriz = np.empty((len(candidatos), _vectorizador.dimension), dtype=np.float32)
+    bytes_esperados = _vectorizador.dimension * 2
+
+    for fila, item in enumerate(candidatos):
+        guardado = item.get('vector')
+        guardado = getattr(guardado, 'value', guardado)  # Binary de boto3
+        if guardado is not None and len(guardado) == bytes_esperados:
+            matriz[fila] = np.frombuffer(bytes(guardado), dtype='<f2')
+        else:
+            matriz[fila] = _vectorizador.vectorizar(item.get('texto', ''))
+
+    return matriz
+
+
+def seleccionar_historial(
+    historial: List[Dict],
+    mensaje: str,
+    top_k: Optional[int] = None
+) -> List[Dict]:
+    """
+    Historial que recibe el agente para un mensaje
+
+    Args:
+        historial: Memoria e interacciones del contexto, de la más reciente a
+                   la más antigua (get_historial_contexto)
+        mensaje: Mensaje actual del usuario
+        top_k: Interacciones a conservar (default desde Config)
+
+    Returns:
+        Sin el modo habilitado, el mismo historial. Con él, la memoria
+        seguida de las top_k interacciones más similares al mensaje, en su
+        orden original y sin el atributo 'vector'
+    """
+    if not Config.HISTORIAL_RECUPERACION_HABILITADA or not historial:
+        return historial
+
+    top_k = top_k or Config.HISTORIAL_RECUPERACION_TOP_K
+    memorias = [item for item in historial if item.get('tipo') == 'memoria']
+    candidatos = [item for item in historial if item.get('tipo') != 'memoria']
+
+    if len(candidatos) > top_k:
+        consulta = _vectorizador.vectorizar(mensaje)
+        # Vectores de norma 1: el producto punto es la similitud coseno
+        similitudes = _matriz_candidatos(candidatos) @ consulta
+        elegidos = np.argpartition(-similitudes, top_k - 1)[:top_k]
+        candidatos = [candidatos[i] for i in sorted(elegidos)]
+
+    return [
+        {clave: valor for clave, valor in item.items() if clave != 'vector'}
+        for item in memorias + candidatos
+    ]
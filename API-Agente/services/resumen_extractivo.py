@@ -0,0 +1,174 @@
+"""
+Resumidor extractivo local (sin LLM) para los registros de historial
+
+Produce el mismo formato que el resumen generado con Gemini:
+"[contexto] Usuario consultó sobre X. Se orientó sobre Y." (máx. 150 caracteres)
+a partir de palabras clave del mensaje y de las oraciones más relevantes de
+la respuesta, en microsegundos.
+"""
+import re
+import unicodedata
+from collections import Counter
+from typing import List, Tuple
+
+
+LONGITUD_MAXIMA = 150
+
+STOPWORDS_ES = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes aqui asi aun aunque
+bien cada casi como con contra cual cuales cuando de del desde donde dos el
+ella ellas ello ellos en entre era eran es esa esas ese eso esos esta estaba
+estado estan estar estas este esto estos estoy fue fueron ha hace hacer hacia
+han hasta hay he la las le les lo los mas me mi mis mucho muy nada ni no nos
+nosotros o os otra otras otro otros para pero poco por porque puede pueden
+puedo que quien se sea ser si sido sin sobre solo son su sus tal tambien tan
+tanto te tener tengo ti tiene tienen todo todos tu tus un una uno unos usted
+ustedes vez y ya yo
+hola gracias favor ayuda ayudar quiero quisiera necesito podrias puedes
+debo deberia hacerlo saber cosa cosas forma manera mejor mas menos bueno
+buena buenas dia dias vamos veo creo siento ademas entonces luego primero
+segundo tercero importante recuerda recomiendo recomendable sugiero intenta
+considera dedica practica acude manten mantener normal sentir haz trata
+tratar busca buscar
+""".split())
+
+# Infinitivos y gerundios: útiles, pero menos informativos que los sustantivos
+_PATRON_VERBAL = re.compile(r"(ar|er|ir|ando|iendo)$")
+
+_PATRON_PALABRA = re.compile(r"[a-záéíóúüñ]+", re.IGNORECASE)
+_PATRON_ORACION = re.compile(r"(?<=[.!?¿¡\n])\s+")
+_PATRON_MARKDOWN = re.compile(r"[*_#`>\-•]+")
+
+# Partes del formato "[contexto] Usuario consultó sobre X. Se orientó sobre Y."
+_PATRON_CONTEXTO = re.compile(r"^\s*\[(\w+)\]")
+_PATRON_TEMAS = re.compile(r"consult[óo] sobre (.+?)\.(?:\s|$)", re.IGNORECASE)
+_PATRON_GUIA = re.compile(r"orient[óo] sobre (.+?)\.(?:\s|$)", re.IGNORECASE)
+
+
+def _normalizar(palabra: str) -> str:
+    """Minúsculas y sin tildes (para comparar con las stopwords)"""
+    palabra = unicodedata.normalize('NFD', palabra.lower())
+    return ''.join(c for c in palabra if unicodedata.category(c) != 'Mn')
+
+
+def _palabras_clave(texto: str) -> List[str]:
+    """Palabras con contenido del texto, en minúsculas y en orden de aparición"""
+    return [
+        palabra.lower()
+        for palabra in _PATRON_PALABRA.findall(texto)
+        if len(palabra) > 3 and _normalizar(palabra) not in STOPWORDS_ES
+    ]
+
+
+def _top_palabras(palabras: List[str], cantidad: int, excluir=()) -> List[str]:
+    """
+    Selecciona las palabras más frecuentes (desempate: primera aparición)
+    y las devuelve en el orden en que aparecen en el texto
+    """
+    frecuencias = Counter(palabras)
+    primera_posicion = {}
+    for idx, palabra in enumerate(palabras):
+        primera_posicion.setdefault(palabra, idx)
+
+    def peso(palabra: str) -> float:
+        return frecuencias[palabra] * (0.5 if _PATRON_VERBAL.search(palabra) else 1.0)
+
+    candidatas = sorted(
+        (p for p in frecuencias if p not in excluir),
+        key=lambda p: (-peso(p), primera_posicion[p])
+    )[:cantidad]
+    return sorted(candidatas, key=lambda p: primera_posicion[p])
+
+
+def terminos_resumen(resumen: str) -> Tuple[List[str], List[str]]:
+    """
+    Palabras clave de un resumen del historial
+
+    Con el formato del resumidor separa lo consultado de lo orientado; un
+    texto con otro formato aporta todas sus palabras clave como temas.
+
+    Returns:
+        (temas consultados, orientación dada), sin repetir
+    """
+    texto = _PATRON_CONTEXTO.sub('', resumen or '')
+    temas = _PATRON_TEMAS.search(texto)
+    guia = _PATRON_GUIA.search(texto)
+    if not temas and not guia:
+        return list(dict.fromkeys(_palabras_clave(texto))), []
+    return (
+        list(dict.fromkeys(_palabras_clave(temas.group(1)))) if temas else [],
+        list(dict.fromkeys(_palabras_clave(guia.group(1)))) if guia else []
+    )
+
+
+def _enumerar(palabras: List[str]) -> str:
+    """['a', 'b', 'c'] -> 'a, b y c'"""
+    if len(palabras) <= 1:
+        return ''.join(palabras)
+    return f"{', '.join(palabras[:-1])} y {palabras[-1]}"
+
+
+class ResumidorExtractivo:
+    """Resumen de interacciones por extracción de palabras clave"""
+
+    def __init__(self, longitud_maxima: int = LONGITUD_MAXIMA):
+        self.longitud_maxima = longitud_maxima
+
+    def resumir(self, mensaje_usuario: str, respuesta_agente: str, contexto: str) -> str:
+        """
+        Genera el resumen de una interacción
+
+        Args:
+            mensaje_usuario: Mensaje original del usuario
+            respuesta_agente: Respuesta generada por el agente
+            contexto: Contexto del agente utilizado
+
+        Returns:
+            "[contexto] Usuario consultó sobre X. Se orientó sobre Y."
+        """
+        palabras_mensaje = _palabras_clave(mensaje_usuario or '')
+        palabras_respuesta = _palabras_clave(
+            ' '.join(self._oraciones_principales(respuesta_agente or '', set(palabras_mensaje)))
+        )
+
+        # Se reduce el número de palabras clave hasta que el resumen quepa
+        for cantidad in (4, 3, 2, 1):
+            temas = _top_palabras(palabras_mensaje, cantidad)
+            orientacion = _top_palabras(palabras_respuesta, cantidad, excluir=set(temas))
+            resumen = self._formatear(contexto, temas, orientacion)
+            if len(resumen) <= self.longitud_maxima:
+                return resumen
+
+        return resumen[:self.longitud_maxima - 3].rstrip() + "..."
+
+    def _oraciones_principales(self, respuesta: str, palabras_mensaje: set, cantidad: int = 2) -> List[str]:
+        """
+        Elige las oraciones de la respuesta que mejor representan la orientación:
+        las que más comparten palabras con la pregunta y con el resto de la
+        respuesta, con ligera preferencia por las primeras
+        """
+        texto = _PATRON_MARKDOWN.sub(' ', respuesta)
+        oraciones = [o.strip() for o in _PATRON_ORACION.split(texto) if o.strip()]
+        frecuencias = Counter(_palabras_clave(texto))
+        puntajes = []
+
+        for posicion, oracion in enumerate(oraciones):
+            palabras = _palabras_clave(oracion)
+            if not palabras:
+                continue
+            puntaje = (
+                2.0 * sum(1 for p in palabras if p in palabras_mensaje)
+                + sum(frecuencias[p] for p in set(palabras)) / len(palabras)
+                - 0.1 * posicion
+            )
+            puntajes.append((puntaje, posicion, oracion))
+
+        elegidas = sorted(puntajes, key=lambda x: -x[0])[:cantidad]
+        return [oracion for _, _, oracion in sorted(elegidas, key=lambda x: x[1])]
+
+    @staticmethod
+    def _formatear(contexto: str, temas: List[str], orientacion: List[str]) -> str:
+        """Arma el resumen con el formato del historial"""
+        tema = _enumerar(temas) or 'un tema general'
+        guia = _enumerar(orientacion) or 'los siguientes pasos'
+        return f"[{contexto}] Usuario consultó sobre {tema}. Se orientó sobre {guia}."
\ No newline at end of file
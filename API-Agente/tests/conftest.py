@@ -0,0 +1,80 @@
+"""
+Fixtures comunes: DynamoDB simulado con moto y DAOs limpios en cada test
+"""
+import os
+import sys
+
+# Config lee el entorno al importarse
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ.setdefault('AWS_ACCOUNT_ID', '123456789012')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from config import Config
+from dao import conexion
+from dao.base import DAOFactory
+
+
+TABLAS_POR_USUARIO = (
+    Config.TABLE_DATOS_ACADEMICOS,
+    Config.TABLE_DATOS_EMOCIONALES,
+    Config.TABLE_DATOS_SOCIOECONOMICOS,
+    Config.TABLE_HISTORIAL,
+    Config.TABLE_TAREAS
+)
+
+
+def crear_tablas(dynamodb):
+    """Crea las tablas del agente con el mismo esquema que serverless.yml"""
+    dynamodb.create_table(
+        TableName=Config.TABLE_USUARIOS,
+        KeySchema=[
+            {'AttributeName': 'id', 'KeyType': 'HASH'},
+            {'AttributeName': 'correo', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'correo', 'AttributeType': 'S'}
+        ],
+        GlobalSecondaryIndexes=[{
+            'IndexName': Config.INDEX_USUARIOS_CORREO,
+            'KeySchema': [{'AttributeName': 'correo', 'KeyType': 'HASH'}],
+            'Projection': {'ProjectionType': 'ALL'}
+        }],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    for tabla in TABLAS_POR_USUARIO:
+        dynamodb.create_table(
+            TableName=tabla,
+            KeySchema=[
+                {'AttributeName': 'usuarioId', 'KeyType': 'HASH'},
+                {'AttributeName': 'id', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'usuarioId', 'AttributeType': 'S'},
+                {'AttributeName': 'id', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+
+@pytest.fixture
+def dynamodb():
+    """DynamoDB simulado con las tablas creadas; el recurso compartido y los
+    DAOs (con sus cachés) se crean de nuevo dentro del mock"""
+    with mock_aws():
+        conexion._dynamodb = None
+        DAOFactory.clear_cache()
+
+        recurso = boto3.resource('dynamodb')
+        crear_tablas(recurso)
+        yield recurso
+
+        DAOFactory.clear_cache()
+        conexion._dynamodb = None
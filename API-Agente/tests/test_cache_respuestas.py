@@ -0,0 +1,58 @@
+"""
+Caché de respuestas: volcado de aciertos y vigencia de las entradas en L1
+"""
+import time
+
+import pytest
+
+from config import Config
+from services.cache_respuestas import CacheRespuestas
+
+
+@pytest.fixture
+def cache(dynamodb):
+    dynamodb.create_table(
+        TableName=Config.TABLE_CACHE_RESPUESTAS,
+        KeySchema=[{'AttributeName': 'clave', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'clave', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    return CacheRespuestas()
+
+
+def aciertos_en_tabla(dynamodb, clave: str) -> int:
+    item = dynamodb.Table(Config.TABLE_CACHE_RESPUESTAS).get_item(Key={'clave': clave})['Item']
+    return int(item['aciertos'])
+
+
+def test_aciertos_se_vuelcan_al_llegar_al_maximo(cache, dynamodb, monkeypatch):
+    monkeypatch.setattr(Config, 'CACHE_RESPUESTAS_VOLCADO_MAX_PENDIENTES', 3)
+    cache.guardar('k', 'Psicologo', 'respuesta', 1200.0)
+
+    cache.obtener('k')
+    cache.obtener('k')
+    assert aciertos_en_tabla(dynamodb, 'k') == 0
+
+    cache.obtener('k')
+    assert aciertos_en_tabla(dynamodb, 'k') == 3
+    assert cache.estadisticas()['aciertos_pendientes'] == 0
+
+
+def test_aciertos_se_vuelcan_al_vencer_el_intervalo(cache, dynamodb):
+    cache.guardar('k', 'Psicologo', 'respuesta', 1200.0)
+    cache.ultimo_volcado -= Config.CACHE_RESPUESTAS_VOLCADO_SEGUNDOS
+
+    cache.obtener('k')
+    assert aciertos_en_tabla(dynamodb, 'k') == 1
+
+
+def test_entrada_de_l2_no_vive_en_l1_mas_alla_de_expira(cache, dynamodb):
+    dynamodb.Table(Config.TABLE_CACHE_RESPUESTAS).put_item(Item={
+        'clave': 'k', 'respuesta': 'respuesta', 'latencia_ms': 1200, 'aciertos': 0,
+        'expira': int(time.time()) + 1
+    })
+    assert cache.obtener('k') is not None
+
+    time.sleep(1.1)
+
+    assert cache.obtener('k') is None
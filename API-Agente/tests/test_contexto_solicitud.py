@@ -0,0 +1,96 @@
+"""
+Lecturas de DynamoDB por solicitud al construir el contexto de un agente
+(ContextoSolicitud.resumen())
+"""
+import pytest
+
+from config import Config
+from contextos.base_contexto import ContextoFactory
+from dao.contexto_solicitud import ContextoSolicitud
+from dao.historial_dao import id_interaccion
+
+
+CORREO = 'ana@universidad.edu'
+
+
+@pytest.fixture
+def usuario(dynamodb):
+    """Usuario autorizado con un registro en cada tabla Datos* e historial
+    propio completo (sus agentes no completan con el historial General)"""
+    dynamodb.Table(Config.TABLE_USUARIOS).put_item(Item={
+        'id': 'u1', 'correo': CORREO, 'nombre': 'Ana', 'autorizacion': True
+    })
+    for tabla in (
+        Config.TABLE_DATOS_ACADEMICOS,
+        Config.TABLE_DATOS_EMOCIONALES,
+        Config.TABLE_DATOS_SOCIOECONOMICOS
+    ):
+        dynamodb.Table(tabla).put_item(Item={'usuarioId': 'u1', 'id': 'd1'})
+    for contexto in ('Psicologo', 'MentorAcademico'):
+        for _ in range(Config.LIMITE_HISTORIAL):
+            dynamodb.Table(Config.TABLE_HISTORIAL).put_item(Item={
+                'usuarioId': 'u1', 'id': id_interaccion(contexto), 'texto': 'resumen'
+            })
+    return 'u1'
+
+
+def construir(nombre_contexto: str) -> dict:
+    """Construye el contexto en una solicitud nueva y retorna su resumen"""
+    contexto_solicitud = ContextoSolicitud()
+    with contexto_solicitud:
+        contexto = ContextoFactory.get_contexto(nombre_contexto, contexto_solicitud=contexto_solicitud)
+        contexto.build_context_data(CORREO)
+    return contexto_solicitud.resumen()
+
+
+def test_primera_solicitud_lee_cada_tabla_una_vez(usuario):
+    resumen = construir('Psicologo')
+
+    assert resumen['lecturas'] == 5
+    assert resumen['lecturas_por_tabla'] == {
+        Config.TABLE_USUARIOS: 1,
+        Config.TABLE_DATOS_ACADEMICOS: 1,
+        Config.TABLE_DATOS_EMOCIONALES: 1,
+        Config.TABLE_DATOS_SOCIOECONOMICOS: 1,
+        Config.TABLE_HISTORIAL: 1
+    }
+    assert resumen['aciertos_cache'] == 0
+
+
+def test_segundo_agente_reutiliza_las_tablas_cacheadas(usuario):
+    construir('Psicologo')
+    resumen = construir('MentorAcademico')
+
+    # DatosAcademicos sale del caché entre invocaciones; Tarea es nueva
+    assert resumen['lecturas'] == 3
+    assert resumen['lecturas_por_tabla'] == {
+        Config.TABLE_USUARIOS: 1,
+        Config.TABLE_HISTORIAL: 1,
+        Config.TABLE_TAREAS: 1
+    }
+    assert resumen['aciertos_cache'] == 1
+
+
+def test_contenedor_caliente_solo_lee_usuario_e_historial(usuario):
+    construir('Psicologo')
+    resumen = construir('Psicologo')
+
+    # El usuario (autorización) y el historial nunca salen del caché
+    assert resumen['lecturas'] == 2
+    assert resumen['lecturas_por_tabla'] == {
+        Config.TABLE_USUARIOS: 1,
+        Config.TABLE_HISTORIAL: 1
+    }
+    assert resumen['aciertos_cache'] == 3
+
+
+def test_misma_solicitud_no_repite_lecturas(usuario):
+    contexto_solicitud = ContextoSolicitud()
+    with contexto_solicitud:
+        contexto = ContextoFactory.get_contexto('Psicologo', contexto_solicitud=contexto_solicitud)
+        contexto.build_context_data(CORREO)
+        contexto.build_context_data(CORREO)
+
+    resumen = contexto_solicitud.resumen()
+    assert resumen['lecturas'] == 5
+    assert resumen['aciertos'] == 5
@@ -0,0 +1,56 @@
+"""
+Historial General (registros sin contexto) como respaldo del historial de
+cada agente (HistorialDAO.get_historial_contexto)
+"""
+import pytest
+
+from config import Config
+from dao.base import DAOFactory
+from dao.contexto_solicitud import ContextoSolicitud
+from dao.historial_dao import id_interaccion, id_memoria
+
+
+GENERAL = Config.HISTORIAL_CONTEXTO_GENERAL
+
+
+@pytest.fixture
+def historial(dynamodb):
+    tabla = dynamodb.Table(Config.TABLE_HISTORIAL)
+
+    def agregar(contexto: str, texto: str):
+        tabla.put_item(Item={'usuarioId': 'u1', 'id': id_interaccion(contexto), 'texto': texto})
+
+    tabla.put_item(Item={
+        'usuarioId': 'u1', 'id': id_memoria(GENERAL), 'tipo': 'memoria', 'texto': 'memoria general'
+    })
+    return agregar
+
+
+def leer(contexto: str, limit: int):
+    contexto_solicitud = ContextoSolicitud()
+    with contexto_solicitud:
+        registros = DAOFactory.get_dao('historial').get_historial_contexto('u1', contexto, limit=limit)
+    return registros, contexto_solicitud.resumen()
+
+
+def test_historial_corto_se_completa_con_general(historial):
+    historial(GENERAL, 'legado 1')
+    historial(GENERAL, 'legado 2')
+    historial(GENERAL, 'legado 3')
+    historial('Psicologo', 'propio')
+
+    registros, resumen = leer('Psicologo', limit=3)
+
+    assert [r['texto'] for r in registros] == ['propio', 'memoria general', 'legado 3', 'legado 2']
+    assert resumen['lecturas_por_tabla'] == {Config.TABLE_HISTORIAL: 2}
+
+
+def test_historial_completo_no_lee_general(historial):
+    historial(GENERAL, 'legado')
+    for i in range(3):
+        historial('Psicologo', f'propio {i}')
+
+    registros, resumen = leer('Psicologo', limit=3)
+
+    assert [r['texto'] for r in registros] == ['propio 2', 'propio 1', 'propio 0']
+    assert resumen['lecturas_por_tabla'] == {Config.TABLE_HISTORIAL: 1}
@@ -0,0 +1,74 @@
+"""
+UUID v7 de utils/identificadores.py y de su copia en API-Tareas (deben
+comportarse igual: ambas escriben sort keys de Tarea)
+"""
+import importlib.util
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from utils import identificadores
+
+
+def _cargar_copia_tareas():
+    ruta = Path(__file__).resolve().parents[2] / 'API-Tareas' / 'identificadores.py'
+    spec = importlib.util.spec_from_file_location('identificadores_tareas', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+MODULOS = [identificadores, _cargar_copia_tareas()]
+
+
+@pytest.fixture(params=MODULOS, ids=['api-agente', 'api-tareas'])
+def modulo(request):
+    return request.param
+
+
+def test_formato_uuid_v7(modulo):
+    valor = uuid.UUID(modulo.uuid7())
+
+    assert valor.version == 7
+    assert valor.variant == uuid.RFC_4122
+
+
+def test_ids_del_proceso_son_estrictamente_crecientes(modulo):
+    ids = [modulo.uuid7() for _ in range(5000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_momento_explicito_se_codifica_al_milisegundo(modulo):
+    momento = datetime(2026, 3, 1, 12, 30, 45, 123000, tzinfo=timezone.utc)
+
+    assert modulo.momento_de(modulo.uuid7(momento)) == momento
+    assert modulo.momento_de(modulo.uuid7(momento.timestamp())) == momento
+
+
+def test_cotas_acotan_los_ids_del_instante(modulo):
+    momento = datetime(2026, 3, 1, 12, 30, 45, 123000, tzinfo=timezone.utc)
+    ids = [modulo.uuid7(momento) for _ in range(100)]
+
+    assert all(modulo.cota_inferior(momento) <= i <= modulo.cota_superior(momento) for i in ids)
+    assert modulo.cota_superior(momento - timedelta(milliseconds=1)) < min(ids)
+    assert modulo.cota_inferior(momento + timedelta(milliseconds=1)) > max(ids)
+
+
+def test_momento_de_rechaza_ids_que_no_son_v7(modulo):
+    assert modulo.momento_de(str(uuid.uuid4())) is None
+    assert modulo.momento_de('memoria') is None
+
+
+def test_copias_identicas():
+    codigo_agente = Path(identificadores.__file__).read_text(encoding='utf-8')
+    codigo_tareas = Path(MODULOS[1].__file__).read_text(encoding='utf-8')
+
+    # Solo difiere la nota del docstring que señala la otra copia
+    def sin_docstring(codigo):
+        return codigo.split('"""', 2)[2]
+
+    assert sin_docstring(codigo_agente) == sin_docstring(codigo_tareas)
@@ -3,6 +3,8 @@
 Formateadores de respuestas
 """
 import json
+import re
+import unicodedata
 from typing import Dict, Any
 from datetime import datetime, date
 from decimal import Decimal
@@ -65,6 +67,21 @@ def formatear_respuesta_error(
     }
 
 
+def formatear_evento_sse(evento: str, datos: Dict) -> str:
+    """
+    Formatea un evento Server-Sent Events (text/event-stream)
+    
+    Args:
+        evento: Nombre del evento (inicio, fragmento, fin, error)
+        datos: Diccionario con los datos del evento (se serializa en una línea)
+    
+    Returns:
+        Evento SSE terminado en línea en blanco
+    """
+    payload = json.dumps(datos, cls=CustomJSONEncoder, ensure_ascii=False)
+    return f"event: {evento}\ndata: {payload}\n\n"
+
+
 class CustomJSONEncoder(json.JSONEncoder):
     """
     Encoder personalizado para manejar tipos especiales
@@ -135,4 +152,27 @@ def sanitizar_input_usuario(texto: str) -> str:
     if len(texto) > 5000:
         texto = texto[:5000]
     
-    return texto
\ No newline at end of file
+    return texto
+
+
+_PATRON_NO_ALFANUMERICO = re.compile(r"[^a-z0-9ñ ]+")
+_PATRON_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza un texto para comparar consultas equivalentes
+    ("¿Cómo mejoro mi promedio?" == "como mejoro mi promedio")
+    
+    Args:
+        texto: Texto del usuario
+    
+    Returns:
+        Texto en minúsculas, sin tildes (conserva la ñ), sin puntuación y con
+        espacios simples
+    """
+    texto = texto.lower().replace('ñ', '\0')
+    texto = unicodedata.normalize('NFD', texto)
+    texto = ''.join(c for c in texto if unicodedata.category(c) != 'Mn').replace('\0', 'ñ')
+    texto = _PATRON_NO_ALFANUMERICO.sub(' ', texto)
+    return _PATRON_ESPACIOS.sub(' ', texto).strip()
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Identificadores ordenados por tiempo (UUID v7, RFC 9562) para las sort keys
+de Historial y Tarea
+
+Un UUID v7 empieza con el instante de creación en milisegundos, así que su
+texto (hex en minúsculas, ancho fijo) ordena igual que el tiempo. Con él como
+sort key, "últimos N", "desde T" y "entre T1 y T2" son condiciones sobre la
+clave (ScanIndexForward=False + Limit, gte, between) en lugar de leer y
+ordenar la partición entera. Sigue teniendo la forma de un UUID (36
+caracteres), compatible con los esquemas y validadores existentes.
+
+API-Tareas/identificadores.py es una copia de este módulo (cada Lambda se
+despliega por separado); tests/test_identificadores.py prueba ambas.
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union
+
+_lock = threading.Lock()
+_ultimo_ms = 0
+_secuencia = 0
+
+Momento = Union[datetime, int, float]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _a_milisegundos(momento: Momento) -> int:
+    """Convierte un datetime (naive = UTC) o un epoch en segundos a milisegundos"""
+    if isinstance(momento, datetime):
+        if momento.tzinfo is None:
+            momento = momento.replace(tzinfo=timezone.utc)
+        # Aritmética entera: timestamp() * 1000 puede quedar un ms por debajo
+        return (momento - _EPOCH) // timedelta(milliseconds=1)
+    return int(momento * 1000)
+
+
+def _componer(ms: int, rand_a: int, rand_b: int) -> str:
+    valor = (ms & 0xFFFFFFFFFFFF) << 80
+    valor |= 0x7 << 76                      # versión 7
+    valor |= (rand_a & 0xFFF) << 64
+    valor |= 0b10 << 62                     # variante RFC 9562
+    valor |= rand_b & 0x3FFFFFFFFFFFFFFF
+    return str(uuid.UUID(int=valor))
+
+
+def uuid7(momento: Optional[Momento] = None) -> str:
+    """
+    Genera un UUID v7 en texto
+    
+    Dentro del mismo milisegundo los 12 bits rand_a funcionan como contador,
+    de modo que los ids generados por un mismo proceso son estrictamente
+    crecientes.
+    
+    Args:
+        momento: Instante a codificar (datetime o epoch en segundos); None para
+                 ahora. Con un momento explícito no se aplica el contador
+                 (p. ej. al migrar registros existentes).
+    
+    Returns:
+        UUID v7 (36 caracteres)
+    """
+    global _ultimo_ms, _secuencia
+    
+    rand_b = int.from_bytes(os.urandom(8), 'big')
+    if momento is not None:
+        return _componer(_a_milisegundos(momento), int.from_bytes(os.urandom(2), 'big'), rand_b)
+    
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _ultimo_ms:
+            _ultimo_ms = ms
+            _secuencia = int.from_bytes(os.urandom(2), 'big') & 0x3FF  # deja margen al contador
+        else:
+            # Mismo milisegundo (o reloj que retrocede): se sigue contando
+            _secuencia += 1
+            if _secuencia > 0xFFF:
+                _ultimo_ms += 1
+                _secuencia = 0
+            ms = _ultimo_ms
+        return _componer(ms, _secuencia, rand_b)
+
+
+def cota_inferior(momento: Momento) -> str:
+    """Menor UUID v7 posible para un instante (para condiciones gte/between)"""
+    return _componer(_a_milisegundos(momento), 0, 0)
+
+
+def cota_superior(momento: Momento) -> str:
+    """Mayor UUID v7 posible para un instante (para condiciones lte/between)"""
+    return _componer(_a_milisegundos(momento), 0xFFF, 0x3FFFFFFFFFFFFFFF)
+
+
+def momento_de(identificador: str) -> Optional[datetime]:
+    """
+    Instante (UTC) codificado en un UUID v7
+    
+    Returns:
+        datetime con zona UTC, o None si el id no es un UUID v7
+    """
+    try:
+        valor = uuid.UUID(identificador)
+    except (ValueError, AttributeError, TypeError):
+        return None
+    if valor.version != 7:
+        return None
+    return datetime.fromtimestamp((valor.int >> 80) / 1000, tz=timezone.utc)
@@ -97,8 +97,8 @@ def validar_uuid(uuid_string: str) -> bool:
     if not uuid_string or not isinstance(uuid_string, str):
         return False
     
-    # Patrón UUID v4
-    pattern = r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-4[0-9a-fA-F]{3}-[89abAB][0-9a-fA-F]{3}-[0-9a-fA-F]{12}$'
+    # Patrón UUID v1-v8 (v4 aleatorios, v7 ordenados por tiempo en Historial/Tarea)
+    pattern = r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[1-8][0-9a-fA-F]{3}-[89abAB][0-9a-fA-F]{3}-[0-9a-fA-F]{12}$'
     return bool(re.match(pattern, uuid_string))
 
 
@@ -0,0 +1,147 @@
+"""
+Vectorizador local y sin red para mensajes cortos en español
+
+Hashing trick sobre palabras y n-gramas de caracteres (robusto a tildes,
+conjugaciones y errores de tipeo), con TF sublineal y normalización L2, de modo
+que el producto punto entre dos vectores es su similitud coseno.
+"""
+import zlib
+from typing import Iterable, List
+
+import numpy as np
+
+from utils.formatters import normalizar_texto
+
+
+# Palabras sin contenido que no deben pesar en la similitud
+STOPWORDS = frozenset("""
+a al algo como con cual de del el en es esta este hacer hago la las le lo los
+me mi mis muy no o para pero por puedo que quiero se si sin sobre su sus te
+tengo tu un una y yo debo deberia puedes podrias necesito ayuda ayudame
+""".split())
+
+# Sinónimos frecuentes del dominio: se llevan a una forma canónica para que
+# paráfrasis como "subir mis notas" y "mejorar mi promedio" compartan rasgos
+SINONIMOS = {
+    'notas': 'promedio',
+    'nota': 'promedio',
+    'calificaciones': 'promedio',
+    'ponderado': 'promedio',
+    'rendimiento': 'promedio',
+    'subo': 'mejorar',
+    'subir': 'mejorar',
+    'mejoro': 'mejorar',
+    'aumentar': 'mejorar',
+    'levantar': 'mejorar',
+    'jalado': 'reprobar',
+    'jale': 'reprobar',
+    'jalar': 'reprobar',
+    'desaprobe': 'reprobar',
+    'desaprobar': 'reprobar',
+    'repruebo': 'reprobar',
+    'reprobe': 'reprobar',
+    'curso': 'cursos',
+    'materia': 'cursos',
+    'materias': 'cursos',
+    'ansioso': 'ansiedad',
+    'ansiosa': 'ansiedad',
+    'nervios': 'ansiedad',
+    'nervioso': 'ansiedad',
+    'nerviosa': 'ansiedad',
+    'estresado': 'estres',
+    'estresada': 'estres',
+    'carreras': 'carrera',
+    'profesion': 'carrera',
+    'estudiar': 'estudio',
+    'estudio': 'estudio',
+    'estudiando': 'estudio',
+    'examen': 'examenes',
+    'parcial': 'examenes',
+    'parciales': 'examenes',
+    'finales': 'examenes',
+}
+
+
+class VectorizadorHashing:
+    """Embeddings por hashing de palabras y n-gramas de caracteres"""
+
+    def __init__(self, dimension: int = 1024, ngramas: Iterable[int] = (3, 4), peso_palabras: float = 2.0):
+        """
+        Args:
+            dimension: Tamaño del vector (potencia de 2 recomendada)
+            ngramas: Longitudes de los n-gramas de caracteres
+            peso_palabras: Peso de una palabra completa frente a un n-grama
+        """
+        self.dimension = dimension
+        self.ngramas = tuple(ngramas)
+        self.peso_palabras = peso_palabras
+
+    def tokens(self, texto: str) -> List[str]:
+        """
+        Palabras con contenido, normalizadas y llevadas a su forma canónica
+
+        Args:
+            texto: Texto a tokenizar
+
+        Returns:
+            Lista de palabras
+        """
+        palabras = normalizar_texto(texto).split()
+        return [
+            SINONIMOS.get(palabra, palabra)
+            for palabra in palabras
+            if palabra not in STOPWORDS and len(palabra) > 1
+        ]
+
+    def vectorizar(self, texto: str) -> np.ndarray:
+        """
+        Convierte un texto en un vector float32 de norma 1
+
+        Args:
+            texto: Texto a vectorizar
+
+        Returns:
+            Vector de tamaño `dimension` (ceros si el texto no tiene contenido)
+        """
+        indices = []
+        pesos = []
+
+        for palabra in self.tokens(texto):
+            self._agregar_rasgo(f"w:{palabra}", self.peso_palabras, indices, pesos)
+
+            marcada = f" {palabra} "
+            for n in self.ngramas:
+                for i in range(max(len(marcada) - n + 1, 0)):
+                    self._agregar_rasgo(marcada[i:i + n], 1.0, indices, pesos)
+
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        if not indices:
+            return vector
+
+        np.add.at(vector, np.asarray(indices), np.asarray(pesos, dtype=np.float32))
+
+        # TF sublineal conservando el signo del hashing
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norma = np.linalg.norm(vector)
+        return vector / norma if norma > 0 else vector
+
+    def vectorizar_lote(self, textos: Iterable[str]) -> np.ndarray:
+        """
+        Vectoriza varios textos
+
+        Args:
+            textos: Textos a vectorizar
+
+        Returns:
+            Matriz (n, dimension) float32
+        """
+        filas = [self.vectorizar(texto) for texto in textos]
+        if not filas:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.vstack(filas)
+
+    def _agregar_rasgo(self, rasgo: str, peso: float, indices: List[int], pesos: List[float]):
+        """Hashing estable entre procesos (crc32): un bit para el índice y otro para el signo"""
+        h = zlib.crc32(rasgo.encode('utf-8'))
+        indices.append(h % self.dimension)
+        pesos.append(peso if (h >> 31) & 1 == 0 else -peso)
\ No newline at end of file
@@ -2,20 +2,23 @@
 Lambda para actualizar usuario y datos relacionados
 Endpoint: PUT /usuario
 Actualiza Usuario + DatosAcademicos + DatosEmocionales + DatosSocioeconomicos
+
+Todas las secciones se escriben en una sola llamada TransactWriteItems
+(todo o nada) con UpdateItem parciales: solo se modifican los campos
+enviados. Los registros Datos* se ubican por su id determinista
+(perfilEstudiante.id_registro_perfil), sin leerlos antes.
 """
 import json
 import os
-import boto3
-import uuid
 from decimal import Decimal
-from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+from conexionDynamo import TABLE_USUARIOS, obtener_dynamodb, obtener_usuario_por_correo
+from perfilEstudiante import TABLAS_PERFIL, id_registro_perfil
 
-# Configuración DynamoDB
-dynamodb = boto3.resource('dynamodb')
-table_usuarios = dynamodb.Table(os.getenv('TABLE_USUARIOS', 'Usuario'))
-table_academicos = dynamodb.Table(os.getenv('TABLE_DATOS_ACADEMICOS', 'DatosAcademicos'))
-table_emocionales = dynamodb.Table(os.getenv('TABLE_DATOS_EMOCIONALES', 'DatosEmocionales'))
-table_socioeconomicos = dynamodb.Table(os.getenv('TABLE_DATOS_SOCIOECONOMICOS', 'DatosSocioeconomicos'))
+# Configuración DynamoDB (recurso compartido del proceso)
+dynamodb = obtener_dynamodb()
+TABLE_CACHE_ANALISIS = os.getenv('TABLE_CACHE_ANALISIS', 'CacheAnalisis')
 
 
 def float_to_decimal(obj):
@@ -29,65 +32,41 @@ def float_to_decimal(obj):
     return obj
 
 
-def obtener_usuario_por_correo(correo):
-    """Busca usuario por correo usando scan con paginación"""
-    try:
-        # Primer scan
-        response = table_usuarios.scan(
-            FilterExpression=Attr('correo').eq(correo)
-        )
-        
-        # Revisar items del primer scan
-        items = response.get('Items', [])
-        if items:
-            return items[0]
-        
-        # Si no se encontró, continuar con paginación
-        while 'LastEvaluatedKey' in response:
-            response = table_usuarios.scan(
-                FilterExpression=Attr('correo').eq(correo),
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            items = response.get('Items', [])
-            if items:
-                return items[0]
-        
-        return None
-    except Exception as e:
-        print(f"❌ Error buscando usuario por correo '{correo}': {str(e)}")
-        import traceback
-        traceback.print_exc()
+def operacion_actualizar(nombre_tabla, clave, campos, condicion=None):
+    """
+    Arma un Update de TransactWriteItems que asigna solo los campos dados
+
+    Args:
+        nombre_tabla: Tabla DynamoDB
+        clave: Clave primaria del ítem
+        campos: Campos a asignar (se ignoran los de la clave)
+        condicion: ConditionExpression opcional
+
+    Returns:
+        Operación para TransactItems, o None si no hay campos que asignar
+    """
+    campos = {k: v for k, v in campos.items() if k not in clave}
+    if not campos:
         return None
 
+    nombres = {}
+    valores = {}
+    asignaciones = []
+    for i, (campo, valor) in enumerate(campos.items()):
+        nombres[f'#c{i}'] = campo
+        valores[f':v{i}'] = float_to_decimal(valor)
+        asignaciones.append(f'#c{i} = :v{i}')
 
-def obtener_o_crear_registro(table, usuario_id, datos_nuevos=None):
-    """Obtiene registro existente o crea uno nuevo"""
-    try:
-        # Buscar registro existente
-        response = table.query(
-            KeyConditionExpression='usuarioId = :uid',
-            ExpressionAttributeValues={':uid': usuario_id},
-            Limit=1,
-            ScanIndexForward=False
-        )
-        
-        if response.get('Items'):
-            # Existe, retornar el existente
-            return response['Items'][0]
-        else:
-            # No existe, crear nuevo con datos provistos
-            nuevo_registro = {
-                'id': str(uuid.uuid4()),
-                'usuarioId': usuario_id
-            }
-            if datos_nuevos:
-                nuevo_registro.update(datos_nuevos)
-            return nuevo_registro
-    
-    except Exception as e:
-        print(f"⚠️ Error en obtener_o_crear_registro: {str(e)}")
-        # Retornar nuevo registro por defecto
-        return {'id': str(uuid.uuid4()), 'usuarioId': usuario_id}
+    update = {
+        'TableName': nombre_tabla,
+        'Key': clave,
+        'UpdateExpression': 'SET ' + ', '.join(asignaciones),
+        'ExpressionAttributeNames': nombres,
+        'ExpressionAttributeValues': valores
+    }
+    if condicion:
+        update['ConditionExpression'] = condicion
+    return {'Update': update}
 
 
 def handler(event, context):
@@ -138,64 +117,34 @@ def handler(event, context):
             }
         
         usuario_id = usuario_existente.get('id')
-        actualizaciones = []
         
-        # 2. Actualizar Usuario si se provee
-        if 'usuario' in body and body['usuario']:
-            datos_usuario = body['usuario']
-            # Mantener campos clave
-            datos_usuario['id'] = usuario_id
-            datos_usuario['correo'] = correo
-            # Preservar contraseña si no se provee
-            if 'contrasena' not in datos_usuario:
-                datos_usuario['contrasena'] = usuario_existente.get('contrasena')
-            
-            # Convertir floats a Decimal
-            datos_usuario = float_to_decimal(datos_usuario)
-            
-            table_usuarios.put_item(Item=datos_usuario)
-            actualizaciones.append('usuario')
-        
-        # 3. Actualizar DatosAcademicos si se provee
-        if 'datos_academicos' in body and body['datos_academicos']:
-            datos_acad = body['datos_academicos']
-            registro_acad = obtener_o_crear_registro(table_academicos, usuario_id, datos_acad)
-            
-            # Mezclar datos nuevos con existentes
-            registro_acad.update(datos_acad)
-            registro_acad['usuarioId'] = usuario_id
-            
-            # Convertir floats a Decimal
-            registro_acad = float_to_decimal(registro_acad)
-            
-            table_academicos.put_item(Item=registro_acad)
-            actualizaciones.append('datos_academicos')
+        # 2. Una operación por sección enviada
+        operaciones = []
+        actualizaciones = []
         
-        # 4. Actualizar DatosEmocionales si se provee
-        if 'datos_emocionales' in body and body['datos_emocionales']:
-            datos_emo = body['datos_emocionales']
-            registro_emo = obtener_o_crear_registro(table_emocionales, usuario_id, datos_emo)
-            
-            registro_emo.update(datos_emo)
-            registro_emo['usuarioId'] = usuario_id
-            
-            registro_emo = float_to_decimal(registro_emo)
-            
-            table_emocionales.put_item(Item=registro_emo)
-            actualizaciones.append('datos_emocionales')
+        if body.get('usuario'):
+            operacion = operacion_actualizar(
+                TABLE_USUARIOS,
+                {'id': usuario_id, 'correo': correo},
+                body['usuario'],
+                condicion='attribute_exists(id)'
+            )
+            if operacion:
+                operaciones.append(operacion)
+                actualizaciones.append('usuario')
         
-        # 5. Actualizar DatosSocioeconomicos si se provee
-        if 'datos_socioeconomicos' in body and body['datos_socioeconomicos']:
-            datos_socio = body['datos_socioeconomicos']
-            registro_socio = obtener_o_crear_registro(table_socioeconomicos, usuario_id, datos_socio)
-            
-            registro_socio.update(datos_socio)
-            registro_socio['usuarioId'] = usuario_id
-            
-            registro_socio = float_to_decimal(registro_socio)
-            
-            table_socioeconomicos.put_item(Item=registro_socio)
-            actualizaciones.append('datos_socioeconomicos')
+        for seccion, nombre_tabla in TABLAS_PERFIL.items():
+            if not body.get(seccion):
+                continue
+            # Upsert del registro único de la sección (se crea si no existe)
+            operacion = operacion_actualizar(
+                nombre_tabla,
+                {'usuarioId': usuario_id, 'id': id_registro_perfil(seccion, usuario_id)},
+                body[seccion]
+            )
+            if operacion:
+                operaciones.append(operacion)
+                actualizaciones.append(seccion)
         
         if not actualizaciones:
             return {
@@ -210,6 +159,35 @@ def handler(event, context):
                 }, ensure_ascii=False)
             }
         
+        # 3. El análisis general cacheado queda obsoleto (los de preguntas
+        # puntuales los descarta la huella en agenteAnalisis)
+        operaciones.append({'Delete': {
+            'TableName': TABLE_CACHE_ANALISIS,
+            'Key': {'usuarioId': usuario_id, 'clave': 'analisis'}
+        }})
+        
+        # 4. Escribir todo en un solo round-trip (el cliente del recurso
+        # serializa los tipos de Python igual que Table)
+        try:
+            dynamodb.meta.client.transact_write_items(TransactItems=operaciones)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                raise
+            motivos = [r.get('Code') for r in e.response.get('CancellationReasons', [])]
+            print(f"⚠️ Transacción cancelada para {correo}: {motivos}")
+            return {
+                'statusCode': 409,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({
+                    'error': True,
+                    'message': 'No se pudo aplicar la actualización; no se modificó ningún dato',
+                    'motivos': motivos
+                }, ensure_ascii=False)
+            }
+        
         return {
             'statusCode': 200,
             'headers': {
@@ -2,24 +2,57 @@
 Lambda para análisis de riesgo de deserción con IA
 Endpoint: POST /analisis/usuario
 Analiza datos del estudiante y calcula riesgo de deserción
+
+El puntaje, el nivel y los factores los calcula motorRiesgo (determinista, sin
+LLM); Gemini solo redacta el mensaje y las recomendaciones, y si falla o
+tarda demasiado se responde con la narrativa por reglas.
+
+Los análisis redactados se guardan en CacheAnalisis con la huella de los
+registros que los originaron; actualizarUsuario borra los del usuario.
 """
+import hashlib
 import json
 import os
-import boto3
+import time
+from datetime import datetime
 from decimal import Decimal
-from boto3.dynamodb.conditions import Attr
 import google.generativeai as genai
 
-# Configuración DynamoDB
-dynamodb = boto3.resource('dynamodb')
-table_usuarios = dynamodb.Table(os.getenv('TABLE_USUARIOS', 'Usuario'))
-table_academicos = dynamodb.Table(os.getenv('TABLE_DATOS_ACADEMICOS', 'DatosAcademicos'))
-table_emocionales = dynamodb.Table(os.getenv('TABLE_DATOS_EMOCIONALES', 'DatosEmocionales'))
-table_socioeconomicos = dynamodb.Table(os.getenv('TABLE_DATOS_SOCIOECONOMICOS', 'DatosSocioeconomicos'))
+from cacheTTL import CacheTTL
+from conexionDynamo import obtener_dynamodb, obtener_usuario_por_correo
+from motorRiesgo import calcular_riesgo, mensaje_por_reglas
+from perfilEstudiante import ensamblar_perfil, leer_ultimo_registro
+
+# Configuración DynamoDB (recurso compartido del proceso)
+dynamodb = obtener_dynamodb()
+table_cache_analisis = dynamodb.Table(os.getenv('TABLE_CACHE_ANALISIS', 'CacheAnalisis'))
 
 # Configuración Gemini
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 genai.configure(api_key=GEMINI_API_KEY)
+# Narrativa con Gemini (opcional) y tiempo máximo de espera
+ANALISIS_NARRATIVA_LLM = os.getenv('ANALISIS_NARRATIVA_LLM', 'true').lower() == 'true'
+ANALISIS_LLM_TIMEOUT_SEGUNDOS = float(os.getenv('ANALISIS_LLM_TIMEOUT_SEGUNDOS', '10'))
+# Se crea una vez por contenedor y se reutiliza en cada narrativa
+modelo_narrativa = genai.GenerativeModel(
+    model_name='gemini-2.0-flash',
+    generation_config={
+        'temperature': 0.7,
+        'max_output_tokens': 2048,
+    }
+)
+
+# Caché de perfiles entre invocaciones (vive mientras el contenedor esté caliente).
+# Usuario y Datos* los escriben otras Lambdas, así que la frescura la acota el TTL.
+CACHE_TTL_SEGUNDOS = int(os.getenv('CACHE_TTL_SEGUNDOS', '60'))
+CACHE_MAX_ENTRADAS = int(os.getenv('CACHE_MAX_ENTRADAS', '500'))
+cache_perfiles = CacheTTL('perfiles', CACHE_TTL_SEGUNDOS, CACHE_MAX_ENTRADAS)
+
+# Análisis ya redactados por Gemini, por usuario y huella de sus 4 registros.
+# Subir VERSION_ANALISIS cuando cambie la rúbrica o el prompt invalida todo.
+ANALISIS_CACHE_HABILITADO = os.getenv('ANALISIS_CACHE_HABILITADO', 'true').lower() == 'true'
+ANALISIS_CACHE_TTL_SEGUNDOS = int(os.getenv('ANALISIS_CACHE_TTL_SEGUNDOS', '604800'))
+VERSION_ANALISIS = '1'
 
 
 def decimal_to_float(obj):
@@ -33,100 +66,108 @@ def decimal_to_float(obj):
     return obj
 
 
-def obtener_usuario_por_correo(correo):
-    """Busca usuario por correo usando scan con paginación"""
+def obtener_con_cache(clave, cargador):
+    """Lee a través del caché de perfiles; cargador() se ejecuta solo en un fallo"""
+    encontrado, valor = cache_perfiles.obtener(clave)
+    if encontrado:
+        return valor
+    valor = cargador()
+    # Un registro inexistente no se cachea: puede crearse en cualquier momento
+    if valor is not None:
+        cache_perfiles.guardar(clave, valor)
+    return valor
+
+
+def leer_con_cache(nombre_tabla, usuario_id):
+    """Lector de ensamblar_perfil que pasa por el caché de perfiles"""
+    return obtener_con_cache(
+        (nombre_tabla, usuario_id),
+        lambda: leer_ultimo_registro(nombre_tabla, usuario_id)
+    )
+
+
+def float_to_decimal(obj):
+    """Convierte float a Decimal para DynamoDB"""
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    elif isinstance(obj, dict):
+        return {k: float_to_decimal(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [float_to_decimal(i) for i in obj]
+    return obj
+
+
+def huella_perfil(usuario, datos_acad, datos_emo, datos_socio):
+    """Hash del contenido de los 4 registros con los que se calcula el análisis"""
+    contenido = json.dumps(
+        [VERSION_ANALISIS, usuario, datos_acad, datos_emo, datos_socio],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def clave_analisis(mensaje_usuario):
+    """Clave de ordenamiento: el análisis general o uno por pregunta del analista"""
+    mensaje = ' '.join((mensaje_usuario or '').lower().split())
+    if not mensaje:
+        return 'analisis'
+    return f"mensaje#{hashlib.sha256(mensaje.encode('utf-8')).hexdigest()[:32]}"
+
+
+def obtener_analisis_cacheado(usuario_id, clave, huella):
+    """Retorna el análisis guardado si se calculó con los mismos datos (una lectura)"""
     try:
-        # Primer scan
-        response = table_usuarios.scan(
-            FilterExpression=Attr('correo').eq(correo)
-        )
-        
-        # Revisar items del primer scan
-        items = response.get('Items', [])
-        if items:
-            return items[0]
-        
-        # Si no se encontró, continuar con paginación
-        while 'LastEvaluatedKey' in response:
-            response = table_usuarios.scan(
-                FilterExpression=Attr('correo').eq(correo),
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            items = response.get('Items', [])
-            if items:
-                return items[0]
-        
-        return None
+        response = table_cache_analisis.get_item(Key={'usuarioId': usuario_id, 'clave': clave})
+        item = response.get('Item')
+        if not item or item.get('huella') != huella or item.get('expira', 0) <= time.time():
+            return None
+        return decimal_to_float(item['analisis'])
     except Exception as e:
-        print(f"❌ Error buscando usuario por correo '{correo}': {str(e)}")
-        import traceback
-        traceback.print_exc()
+        print(f"⚠️ Error leyendo caché de análisis: {str(e)}")
         return None
 
 
-def obtener_datos_por_usuario_id(table, usuario_id):
-    """Obtiene datos de una tabla por usuarioId"""
+def guardar_analisis(usuario_id, clave, huella, analisis):
+    """Guarda un análisis (reemplaza el anterior de la misma clave)"""
     try:
-        response = table.query(
-            KeyConditionExpression='usuarioId = :uid',
-            ExpressionAttributeValues={':uid': usuario_id},
-            Limit=1,
-            ScanIndexForward=False
-        )
-        items = response.get('Items', [])
-        return items[0] if items else None
+        table_cache_analisis.put_item(Item={
+            'usuarioId': usuario_id,
+            'clave': clave,
+            'huella': huella,
+            'analisis': float_to_decimal(analisis),
+            'creado': datetime.now().isoformat(),
+            'expira': int(time.time()) + ANALISIS_CACHE_TTL_SEGUNDOS
+        })
     except Exception as e:
-        print(f"⚠️ Error obteniendo datos de {table.name}: {str(e)}")
-        return None
+        print(f"⚠️ Error guardando caché de análisis: {str(e)}")
 
 
-def construir_prompt_analisis(usuario, datos_acad, datos_emo, datos_socio):
-    """Construye el prompt del sistema para análisis de deserción"""
+def construir_prompt_analisis(usuario, datos_acad, datos_emo, datos_socio, analisis):
+    """Construye el prompt del sistema para la narrativa del análisis de deserción"""
     
-    prompt_sistema = """
+    prompt_sistema = f"""
 Eres un analista experto en retención estudiantil y predicción de deserción académica.
 
-Tu misión es evaluar el riesgo de deserción de estudiantes universitarios basándote en sus datos académicos, emocionales y socioeconómicos.
-
-INDICADORES DE RIESGO DE DESERCIÓN:
-
-📚 **Académicos (peso: 40%)**
-- Promedio ponderado < 11: ALTO riesgo
-- Promedio 11-13: MEDIO riesgo  
-- Promedio > 13: BAJO riesgo
-- Cursos reprobados > 3: ALTO riesgo
-- Créditos desaprobados > 15: ALTO riesgo
-- Asistencia < 70%: ALTO riesgo
-- Historial de retiros de cursos: MEDIO-ALTO riesgo
+El riesgo de deserción del estudiante YA FUE CALCULADO con la rúbrica institucional
+(40% académico, 30% emocional, 30% socioeconómico). No lo recalcules ni lo contradigas:
+tu tarea es explicarlo y proponer acciones.
 
-🧠 **Emocionales/Conductuales (peso: 30%)**
-- Frecuencia de acceso RARA_VEZ o NUNCA: ALTO riesgo
-- Horas de estudio < 5/semana: MEDIO-ALTO riesgo
-- No usa servicios de tutoría: MEDIO riesgo
-- No usa servicios de psicología cuando hay bajo rendimiento: MEDIO riesgo
-- No participa en actividades extracurriculares: BAJO-MEDIO riesgo
-
-💰 **Socioeconómicos (peso: 30%)**
-- Situación TRABAJA_Y_ESTUDIA: MEDIO-ALTO riesgo
-- Financiamiento por CREDITO sin avance adecuado: MEDIO riesgo
-- Dependencia económica + bajo rendimiento: ALTO riesgo
-- Ingreso estimado muy bajo: MEDIO riesgo
+RESULTADO DE LA RÚBRICA:
+- Riesgo de deserción: {analisis['riesgo_desercion']}/100
+- Nivel de riesgo: {analisis['nivel_riesgo']}
+- Puntajes por dimensión (0-100): {json.dumps(analisis['puntajes'], ensure_ascii=False)}
+- Factores de riesgo: {json.dumps(analisis['factores_riesgo'], ensure_ascii=False)}
+- Factores protectores: {json.dumps(analisis['factores_protectores'], ensure_ascii=False)}
 
 FORMATO DE RESPUESTA:
 
 Debes responder en formato JSON ESTRICTO con esta estructura:
-{
-  "riesgo_desercion": <número 0-100>,
-  "nivel_riesgo": "<BAJO|MEDIO|ALTO>",
+{{
   "mensaje": "<análisis detallado en 2-3 párrafos>",
-  "factores_riesgo": ["<factor1>", "<factor2>", ...],
-  "factores_protectores": ["<factor1>", "<factor2>", ...],
   "recomendaciones": ["<recomendación1>", "<recomendación2>", ...]
-}
+}}
 
 IMPORTANTE:
-- El porcentaje debe ser un número del 0 al 100
-- BAJO: 0-33, MEDIO: 34-66, ALTO: 67-100
 - Sé específico y basado en datos
 - El mensaje debe ser empático pero realista
 - Incluye recomendaciones accionables
@@ -188,6 +229,52 @@ IMPORTANTE:
     return prompt_sistema, contexto_estudiante
 
 
+def generar_narrativa(usuario, datos_acad, datos_emo, datos_socio, analisis, mensaje_usuario=''):
+    """
+    Pide a Gemini el mensaje y las recomendaciones para un análisis ya calculado
+
+    Returns:
+        Dict con 'mensaje' y 'recomendaciones', o None si Gemini falla, tarda
+        más de ANALISIS_LLM_TIMEOUT_SEGUNDOS o no responde JSON válido
+    """
+    try:
+        prompt_sistema, contexto_estudiante = construir_prompt_analisis(
+            usuario, datos_acad, datos_emo, datos_socio, analisis
+        )
+        
+        instruccion_inicial = f"{prompt_sistema}\n\n{contexto_estudiante}\n\nRedacta el análisis en formato JSON."
+        
+        if mensaje_usuario:
+            # Si hay mensaje del usuario, agregarlo al contexto
+            instruccion_inicial += f"\n\nPregunta del analista: {mensaje_usuario}"
+        
+        response = modelo_narrativa.generate_content(
+            instruccion_inicial,
+            request_options={'timeout': ANALISIS_LLM_TIMEOUT_SEGUNDOS}
+        )
+        respuesta_texto = response.text
+        
+        # Gemini a veces incluye markdown, necesitamos extraer el JSON puro
+        inicio_json = respuesta_texto.find('{')
+        fin_json = respuesta_texto.rfind('}') + 1
+        if inicio_json == -1 or fin_json <= inicio_json:
+            print("⚠️ Gemini no respondió JSON, se usa la narrativa por reglas")
+            return None
+        
+        narrativa = json.loads(respuesta_texto[inicio_json:fin_json])
+        if not isinstance(narrativa.get('mensaje'), str):
+            return None
+        
+        return {
+            'mensaje': narrativa['mensaje'],
+            'recomendaciones': narrativa.get('recomendaciones') or analisis['recomendaciones']
+        }
+    
+    except Exception as e:
+        print(f"⚠️ Narrativa con Gemini no disponible ({str(e)}), se usa la narrativa por reglas")
+        return None
+
+
 def handler(event, context):
     """
     Analiza riesgo de deserción de un estudiante
@@ -195,7 +282,8 @@ def handler(event, context):
     Body JSON:
     {
         "correo": "estudiante@utec.edu.pe",
-        "mensaje": "opcional, para conversación"
+        "mensaje": "opcional, para conversación",
+        "narrativa": true  // opcional; false para omitir Gemini
     }
     
     Returns:
@@ -203,10 +291,13 @@ def handler(event, context):
             "correo": "...",
             "riesgo_desercion": 0-100,
             "nivel_riesgo": "BAJO|MEDIO|ALTO",
+            "puntajes": {"academico", "emocional", "socioeconomico"},
             "mensaje": "análisis detallado",
             "factores_riesgo": [...],
             "factores_protectores": [...],
-            "recomendaciones": [...]
+            "recomendaciones": [...],
+            "fuente_narrativa": "gemini|reglas",
+            "desde_cache": true|false
         }
     """
     try:
@@ -228,8 +319,11 @@ def handler(event, context):
                 }, ensure_ascii=False)
             }
         
-        # 1. Obtener todos los datos del usuario
-        usuario = obtener_usuario_por_correo(correo)
+        # 1. Obtener todos los datos del usuario (caché entre invocaciones)
+        usuario = obtener_con_cache(
+            ('correo', correo),
+            lambda: obtener_usuario_por_correo(correo)
+        )
         
         if not usuario:
             return {
@@ -246,10 +340,12 @@ def handler(event, context):
         
         usuario_id = usuario.get('id')
         
-        # Obtener datos de las 3 tablas adicionales
-        datos_acad = obtener_datos_por_usuario_id(table_academicos, usuario_id)
-        datos_emo = obtener_datos_por_usuario_id(table_emocionales, usuario_id)
-        datos_socio = obtener_datos_por_usuario_id(table_socioeconomicos, usuario_id)
+        # Obtener datos de las 3 tablas adicionales (en paralelo)
+        perfil = ensamblar_perfil(usuario_id, lector=leer_con_cache)
+        datos_acad = perfil['datos_academicos']
+        datos_emo = perfil['datos_emocionales']
+        datos_socio = perfil['datos_socioeconomicos']
+        print(f"🗄️ Caché de perfiles: {cache_perfiles.estadisticas()}")
         
         # Convertir Decimals para serialización
         usuario = decimal_to_float(usuario)
@@ -257,68 +353,46 @@ def handler(event, context):
         datos_emo = decimal_to_float(datos_emo) if datos_emo else None
         datos_socio = decimal_to_float(datos_socio) if datos_socio else None
         
-        # 2. Construir prompt de análisis
-        prompt_sistema, contexto_estudiante = construir_prompt_analisis(
-            usuario, datos_acad, datos_emo, datos_socio
-        )
+        usar_narrativa = ANALISIS_NARRATIVA_LLM and body.get('narrativa', True)
         
-        # 3. Crear modelo de Gemini
-        model = genai.GenerativeModel(
-            model_name='gemini-2.0-flash',
-            generation_config={
-                'temperature': 0.7,
-                'max_output_tokens': 2048,
-            }
-        )
-        
-        # Enviar contexto del sistema y datos del estudiante
-        instruccion_inicial = f"{prompt_sistema}\n\n{contexto_estudiante}\n\nAnaliza estos datos y proporciona tu evaluación en formato JSON."
+        # 2. Reutilizar el análisis si los 4 registros no cambiaron. Solo con
+        # narrativa: el análisis por reglas se recalcula en microsegundos con
+        # los registros ya leídos, menos que la lectura de CacheAnalisis
+        # que lo evitaría
+        analisis = None
+        huella = None
+        clave = None
         
-        if mensaje_usuario:
-            # Si hay mensaje del usuario, agregarlo al contexto
-            instruccion_inicial += f"\n\nPregunta del analista: {mensaje_usuario}"
+        if usar_narrativa and ANALISIS_CACHE_HABILITADO:
+            huella = huella_perfil(usuario, datos_acad, datos_emo, datos_socio)
+            clave = clave_analisis(mensaje_usuario)
+            analisis = obtener_analisis_cacheado(usuario_id, clave, huella)
         
-        # Generar análisis
-        response = model.generate_content(instruccion_inicial)
-        respuesta_texto = response.text
+        desde_cache = analisis is not None
         
-        # 4. Parsear respuesta JSON
-        try:
-            # Intentar extraer JSON de la respuesta
-            # Gemini a veces incluye markdown, necesitamos extraer el JSON puro
-            inicio_json = respuesta_texto.find('{')
-            fin_json = respuesta_texto.rfind('}') + 1
+        if not desde_cache:
+            # 3. Calcular riesgo con la rúbrica (determinista)
+            analisis = calcular_riesgo(datos_acad, datos_emo, datos_socio)
+            analisis['mensaje'] = mensaje_por_reglas(analisis)
+            analisis['fuente_narrativa'] = 'reglas'
             
-            if inicio_json != -1 and fin_json > inicio_json:
-                json_str = respuesta_texto[inicio_json:fin_json]
-                analisis = json.loads(json_str)
-            else:
-                # Si no hay JSON válido, crear respuesta por defecto
-                analisis = {
-                    'riesgo_desercion': 50,
-                    'nivel_riesgo': 'MEDIO',
-                    'mensaje': respuesta_texto,
-                    'factores_riesgo': [],
-                    'factores_protectores': [],
-                    'recomendaciones': []
-                }
-        
-        except json.JSONDecodeError as e:
-            print(f"⚠️ Error parseando JSON de Gemini: {str(e)}")
-            print(f"Respuesta original: {respuesta_texto}")
-            # Respuesta de fallback
-            analisis = {
-                'riesgo_desercion': 50,
-                'nivel_riesgo': 'MEDIO',
-                'mensaje': respuesta_texto,
-                'factores_riesgo': [],
-                'factores_protectores': [],
-                'recomendaciones': []
-            }
+            # 4. Narrativa con Gemini (opcional; el puntaje no depende de ella)
+            if usar_narrativa:
+                narrativa = generar_narrativa(
+                    usuario, datos_acad, datos_emo, datos_socio, analisis, mensaje_usuario
+                )
+                if narrativa:
+                    analisis.update(narrativa)
+                    analisis['fuente_narrativa'] = 'gemini'
+                    # Las narrativas por reglas (Gemini caído) no se guardan:
+                    # la siguiente consulta vuelve a intentar con Gemini
+                    if huella:
+                        guardar_analisis(usuario_id, clave, huella, analisis)
         
         # 5. Agregar correo a la respuesta
         analisis['correo'] = correo
         analisis['usuario_id'] = usuario_id
+        analisis['desde_cache'] = desde_cache
         
         return {
             'statusCode': 200,
@@ -0,0 +1,111 @@
+"""
+Conexión DynamoDB compartida por los módulos de la Lambda
+
+Cada módulo creaba su propio recurso al importarse (obtenerUsuario y
+perfilEstudiante abrían dos pools en la misma Lambda). Aquí se crea un único
+recurso por proceso. Los recursos y sus Table no son seguros entre hilos: el
+código que lee en paralelo usa el cliente (obtener_cliente, seguro entre
+hilos y sobre el mismo pool) o un recurso propio por hilo (nuevo_recurso).
+También resuelve el usuario por correo, común a varias Lambdas.
+La configuración de botocore dimensiona el pool
+para los hilos de lectura en paralelo, reutiliza las conexiones (TCP
+keep-alive), reintenta con backoff adaptativo ante throttling y acota los
+tiempos de conexión y lectura.
+"""
+import os
+import threading
+import traceback
+import boto3
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+DYNAMODB_MAX_POOL_CONNECTIONS = int(os.getenv('DYNAMODB_MAX_POOL_CONNECTIONS', '10'))
+DYNAMODB_CONNECT_TIMEOUT = float(os.getenv('DYNAMODB_CONNECT_TIMEOUT', '2'))
+DYNAMODB_READ_TIMEOUT = float(os.getenv('DYNAMODB_READ_TIMEOUT', '5'))
+DYNAMODB_MAX_INTENTOS = int(os.getenv('DYNAMODB_MAX_INTENTOS', '5'))
+
+TABLE_USUARIOS = os.getenv('TABLE_USUARIOS', 'Usuario')
+INDEX_USUARIOS_CORREO = os.getenv('INDEX_USUARIOS_CORREO', 'CorreoIndex')
+
+# Errores de un Query sobre un índice que aún no existe (tabla sin migrar):
+# solo estos justifican el scan de respaldo; throttling o AccessDenied no
+# deben convertir cada búsqueda en un scan de la tabla completa
+ERRORES_INDICE_FALTANTE = ('ValidationException', 'ResourceNotFoundException')
+
+_dynamodb = None
+_lock = threading.Lock()
+
+
+def configuracion_boto(max_pool_connections=None):
+    """Configuración de botocore para DynamoDB"""
+    return Config(
+        max_pool_connections=max_pool_connections or DYNAMODB_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=DYNAMODB_CONNECT_TIMEOUT,
+        read_timeout=DYNAMODB_READ_TIMEOUT,
+        retries={'total_max_attempts': DYNAMODB_MAX_INTENTOS, 'mode': 'adaptive'}
+    )
+
+
+def nuevo_recurso(max_pool_connections=None):
+    """
+    Recurso DynamoDB independiente con la misma configuración (para hilos
+    que necesitan uno propio, p. ej. los del scan de riesgoCohorte)
+    """
+    return boto3.session.Session().resource(
+        'dynamodb',
+        # Se lee en cada llamada: el benchmark de perfilEstudiante la fija
+        endpoint_url=os.getenv('DYNAMODB_ENDPOINT') or None,
+        config=configuracion_boto(max_pool_connections)
+    )
+
+
+def obtener_dynamodb():
+    """Recurso DynamoDB del proceso (se crea en la primera llamada)"""
+    global _dynamodb
+    if _dynamodb is None:
+        with _lock:
+            if _dynamodb is None:
+                _dynamodb = nuevo_recurso()
+    return _dynamodb
+
+
+def obtener_cliente():
+    """Cliente de bajo nivel del recurso compartido (mismo pool de conexiones)"""
+    return obtener_dynamodb().meta.client
+
+
+def obtener_usuario_por_correo(correo):
+    """Busca usuario por correo con Query sobre CorreoIndex (scan como fallback)"""
+    table_usuarios = obtener_dynamodb().Table(TABLE_USUARIOS)
+    try:
+        response = table_usuarios.query(
+            IndexName=INDEX_USUARIOS_CORREO,
+            KeyConditionExpression=Key('correo').eq(correo),
+            Limit=1
+        )
+        items = response.get('Items', [])
+        return items[0] if items else None
+    except ClientError as e:
+        codigo = e.response['Error']['Code']
+        if codigo not in ERRORES_INDICE_FALTANTE:
+            print(f"❌ Error buscando usuario por correo '{correo}' ({codigo}): {str(e)}")
+            return None
+        # Índice aún no creado (tabla sin migrar): recurrir al scan
+        print(f"⚠️ Índice {INDEX_USUARIOS_CORREO} no disponible ({codigo}), usando scan")
+    
+    try:
+        scan_kwargs = {'FilterExpression': Attr('correo').eq(correo)}
+        while True:
+            response = table_usuarios.scan(**scan_kwargs)
+            items = response.get('Items', [])
+            if items:
+                return items[0]
+            if 'LastEvaluatedKey' not in response:
+                return None
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    except Exception as e:
+        print(f"❌ Error buscando usuario por correo '{correo}': {str(e)}")
+        traceback.print_exc()
+        return None
@@ -0,0 +1,86 @@
+"""
+Lambda para contar usuarios
+Endpoint: GET /usuarios/total
+Retorna el total de usuarios (reemplaza el "total" que listarUsuarios
+calculaba escaneando toda la tabla en cada página)
+
+El conteo es un scan con Select=COUNT (no transfiere los ítems) y se guarda
+en memoria CONTEO_USUARIOS_TTL_SEGUNDOS mientras el contenedor esté caliente.
+"""
+import json
+import os
+import time
+
+from conexionDynamo import obtener_dynamodb
+
+# Configuración DynamoDB (recurso compartido del proceso)
+dynamodb = obtener_dynamodb()
+table_usuarios = dynamodb.Table(os.getenv('TABLE_USUARIOS', 'Usuario'))
+CONTEO_USUARIOS_TTL_SEGUNDOS = int(os.getenv('CONTEO_USUARIOS_TTL_SEGUNDOS', '60'))
+
+# Último conteo: {'total': n, 'calculado': epoch}
+_conteo = None
+
+
+def contar_usuarios():
+    """Cuenta los usuarios de la tabla recorriendo todas las páginas del scan"""
+    total = 0
+    params = {'Select': 'COUNT'}
+    while True:
+        response = table_usuarios.scan(**params)
+        total += response.get('Count', 0)
+        if 'LastEvaluatedKey' not in response:
+            return total
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def obtener_conteo():
+    """Conteo de usuarios, recalculado solo si el guardado venció"""
+    global _conteo
+    ahora = time.time()
+    if _conteo is None or ahora - _conteo['calculado'] >= CONTEO_USUARIOS_TTL_SEGUNDOS:
+        _conteo = {'total': contar_usuarios(), 'calculado': ahora}
+    return _conteo
+
+
+def handler(event, context):
+    """
+    Retorna el total de usuarios
+    
+    Returns:
+        {'total': n, 'calculado': epoch del conteo}
+    """
+    try:
+        conteo = obtener_conteo()
+        
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Credentials': True,
+                'Cache-Control': f'max-age={CONTEO_USUARIOS_TTL_SEGUNDOS}'
+            },
+            'body': json.dumps({
+                'total': conteo['total'],
+                'calculado': int(conteo['calculado'])
+            }, ensure_ascii=False)
+        }
+    
+    except Exception as e:
+        print(f"❌ Error contando usuarios: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'error': True,
+                'message': 'Error interno al contar usuarios',
+                'detalle': str(e)
+            }, ensure_ascii=False)
+        }
@@ -1,17 +1,48 @@
 """
 Lambda para listar usuarios
-Endpoint: GET /usuarios
-Retorna lista básica de usuarios
+Endpoint: GET /usuarios?limit=50&next=<token>&orden=correo|ninguno
+Retorna una página de usuarios (id, correo, autorizacion)
+
+Cada invocación lee una sola página (Limit), así que su costo no depende del
+tamaño de la tabla. El token "next" es el LastEvaluatedKey codificado; se
+devuelve mientras queden usuarios por leer.
+
+Con orden=correo (por defecto) la página sale de ListadoCorreoIndex, un GSI
+con partition key constante (listado = "usuarios") y sort key correo. Si el
+índice aún no existe se recurre a una página de scan sin orden. El total de
+usuarios está en GET /usuarios/total (contarUsuarios).
+
+El token "next" guarda el orden que lo produjo: si la primera página tuvo que
+usar scan, las siguientes siguen con scan aunque el cliente no envíe "orden".
 """
+import base64
+import binascii
 import json
 import os
-import boto3
 from decimal import Decimal
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from conexionDynamo import ERRORES_INDICE_FALTANTE, obtener_dynamodb
 
-# Configuración DynamoDB
-dynamodb = boto3.resource('dynamodb')
+# Configuración DynamoDB (recurso compartido del proceso)
+dynamodb = obtener_dynamodb()
 table_usuarios = dynamodb.Table(os.getenv('TABLE_USUARIOS', 'Usuario'))
+INDEX_USUARIOS_LISTADO = os.getenv('INDEX_USUARIOS_LISTADO', 'ListadoCorreoIndex')
+# Partition key constante: todo el índice es una sola partición "caliente"
+# (un GSI admite ~3000 RCU/1000 WCU por partición). Basta para un listado
+# administrativo paginado; para más tráfico habría que repartirla en N claves
+# ('usuarios#0'...'usuarios#N-1') y mezclar las páginas de cada una.
+LISTADO_USUARIOS = 'usuarios'
+
+LIMIT_POR_DEFECTO = int(os.getenv('LISTADO_LIMIT_POR_DEFECTO', '50'))
+LIMIT_MAXIMO = int(os.getenv('LISTADO_LIMIT_MAXIMO', '200'))
+ORDENES = ('correo', 'ninguno')
+
+PROYECCION = {
+    'ProjectionExpression': '#id, correo, autorizacion',
+    'ExpressionAttributeNames': {'#id': 'id'}
+}
 
 
 def decimal_to_float(obj):
@@ -25,34 +56,129 @@ def decimal_to_float(obj):
     return obj
 
 
+def codificar_cursor(orden, last_evaluated_key):
+    """Codifica el LastEvaluatedKey (y el orden que lo produjo) en un token opaco"""
+    crudo = json.dumps({'o': orden, 'k': last_evaluated_key}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(crudo.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(token, orden=None):
+    """
+    Decodifica un token de codificar_cursor
+
+    Args:
+        token: Token "next" de la página anterior
+        orden: Orden pedido explícitamente por el cliente (None: el del token)
+
+    Returns:
+        (orden del token, ExclusiveStartKey para la siguiente página)
+
+    Raises:
+        ValueError: Si el token es inválido o se generó con otro orden
+    """
+    try:
+        crudo = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        cursor = json.loads(crudo)
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValueError('Token "next" inválido')
+
+    clave = cursor.get('k') if isinstance(cursor, dict) else None
+    if not isinstance(clave, dict) or not all(isinstance(v, str) for v in clave.values()):
+        raise ValueError('Token "next" inválido')
+    if cursor.get('o') not in ORDENES or (orden and cursor.get('o') != orden):
+        raise ValueError('El token "next" se generó con otro orden')
+    return cursor['o'], clave
+
+
+def leer_pagina(orden, limit, inicio=None):
+    """
+    Lee una página de usuarios
+
+    Args:
+        orden: 'correo' (índice ordenado) o 'ninguno' (scan)
+        limit: Máximo de usuarios de la página
+        inicio: ExclusiveStartKey (None para la primera página)
+
+    Returns:
+        (usuarios, orden efectivo, LastEvaluatedKey o None)
+    """
+    params = dict(PROYECCION, Limit=limit)
+    if inicio:
+        params['ExclusiveStartKey'] = inicio
+
+    if orden == 'correo':
+        try:
+            response = table_usuarios.query(
+                IndexName=INDEX_USUARIOS_LISTADO,
+                KeyConditionExpression=Key('listado').eq(LISTADO_USUARIOS),
+                **params
+            )
+            return response.get('Items', []), orden, response.get('LastEvaluatedKey')
+        except ClientError as e:
+            # Solo un índice faltante justifica el scan (no throttling ni permisos)
+            if inicio or e.response['Error']['Code'] not in ERRORES_INDICE_FALTANTE:
+                raise
+            # Índice aún no creado (tabla sin migrar): página de scan sin orden
+            print(f"⚠️ Índice {INDEX_USUARIOS_LISTADO} no disponible ({e.response['Error']['Code']}), usando scan")
+            orden = 'ninguno'
+
+    response = table_usuarios.scan(**params)
+    return response.get('Items', []), orden, response.get('LastEvaluatedKey')
+
+
+def _error(status_code, mensaje):
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({
+            'error': True,
+            'message': mensaje
+        }, ensure_ascii=False)
+    }
+
+
 def handler(event, context):
     """
-    Lista todos los usuarios con información básica
+    Lista una página de usuarios con información básica
+    
+    Query params:
+        limit: Usuarios por página (por defecto 50, máximo 200)
+        next: Token de la página anterior
+        orden: 'correo' (por defecto) o 'ninguno'; con next, por defecto el
+               del token
     
     Returns:
-        Lista de usuarios con id, correo, autorizacion
+        {'usuarios': [...], 'cantidad': n, 'next': token o null}
     """
     try:
-        # Escanear tabla de usuarios
-        response = table_usuarios.scan(
-            ProjectionExpression='id, correo, autorizacion'
-        )
+        params = event.get('queryStringParameters') or {}
         
-        usuarios = response.get('Items', [])
+        try:
+            limit = int(params.get('limit') or LIMIT_POR_DEFECTO)
+        except ValueError:
+            return _error(400, 'El parámetro "limit" debe ser un entero')
+        if limit < 1:
+            return _error(400, 'El parámetro "limit" debe ser mayor que 0')
+        limit = min(limit, LIMIT_MAXIMO)
         
-        # Manejar paginación si hay muchos resultados
-        while 'LastEvaluatedKey' in response:
-            response = table_usuarios.scan(
-                ProjectionExpression='id, correo, autorizacion',
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            usuarios.extend(response.get('Items', []))
+        orden = params.get('orden')
+        if orden and orden not in ORDENES:
+            return _error(400, f'El parámetro "orden" debe ser uno de {list(ORDENES)}')
         
-        # Convertir Decimals a float
-        usuarios = decimal_to_float(usuarios)
+        inicio = None
+        if params.get('next'):
+            # Sin "orden" explícito se continúa con el del token (p. ej. el
+            # scan de respaldo de la primera página)
+            try:
+                orden, inicio = decodificar_cursor(params['next'], orden)
+            except ValueError as e:
+                return _error(400, str(e))
+        orden = orden or 'correo'
         
-        # Ordenar por correo para consistencia
-        usuarios.sort(key=lambda x: x.get('correo', ''))
+        usuarios, orden, siguiente = leer_pagina(orden, limit, inicio)
         
         return {
             'statusCode': 200,
@@ -62,8 +188,10 @@ def handler(event, context):
                 'Access-Control-Allow-Credentials': True
             },
             'body': json.dumps({
-                'usuarios': usuarios,
-                'total': len(usuarios)
+                'usuarios': decimal_to_float(usuarios),
+                'cantidad': len(usuarios),
+                'orden': orden,
+                'next': codificar_cursor(orden, siguiente) if siguiente else None
             }, ensure_ascii=False)
         }
     
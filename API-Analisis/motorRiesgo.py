@@ -0,0 +1,313 @@
+"""
+Motor determinista de riesgo de deserción
+Aplica la rúbrica de agenteAnalisis (40% académico, 30% emocional,
+30% socioeconómico) con NumPy, sin LLM, para uno o miles de estudiantes
+
+Cada indicador de la rúbrica es una columna: primero se extraen las
+características de cada perfil a una matriz (N x F), luego se evalúan todos
+los indicadores a la vez (N x K) y el puntaje por dimensión es un producto
+matricial con los pesos. Un indicador sin sus datos (NaN) no cuenta y su
+peso se reparte entre los demás de su dimensión; una dimensión sin ningún
+indicador evaluable no cuenta y su peso se reparte entre las demás.
+"""
+import os
+import numpy as np
+
+# Pesos de la rúbrica por dimensión
+DIMENSIONES = ('academico', 'emocional', 'socioeconomico')
+PESOS_DIMENSION = np.array([0.4, 0.3, 0.3])
+
+# Umbrales de nivel (0-33 BAJO, 34-66 MEDIO, 67-100 ALTO)
+UMBRAL_MEDIO = 34
+UMBRAL_ALTO = 67
+
+# Ingreso mensual considerado "muy bajo" (remuneración mínima por defecto)
+INGRESO_MUY_BAJO = float(os.getenv('INGRESO_MUY_BAJO', '1025'))
+# Ciclos del plan de estudios, para estimar el avance de malla esperado
+CICLOS_CARRERA = int(os.getenv('CICLOS_CARRERA', '10'))
+
+FRECUENCIA_ACCESO = {'DIARIO': 0, 'SEMANAL': 1, 'MENSUAL': 2, 'RARA_VEZ': 3, 'NUNCA': 4}
+USO_SERVICIO = {'NUNCA': 0, 'OCASIONAL': 1, 'REGULAR': 2, 'FRECUENTE': 3}
+
+# Columnas de la matriz de características (NaN = dato no disponible)
+CARACTERISTICAS = (
+    'promedio', 'cursos_reprobados', 'creditos_desaprobados', 'asistencia',
+    'retiros', 'avance_malla', 'ciclo',
+    'acceso', 'horas_estudio', 'tutoria', 'psicologia', 'extracurricular',
+    'trabaja_y_estudia', 'no_trabaja', 'credito', 'beca', 'dependencia', 'ingreso'
+)
+COL = {nombre: i for i, nombre in enumerate(CARACTERISTICAS)}
+
+
+def _escalonado(valores, tramos):
+    """
+    Puntaje por tramos: tramos = [(condición, puntaje), ...], gana la primera
+    condición verdadera; NaN no cumple ninguna y puntúa 0
+    """
+    condiciones = [cond(valores) for cond, _ in tramos]
+    return np.select(condiciones, [p for _, p in tramos], default=0.0)
+
+
+def _c(X, nombre):
+    return X[:, COL[nombre]]
+
+
+def _bajo_rendimiento(X):
+    return _c(X, 'promedio') <= 13
+
+
+def _avance_insuficiente(X):
+    esperado = (_c(X, 'ciclo') - 1) / CICLOS_CARRERA * 100
+    return _c(X, 'avance_malla') < esperado
+
+
+# Indicadores de riesgo: (dimensión, peso dentro de la dimensión, factor,
+# recomendación, función vectorizada que devuelve un puntaje 0-1 por fila,
+# características que necesita para poder evaluarse)
+INDICADORES_RIESGO = (
+    ('academico', 0.35, 'Promedio ponderado bajo',
+     'Agendar tutoría académica en los cursos con menor nota',
+     lambda X: _escalonado(_c(X, 'promedio'), [(lambda v: v < 11, 1.0), (lambda v: v <= 13, 0.5)]),
+     ('promedio',)),
+    ('academico', 0.15, 'Cursos reprobados',
+     'Planificar la recuperación de los cursos reprobados con su coordinador',
+     lambda X: _escalonado(_c(X, 'cursos_reprobados'), [(lambda v: v > 3, 1.0), (lambda v: v > 0, 0.4)]),
+     ('cursos_reprobados',)),
+    ('academico', 0.15, 'Créditos desaprobados acumulados',
+     'Revisar la carga de créditos del próximo ciclo',
+     lambda X: _escalonado(_c(X, 'creditos_desaprobados'), [(lambda v: v > 15, 1.0), (lambda v: v > 0, 0.3)]),
+     ('creditos_desaprobados',)),
+    ('academico', 0.20, 'Asistencia baja',
+     'Dar seguimiento a la asistencia y contactar al estudiante ante inasistencias',
+     lambda X: _escalonado(_c(X, 'asistencia'), [(lambda v: v < 70, 1.0), (lambda v: v < 85, 0.3)]),
+     ('asistencia',)),
+    ('academico', 0.15, 'Historial de retiros de cursos',
+     'Explorar con el estudiante los motivos de sus retiros de cursos',
+     lambda X: np.where(_c(X, 'retiros') > 0, 0.75, 0.0),
+     ('retiros',)),
+
+    ('emocional', 0.30, 'Acceso poco frecuente a la plataforma',
+     'Establecer una rutina de conexión a la plataforma y recordatorios de actividades',
+     lambda X: _escalonado(_c(X, 'acceso'), [(lambda v: v >= 3, 1.0), (lambda v: v == 2, 0.5)]),
+     ('acceso',)),
+    ('emocional', 0.25, 'Pocas horas de estudio semanales',
+     'Armar un horario de estudio de al menos 5 horas semanales',
+     lambda X: np.where(_c(X, 'horas_estudio') < 5, 0.75, 0.0),
+     ('horas_estudio',)),
+    ('emocional', 0.15, 'No usa servicios de tutoría',
+     'Inscribirse en el programa de tutoría',
+     lambda X: np.where(_c(X, 'tutoria') == 0, 0.5, 0.0),
+     ('tutoria',)),
+    ('emocional', 0.15, 'No usa servicios de psicología pese al bajo rendimiento',
+     'Derivar a bienestar estudiantil / servicio de psicología',
+     lambda X: np.where((_c(X, 'psicologia') == 0) & _bajo_rendimiento(X), 0.5, 0.0),
+     ('psicologia', 'promedio')),
+    ('emocional', 0.15, 'No participa en actividades extracurriculares',
+     'Invitar a actividades extracurriculares o grupos de estudio',
+     lambda X: np.where(_c(X, 'extracurricular') == 0, 0.25, 0.0),
+     ('extracurricular',)),
+
+    ('socioeconomico', 0.30, 'Trabaja y estudia',
+     'Evaluar horarios flexibles o una carga académica compatible con el trabajo',
+     lambda X: np.where(_c(X, 'trabaja_y_estudia') == 1, 0.75, 0.0),
+     ('trabaja_y_estudia',)),
+    ('socioeconomico', 0.20, 'Financiamiento por crédito sin avance adecuado',
+     'Orientar sobre las condiciones del crédito educativo y el avance requerido',
+     lambda X: np.where((_c(X, 'credito') == 1) & _avance_insuficiente(X), 0.5, 0.0),
+     ('credito', 'avance_malla', 'ciclo')),
+    ('socioeconomico', 0.30, 'Dependencia económica con bajo rendimiento',
+     'Informar sobre becas y apoyos económicos disponibles',
+     lambda X: np.where((_c(X, 'dependencia') == 1) & (_c(X, 'promedio') < 11), 1.0, 0.0),
+     ('dependencia', 'promedio')),
+    ('socioeconomico', 0.20, 'Ingreso estimado muy bajo',
+     'Revisar la elegibilidad para becas o subvenciones',
+     lambda X: np.where(_c(X, 'ingreso') < INGRESO_MUY_BAJO, 0.5, 0.0),
+     ('ingreso',)),
+)
+
+# Factores protectores: (descripción, condición vectorizada)
+FACTORES_PROTECTORES = (
+    ('Buen promedio ponderado', lambda X: _c(X, 'promedio') > 13),
+    ('Sin cursos reprobados', lambda X: _c(X, 'cursos_reprobados') == 0),
+    ('Asistencia alta', lambda X: _c(X, 'asistencia') >= 85),
+    ('Avance de malla acorde al ciclo', lambda X: _c(X, 'avance_malla') >= (_c(X, 'ciclo') - 1) / CICLOS_CARRERA * 100),
+    ('Acceso frecuente a la plataforma', lambda X: _c(X, 'acceso') <= 1),
+    ('Dedica 15 o más horas semanales al estudio', lambda X: _c(X, 'horas_estudio') >= 15),
+    ('Usa regularmente los servicios de tutoría', lambda X: _c(X, 'tutoria') >= 2),
+    ('Participa en actividades extracurriculares', lambda X: _c(X, 'extracurricular') == 1),
+    ('Cuenta con beca', lambda X: _c(X, 'beca') == 1),
+    ('Dedicación exclusiva al estudio', lambda X: _c(X, 'no_trabaja') == 1),
+)
+
+# Matriz de pesos K x 3: peso de cada indicador en su dimensión
+_MATRIZ_PESOS = np.zeros((len(INDICADORES_RIESGO), len(DIMENSIONES)))
+for _k, (_dimension, _peso, *_) in enumerate(INDICADORES_RIESGO):
+    _MATRIZ_PESOS[_k, DIMENSIONES.index(_dimension)] = _peso
+# Peso de cada indicador en el puntaje global (para ordenar los factores)
+_APORTE_MAXIMO = _MATRIZ_PESOS @ PESOS_DIMENSION
+# Columnas de X que necesita cada indicador
+_COLUMNAS_INDICADOR = [[COL[nombre] for nombre in indicador[5]] for indicador in INDICADORES_RIESGO]
+
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _booleano(valor):
+    return np.nan if valor is None else float(bool(valor))
+
+
+def _categoria(valor, opciones):
+    return float(opciones[valor]) if valor in opciones else np.nan
+
+
+def _igual(valor, esperado):
+    return np.nan if valor is None else float(valor == esperado)
+
+
+def _cantidad(valor):
+    # Lista ausente = dato desconocido (NaN), no "ninguno"
+    return np.nan if valor is None else float(len(valor))
+
+
+def extraer_caracteristicas(perfiles):
+    """
+    Convierte perfiles (datos_acad, datos_emo, datos_socio) en la matriz de características
+
+    Returns:
+        X de N x F con NaN donde falta el dato (registro ausente o campo
+        ausente, p. ej. en los registros parciales de actualizarUsuario)
+    """
+    X = np.full((len(perfiles), len(CARACTERISTICAS)), np.nan)
+
+    for i, (acad, emo, socio) in enumerate(perfiles):
+        fila = X[i]
+        if acad:
+            fila[COL['promedio']] = _numero(acad.get('promedio_ponderado'))
+            fila[COL['cursos_reprobados']] = _cantidad(acad.get('cursos_reprobados'))
+            fila[COL['creditos_desaprobados']] = _numero(acad.get('creditos_desaprobados'))
+            fila[COL['asistencia']] = _numero(acad.get('asistencia_promedio'))
+            fila[COL['retiros']] = _cantidad(acad.get('historial_retirados'))
+            fila[COL['avance_malla']] = _numero(acad.get('avance_malla'))
+            fila[COL['ciclo']] = _numero(acad.get('ciclo_actual'))
+        if emo:
+            fila[COL['acceso']] = _categoria(emo.get('frecuencia_acceso_plataforma'), FRECUENCIA_ACCESO)
+            fila[COL['horas_estudio']] = _numero(emo.get('horas_estudio_estimadas'))
+            fila[COL['tutoria']] = _categoria(emo.get('uso_servicios_tutoria'), USO_SERVICIO)
+            fila[COL['psicologia']] = _categoria(emo.get('uso_servicios_psicologia'), USO_SERVICIO)
+            fila[COL['extracurricular']] = _booleano(emo.get('actividades_extracurriculares'))
+        if socio:
+            laboral = socio.get('situacion_laboral')
+            financiamiento = socio.get('tipo_financiamiento')
+            fila[COL['trabaja_y_estudia']] = _igual(laboral, 'TRABAJA_Y_ESTUDIA')
+            fila[COL['no_trabaja']] = _igual(laboral, 'NO_TRABAJA')
+            fila[COL['credito']] = _igual(financiamiento, 'CREDITO')
+            fila[COL['beca']] = _igual(financiamiento, 'BECA')
+            fila[COL['dependencia']] = _booleano(socio.get('dependencia_economica'))
+            fila[COL['ingreso']] = _numero(socio.get('ingreso_estimado'))
+
+    return X
+
+
+def nivel_de_riesgo(puntajes):
+    """Nivel BAJO/MEDIO/ALTO para un arreglo de puntajes 0-100"""
+    return np.select(
+        [puntajes >= UMBRAL_ALTO, puntajes >= UMBRAL_MEDIO],
+        ['ALTO', 'MEDIO'],
+        default='BAJO'
+    )
+
+
+def calcular_riesgo_lote(perfiles):
+    """
+    Calcula el riesgo de deserción de varios estudiantes a la vez
+
+    Args:
+        perfiles: Lista de tuplas (datos_acad, datos_emo, datos_socio); cualquiera puede ser None
+
+    Returns:
+        Lista de diccionarios con riesgo_desercion, nivel_riesgo, puntajes por
+        dimensión, factores_riesgo, factores_protectores y recomendaciones
+    """
+    if not perfiles:
+        return []
+
+    X = extraer_caracteristicas(perfiles)
+    conocidos = ~np.isnan(X)
+
+    with np.errstate(invalid='ignore'):
+        riesgos = np.column_stack([indicador[4](X) for indicador in INDICADORES_RIESGO])
+        protectores = np.column_stack([condicion(X) for _, condicion in FACTORES_PROTECTORES])
+    evaluables = np.column_stack([conocidos[:, columnas].all(axis=1) for columnas in _COLUMNAS_INDICADOR])
+    riesgos = riesgos * evaluables
+
+    # Puntaje 0-100 por dimensión sobre los indicadores evaluables (un dato
+    # faltante no cuenta como "sin riesgo") y ponderado global (pesos
+    # renormalizados si una dimensión no tiene ningún indicador evaluable)
+    peso_evaluado = evaluables @ _MATRIZ_PESOS
+    disponibles = peso_evaluado > 0
+    puntajes_dimension = np.divide(
+        riesgos @ _MATRIZ_PESOS * 100,
+        peso_evaluado,
+        out=np.zeros_like(peso_evaluado),
+        where=disponibles
+    )
+    pesos = PESOS_DIMENSION * disponibles
+    suma_pesos = pesos.sum(axis=1)
+    riesgo = np.divide(
+        (puntajes_dimension * pesos).sum(axis=1),
+        suma_pesos,
+        out=np.full(len(perfiles), 50.0),
+        where=suma_pesos > 0
+    )
+    riesgo = np.rint(riesgo).astype(int)
+    niveles = nivel_de_riesgo(riesgo)
+
+    # Factores ordenados por aporte al puntaje global (los inactivos al final)
+    aportes = riesgos * _APORTE_MAXIMO
+    orden = np.argsort(-aportes, axis=1, kind='stable').tolist()
+    cantidad_activos = (aportes > 0).sum(axis=1).tolist()
+    protectores = protectores.tolist()
+    puntajes_redondeados = np.round(puntajes_dimension, 1).tolist()
+    disponibles_lista = disponibles.tolist()
+    riesgo = riesgo.tolist()
+    niveles = niveles.tolist()
+
+    resultados = []
+    for i in range(len(perfiles)):
+        activos = orden[i][:cantidad_activos[i]]
+        resultados.append({
+            'riesgo_desercion': riesgo[i],
+            'nivel_riesgo': niveles[i],
+            'puntajes': {
+                dimension: puntajes_redondeados[i][d] if disponibles_lista[i][d] else None
+                for d, dimension in enumerate(DIMENSIONES)
+            },
+            'factores_riesgo': [INDICADORES_RIESGO[k][2] for k in activos],
+            'factores_protectores': [FACTORES_PROTECTORES[k][0] for k, activo in enumerate(protectores[i]) if activo],
+            'recomendaciones': [INDICADORES_RIESGO[k][3] for k in activos],
+            'datos_completos': all(disponibles_lista[i])
+        })
+    return resultados
+
+
+def calcular_riesgo(datos_acad, datos_emo, datos_socio):
+    """Calcula el riesgo de deserción de un estudiante (ver calcular_riesgo_lote)"""
+    return calcular_riesgo_lote([(datos_acad, datos_emo, datos_socio)])[0]
+
+
+def mensaje_por_reglas(analisis):
+    """Mensaje de análisis sin LLM a partir del resultado del motor"""
+    nivel = analisis['nivel_riesgo']
+    mensaje = f"El estudiante presenta un riesgo de deserción {nivel} ({analisis['riesgo_desercion']}/100)."
+
+    if analisis['factores_riesgo']:
+        mensaje += f" Principales factores de riesgo: {', '.join(analisis['factores_riesgo'][:3]).lower()}."
+    if analisis['factores_protectores']:
+        mensaje += f" Como factores protectores destacan: {', '.join(analisis['factores_protectores'][:3]).lower()}."
+    if not analisis['datos_completos']:
+        mensaje += " El cálculo no incluye todas las dimensiones porque faltan datos del estudiante."
+    return mensaje
\ No newline at end of file
@@ -4,17 +4,10 @@ Endpoint: GET /usuario?correo={email}
 Retorna datos consolidados de 4 tablas
 """
 import json
-import os
-import boto3
 from decimal import Decimal
-from boto3.dynamodb.conditions import Attr
 
-# Configuración DynamoDB
-dynamodb = boto3.resource('dynamodb')
-table_usuarios = dynamodb.Table(os.getenv('TABLE_USUARIOS', 'Usuario'))
-table_academicos = dynamodb.Table(os.getenv('TABLE_DATOS_ACADEMICOS', 'DatosAcademicos'))
-table_emocionales = dynamodb.Table(os.getenv('TABLE_DATOS_EMOCIONALES', 'DatosEmocionales'))
-table_socioeconomicos = dynamodb.Table(os.getenv('TABLE_DATOS_SOCIOECONOMICOS', 'DatosSocioeconomicos'))
+from conexionDynamo import obtener_usuario_por_correo
+from perfilEstudiante import ensamblar_perfil
 
 
 def decimal_to_float(obj):
@@ -28,53 +21,6 @@ def decimal_to_float(obj):
     return obj
 
 
-def obtener_usuario_por_correo(correo):
-    """Busca usuario por correo usando scan con paginación"""
-    try:
-        # Primer scan
-        response = table_usuarios.scan(
-            FilterExpression=Attr('correo').eq(correo)
-        )
-        
-        # Revisar items del primer scan
-        items = response.get('Items', [])
-        if items:
-            return items[0]
-        
-        # Si no se encontró, continuar con paginación
-        while 'LastEvaluatedKey' in response:
-            response = table_usuarios.scan(
-                FilterExpression=Attr('correo').eq(correo),
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            items = response.get('Items', [])
-            if items:
-                return items[0]
-        
-        return None
-    except Exception as e:
-        print(f"❌ Error buscando usuario por correo '{correo}': {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return None
-
-
-def obtener_datos_por_usuario_id(table, usuario_id):
-    """Obtiene datos de una tabla por usuarioId"""
-    try:
-        response = table.query(
-            KeyConditionExpression='usuarioId = :uid',
-            ExpressionAttributeValues={':uid': usuario_id},
-            Limit=1,
-            ScanIndexForward=False  # Más reciente primero
-        )
-        items = response.get('Items', [])
-        return items[0] if items else None
-    except Exception as e:
-        print(f"⚠️ Error obteniendo datos de {table.name}: {str(e)}")
-        return None
-
-
 def handler(event, context):
     """
     Obtiene datos completos de un usuario
@@ -120,21 +66,13 @@ def handler(event, context):
         
         usuario_id = usuario.get('id')
         
-        # 2. Obtener datos académicos
-        datos_academicos = obtener_datos_por_usuario_id(table_academicos, usuario_id)
-        
-        # 3. Obtener datos emocionales
-        datos_emocionales = obtener_datos_por_usuario_id(table_emocionales, usuario_id)
-        
-        # 4. Obtener datos socioeconómicos
-        datos_socioeconomicos = obtener_datos_por_usuario_id(table_socioeconomicos, usuario_id)
+        # 2. Obtener datos académicos, emocionales y socioeconómicos (en paralelo)
+        perfil = ensamblar_perfil(usuario_id)
         
         # Consolidar respuesta
         usuario_completo = {
             'usuario': usuario,
-            'datos_academicos': datos_academicos,
-            'datos_emocionales': datos_emocionales,
-            'datos_socioeconomicos': datos_socioeconomicos
+            **perfil
         }
         
         # Convertir Decimals a float
@@ -0,0 +1,209 @@
+"""
+Ensamblado del perfil de un estudiante (DatosAcademicos + DatosEmocionales +
+DatosSocioeconomicos) con las tres consultas en paralelo
+Usado por obtenerUsuario y agenteAnalisis
+
+Las consultas van por el cliente del recurso compartido de conexionDynamo
+(los clientes de botocore son seguros entre hilos, los recursos de boto3 no;
+el del recurso serializa y deserializa tipos de Python), cuyo pool de
+conexiones cubre el pool de hilos y vive mientras el contenedor esté
+caliente.
+
+Cada sección tiene un único registro por usuario con id determinista
+(id_registro_perfil), de modo que las escrituras lo ubican sin leerlo antes.
+
+Benchmark secuencial vs paralelo contra DynamoDB Local o moto:
+
+    python perfilEstudiante.py --benchmark --latencia-ms 8
+    python perfilEstudiante.py --benchmark --endpoint http://localhost:8000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import conexionDynamo
+
+TABLAS_PERFIL = {
+    'datos_academicos': os.getenv('TABLE_DATOS_ACADEMICOS', 'DatosAcademicos'),
+    'datos_emocionales': os.getenv('TABLE_DATOS_EMOCIONALES', 'DatosEmocionales'),
+    'datos_socioeconomicos': os.getenv('TABLE_DATOS_SOCIOECONOMICOS', 'DatosSocioeconomicos')
+}
+
+# Espacio de nombres de los ids deterministas de las secciones del perfil
+NAMESPACE_PERFIL = uuid.uuid5(uuid.NAMESPACE_URL, 'urn:perfil-estudiante')
+
+# Un hilo por tabla; el pool HTTP de conexionDynamo
+# (DYNAMODB_MAX_POOL_CONNECTIONS) debe tener una conexión por hilo
+PERFIL_MAX_WORKERS = int(os.getenv('PERFIL_MAX_WORKERS', str(len(TABLAS_PERFIL))))
+
+_executor = None
+
+
+def id_registro_perfil(seccion, usuario_id):
+    """
+    Id (sort key) del registro de una sección del perfil de un usuario
+
+    Args:
+        seccion: 'datos_academicos', 'datos_emocionales' o 'datos_socioeconomicos'
+        usuario_id: Id del usuario
+
+    Returns:
+        UUID v5 en texto, siempre el mismo para la misma sección y usuario
+    """
+    return str(uuid.uuid5(NAMESPACE_PERFIL, f"{seccion}:{usuario_id}"))
+
+
+def obtener_cliente():
+    """Cliente DynamoDB compartido (se crea en la primera llamada)"""
+    return conexionDynamo.obtener_cliente()
+
+
+def obtener_executor():
+    """Pool de hilos compartido entre invocaciones"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PERFIL_MAX_WORKERS, thread_name_prefix='perfil')
+    return _executor
+
+
+def leer_ultimo_registro(nombre_tabla, usuario_id):
+    """Obtiene el registro más reciente de una tabla por usuarioId"""
+    try:
+        response = obtener_cliente().query(
+            TableName=nombre_tabla,
+            KeyConditionExpression='usuarioId = :uid',
+            ExpressionAttributeValues={':uid': usuario_id},
+            Limit=1,
+            ScanIndexForward=False  # Más reciente primero
+        )
+        items = response.get('Items', [])
+        return items[0] if items else None
+    except Exception as e:
+        print(f"⚠️ Error obteniendo datos de {nombre_tabla}: {str(e)}")
+        return None
+
+
+def ensamblar_perfil(usuario_id, lector=leer_ultimo_registro):
+    """
+    Lee las tres tablas Datos* de un usuario en paralelo
+
+    Args:
+        usuario_id: Id del usuario
+        lector: Función (nombre_tabla, usuario_id) -> registro o None; permite
+                anteponer un caché (agenteAnalisis)
+
+    Returns:
+        {'datos_academicos': ..., 'datos_emocionales': ..., 'datos_socioeconomicos': ...}
+    """
+    executor = obtener_executor()
+    futuros = {
+        clave: executor.submit(lector, nombre_tabla, usuario_id)
+        for clave, nombre_tabla in TABLAS_PERFIL.items()
+    }
+    return {clave: futuro.result() for clave, futuro in futuros.items()}
+
+
+def ensamblar_perfil_secuencial(usuario_id, lector=leer_ultimo_registro):
+    """Versión secuencial (referencia del benchmark)"""
+    return {
+        clave: lector(nombre_tabla, usuario_id)
+        for clave, nombre_tabla in TABLAS_PERFIL.items()
+    }
+
+
+# ===== BENCHMARK =====
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def _preparar_tablas(usuario_id):
+    """Crea las tablas Datos* (si no existen) con un registro del usuario"""
+    cliente = obtener_cliente()
+    existentes = set(cliente.list_tables()['TableNames'])
+    for nombre_tabla in TABLAS_PERFIL.values():
+        if nombre_tabla not in existentes:
+            cliente.create_table(
+                TableName=nombre_tabla,
+                KeySchema=[
+                    {'AttributeName': 'usuarioId', 'KeyType': 'HASH'},
+                    {'AttributeName': 'id', 'KeyType': 'RANGE'}
+                ],
+                AttributeDefinitions=[
+                    {'AttributeName': 'usuarioId', 'AttributeType': 'S'},
+                    {'AttributeName': 'id', 'AttributeType': 'S'}
+                ],
+                BillingMode='PAY_PER_REQUEST'
+            )
+            cliente.get_waiter('table_exists').wait(TableName=nombre_tabla)
+        cliente.put_item(TableName=nombre_tabla, Item={
+            'usuarioId': usuario_id,
+            'id': 'benchmark',
+            'dato': 1
+        })
+
+
+def benchmark(iteraciones, latencia_ms):
+    """
+    Mide p50/p99 de ensamblar el perfil de forma secuencial y en paralelo
+
+    Args:
+        iteraciones: Perfiles a ensamblar con cada variante
+        latencia_ms: Latencia de red simulada por consulta (mediana de una
+                     lognormal); 0 para medir solo el stand-in
+    """
+    usuario_id = 'benchmark-usuario'
+    _preparar_tablas(usuario_id)
+
+    if latencia_ms > 0:
+        def simular_red(**kwargs):
+            time.sleep(latencia_ms / 1000 * random.lognormvariate(0, 0.5))
+        obtener_cliente().meta.events.register('before-call.dynamodb.Query', simular_red)
+
+    resultados = {}
+    for nombre, funcion in (('secuencial', ensamblar_perfil_secuencial), ('paralelo', ensamblar_perfil)):
+        funcion(usuario_id)  # calentamiento (conexiones e hilos)
+        tiempos = []
+        for _ in range(iteraciones):
+            inicio = time.perf_counter()
+            perfil = funcion(usuario_id)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        assert all(perfil.values()), 'El perfil de benchmark debe tener las tres tablas'
+        resultados[nombre] = {
+            'p50_ms': round(_percentil(tiempos, 50), 2),
+            'p99_ms': round(_percentil(tiempos, 99), 2),
+            'media_ms': round(statistics.mean(tiempos), 2)
+        }
+        print(f"⏱️ {nombre:<10} {resultados[nombre]}")
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ensamblado del perfil del estudiante')
+    parser.add_argument('--benchmark', action='store_true', help='Comparar secuencial vs paralelo')
+    parser.add_argument('--iteraciones', type=int, default=200)
+    parser.add_argument('--latencia-ms', type=float, default=8.0, help='Latencia de red simulada por consulta')
+    parser.add_argument('--endpoint', help='DynamoDB Local (p. ej. http://localhost:8000); sin él se usa moto')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    if args.endpoint:
+        os.environ['DYNAMODB_ENDPOINT'] = args.endpoint
+        benchmark(args.iteraciones, args.latencia_ms)
+        return
+
+    from moto import mock_aws  # solo para el benchmark sin DynamoDB Local
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    with mock_aws():
+        benchmark(args.iteraciones, args.latencia_ms)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,323 @@
+"""
+Cálculo del riesgo de deserción de toda la cohorte
+Lambda (invocación directa o programada) y CLI
+
+1. Lee Usuario y las tres tablas Datos* con scans segmentados en paralelo
+2. Une los registros por usuarioId en memoria (el más reciente por tabla,
+   igual que agenteAnalisis)
+3. Calcula el riesgo de todos con motorRiesgo.calcular_riesgo_lote
+4. Escribe los resultados en RiesgoDesercion con batch_writer en paralelo
+
+Uso:
+    python riesgoCohorte.py --escribir                       # DynamoDB -> DynamoDB
+    python riesgoCohorte.py --datos ../DataGenerator/dynamodb-data --salida riesgo.jsonl
+    python riesgoCohorte.py --datos ../DataGenerator/dynamodb-data --replicar 100000
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+from conexionDynamo import nuevo_recurso
+from motorRiesgo import calcular_riesgo_lote
+
+TABLE_USUARIOS = os.getenv('TABLE_USUARIOS', 'Usuario')
+TABLE_DATOS_ACADEMICOS = os.getenv('TABLE_DATOS_ACADEMICOS', 'DatosAcademicos')
+TABLE_DATOS_EMOCIONALES = os.getenv('TABLE_DATOS_EMOCIONALES', 'DatosEmocionales')
+TABLE_DATOS_SOCIOECONOMICOS = os.getenv('TABLE_DATOS_SOCIOECONOMICOS', 'DatosSocioeconomicos')
+TABLE_RIESGO_DESERCION = os.getenv('TABLE_RIESGO_DESERCION', 'RiesgoDesercion')
+
+# Segmentos por tabla en el scan paralelo y hilos de escritura
+COHORTE_SEGMENTOS = int(os.getenv('COHORTE_SEGMENTOS', '8'))
+COHORTE_HILOS_ESCRITURA = int(os.getenv('COHORTE_HILOS_ESCRITURA', '8'))
+# Estudiantes por llamada al motor (acota la memoria de las matrices)
+COHORTE_TAMANO_LOTE = int(os.getenv('COHORTE_TAMANO_LOTE', '20000'))
+
+# Archivos de DataGenerator/dynamodb-data usados como fuente sin conexión
+ARCHIVOS_DATOS = {
+    'usuarios': 'usuarios.json',
+    'academicos': 'datos_academicos.json',
+    'emocionales': 'datos_emocionales.json',
+    'socioeconomicos': 'datos_socioeconomicos.json'
+}
+
+# Los recursos de boto3 no son seguros entre hilos: uno por hilo, con la
+# configuración de conexionDynamo y una sola conexión cada uno
+_local = threading.local()
+
+
+def obtener_tabla(nombre):
+    """Tabla DynamoDB con un recurso propio del hilo actual"""
+    if not hasattr(_local, 'dynamodb'):
+        _local.dynamodb = nuevo_recurso(max_pool_connections=1)
+    return _local.dynamodb.Table(nombre)
+
+
+def escanear_segmento(nombre_tabla, segmento, total_segmentos, proyeccion=None):
+    """Lee un segmento completo de una tabla (con paginación)"""
+    table = obtener_tabla(nombre_tabla)
+    kwargs = {'Segment': segmento, 'TotalSegments': total_segmentos}
+    if proyeccion:
+        kwargs['ProjectionExpression'] = proyeccion
+
+    items = []
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def escanear_tablas(tablas, segmentos=COHORTE_SEGMENTOS):
+    """
+    Scan segmentado en paralelo de varias tablas a la vez
+
+    Args:
+        tablas: Dict alias -> (nombre de tabla, proyección o None)
+        segmentos: Segmentos por tabla
+
+    Returns:
+        Dict alias -> lista de items
+    """
+    with ThreadPoolExecutor(max_workers=len(tablas) * segmentos) as executor:
+        futuros = {
+            alias: [
+                executor.submit(escanear_segmento, nombre, segmento, segmentos, proyeccion)
+                for segmento in range(segmentos)
+            ]
+            for alias, (nombre, proyeccion) in tablas.items()
+        }
+        return {
+            alias: [item for futuro in lista for item in futuro.result()]
+            for alias, lista in futuros.items()
+        }
+
+
+def leer_dynamodb(segmentos=COHORTE_SEGMENTOS):
+    """Lee Usuario y Datos* desde DynamoDB"""
+    return escanear_tablas({
+        'usuarios': (TABLE_USUARIOS, 'id, correo'),
+        'academicos': (TABLE_DATOS_ACADEMICOS, None),
+        'emocionales': (TABLE_DATOS_EMOCIONALES, None),
+        'socioeconomicos': (TABLE_DATOS_SOCIOECONOMICOS, None)
+    }, segmentos)
+
+
+def leer_archivos(directorio):
+    """Lee los JSON generados por DataGenerator (misma forma que leer_dynamodb)"""
+    datos = {}
+    for alias, archivo in ARCHIVOS_DATOS.items():
+        with open(os.path.join(directorio, archivo), encoding='utf-8') as f:
+            datos[alias] = json.load(f)
+    return datos
+
+
+def replicar(datos, total):
+    """
+    Amplía una fuente pequeña a `total` estudiantes (para medir rendimiento):
+    cada copia recibe ids nuevos y deterministas
+    """
+    por_usuario = {alias: indexar_por_usuario(items) for alias, items in datos.items() if alias != 'usuarios'}
+    base = datos['usuarios']
+    resultado = {alias: [] for alias in datos}
+
+    for i in range(total):
+        usuario = base[i % len(base)]
+        nuevo_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{usuario['id']}/{i}"))
+        resultado['usuarios'].append({**usuario, 'id': nuevo_id, 'correo': f"{i}.{usuario['correo']}"})
+        for alias, indice in por_usuario.items():
+            if usuario['id'] in indice:
+                resultado[alias].append({**indice[usuario['id']], 'usuarioId': nuevo_id})
+    return resultado
+
+
+def indexar_por_usuario(items):
+    """usuarioId -> registro más reciente (mayor id, como el Query con ScanIndexForward=False)"""
+    indice = {}
+    for item in items:
+        usuario_id = item.get('usuarioId')
+        actual = indice.get(usuario_id)
+        if actual is None or item.get('id', '') > actual.get('id', ''):
+            indice[usuario_id] = item
+    return indice
+
+
+def unir_perfiles(datos):
+    """
+    Une las tablas por usuarioId
+
+    Returns:
+        Tupla (usuarios, perfiles) con perfiles[i] = (acad, emo, socio) de usuarios[i]
+    """
+    academicos = indexar_por_usuario(datos['academicos'])
+    emocionales = indexar_por_usuario(datos['emocionales'])
+    socioeconomicos = indexar_por_usuario(datos['socioeconomicos'])
+
+    usuarios = datos['usuarios']
+    perfiles = [
+        (academicos.get(u['id']), emocionales.get(u['id']), socioeconomicos.get(u['id']))
+        for u in usuarios
+    ]
+    return usuarios, perfiles
+
+
+def a_decimal(obj):
+    """Convierte float a Decimal para DynamoDB"""
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    elif isinstance(obj, dict):
+        return {k: a_decimal(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [a_decimal(i) for i in obj]
+    return obj
+
+
+def calcular_cohorte(usuarios, perfiles, corrida, tamano_lote=COHORTE_TAMANO_LOTE):
+    """
+    Calcula el riesgo de todos los estudiantes por lotes
+
+    Returns:
+        Lista de registros listos para RiesgoDesercion
+    """
+    calculado = datetime.now().isoformat()
+    registros = []
+
+    for inicio in range(0, len(perfiles), tamano_lote):
+        resultados = calcular_riesgo_lote(perfiles[inicio:inicio + tamano_lote])
+        for usuario, resultado in zip(usuarios[inicio:inicio + tamano_lote], resultados):
+            resultado.pop('recomendaciones', None)
+            registros.append({
+                'usuarioId': usuario['id'],
+                'correo': usuario.get('correo'),
+                **resultado,
+                'corrida': corrida,
+                'calculado': calculado
+            })
+    return registros
+
+
+def escribir_lote(registros):
+    """Escribe un bloque de registros con batch_writer (lotes de 25 y reintentos)"""
+    table = obtener_tabla(TABLE_RIESGO_DESERCION)
+    with table.batch_writer(overwrite_by_pkeys=['usuarioId']) as batch:
+        for registro in registros:
+            batch.put_item(Item=a_decimal(registro))
+    return len(registros)
+
+
+def escribir_resultados(registros, hilos=COHORTE_HILOS_ESCRITURA):
+    """Reparte la escritura en bloques entre varios hilos"""
+    if not registros:
+        return 0
+    tamano = -(-len(registros) // hilos)
+    bloques = [registros[i:i + tamano] for i in range(0, len(registros), tamano)]
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        return sum(executor.map(escribir_lote, bloques))
+
+
+def ejecutar(datos=None, escribir=True, salida=None, segmentos=COHORTE_SEGMENTOS, replicas=0):
+    """
+    Ejecuta el cálculo completo de la cohorte
+
+    Args:
+        datos: Fuente ya cargada (leer_archivos); None para leer de DynamoDB
+        escribir: Escribir en la tabla RiesgoDesercion
+        salida: Ruta de un JSONL donde volcar los resultados (opcional)
+        segmentos: Segmentos por tabla del scan paralelo
+        replicas: Si > 0, amplía la fuente a esa cantidad de estudiantes
+
+    Returns:
+        Resumen con totales por nivel y tiempos por fase
+    """
+    corrida = datetime.now().strftime('%Y%m%dT%H%M%S')
+    tiempos = {}
+
+    inicio = time.perf_counter()
+    if datos is None:
+        datos = leer_dynamodb(segmentos)
+    if replicas:
+        datos = replicar(datos, replicas)
+    usuarios, perfiles = unir_perfiles(datos)
+    tiempos['lectura_s'] = round(time.perf_counter() - inicio, 2)
+    print(f"📥 {len(usuarios)} estudiantes leídos en {tiempos['lectura_s']} s")
+
+    inicio = time.perf_counter()
+    registros = calcular_cohorte(usuarios, perfiles, corrida)
+    tiempos['calculo_s'] = round(time.perf_counter() - inicio, 2)
+    print(f"🧮 Riesgo calculado en {tiempos['calculo_s']} s")
+
+    escritos = 0
+    if escribir:
+        inicio = time.perf_counter()
+        escritos = escribir_resultados(registros)
+        tiempos['escritura_s'] = round(time.perf_counter() - inicio, 2)
+        print(f"💾 {escritos} resultados escritos en {TABLE_RIESGO_DESERCION} en {tiempos['escritura_s']} s")
+
+    if salida:
+        with open(salida, 'w', encoding='utf-8') as f:
+            for registro in registros:
+                f.write(json.dumps(registro, ensure_ascii=False, default=float) + '\n')
+        print(f"📄 Resultados guardados en {salida}")
+
+    niveles = Counter(r['nivel_riesgo'] for r in registros)
+    return {
+        'corrida': corrida,
+        'estudiantes': len(registros),
+        'escritos': escritos,
+        'por_nivel': {nivel: niveles.get(nivel, 0) for nivel in ('BAJO', 'MEDIO', 'ALTO')},
+        'riesgo_promedio': round(sum(float(r['riesgo_desercion']) for r in registros) / len(registros), 1) if registros else 0,
+        'datos_incompletos': sum(1 for r in registros if not r['datos_completos']),
+        'tiempos': tiempos
+    }
+
+
+def handler(event, context):
+    """
+    Calcula y guarda el riesgo de toda la cohorte
+
+    Evento (opcional):
+    {
+        "segmentos": 8
+    }
+    """
+    try:
+        event = event or {}
+        resumen = ejecutar(segmentos=int(event.get('segmentos', COHORTE_SEGMENTOS)))
+        print(f"✅ Cohorte procesada: {json.dumps(resumen, ensure_ascii=False)}")
+        return resumen
+    except Exception as e:
+        print(f"❌ Error calculando riesgo de la cohorte: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Riesgo de deserción de toda la cohorte')
+    parser.add_argument('--datos', help='Directorio con los JSON de DataGenerator (en lugar de DynamoDB)')
+    parser.add_argument('--escribir', action='store_true', help=f'Escribir en la tabla {TABLE_RIESGO_DESERCION}')
+    parser.add_argument('--salida', help='Archivo JSONL donde volcar los resultados')
+    parser.add_argument('--segmentos', type=int, default=COHORTE_SEGMENTOS)
+    parser.add_argument('--replicar', type=int, default=0, help='Ampliar la fuente a N estudiantes (benchmark)')
+    args = parser.parse_args()
+
+    datos = leer_archivos(args.datos) if args.datos else None
+    resumen = ejecutar(
+        datos=datos,
+        escribir=args.escribir,
+        salida=args.salida,
+        segmentos=args.segmentos,
+        replicas=args.replicar
+    )
+    print(json.dumps(resumen, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
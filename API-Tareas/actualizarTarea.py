@@ -9,6 +9,7 @@ from botocore.exceptions import ClientError
 from decimal import Decimal
 import cgi
 import re
+from conexionDynamo import get_user_id_from_email, obtener_dynamodb
 
 def convert_decimal(obj):
     if isinstance(obj, Decimal):
@@ -22,11 +23,10 @@ def convert_decimal(obj):
         return {k: convert_decimal(v) for k, v in obj.items()}
     return obj
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = obtener_dynamodb()
 s3 = boto3.client('s3')
 
 TABLE_TAREAS = os.environ.get('TABLE_TAREAS', 'Tareas')
-TABLE_USUARIOS = os.environ.get('TABLE_USUARIOS', 'Usuarios')
 S3_BUCKET = os.environ.get('S3_BUCKET_TAREAS')
 
 table_tareas = dynamodb.Table(TABLE_TAREAS)
@@ -68,24 +68,6 @@ def _response(status_code, body):
         "body": json.dumps(body, ensure_ascii=False)
     }
 
-def get_user_id_from_email(correo):
-    """Obtiene el ID del usuario desde DynamoDB usando su correo"""
-    try:
-        table_usuarios = dynamodb.Table(TABLE_USUARIOS)
-        
-        response = table_usuarios.scan(
-            FilterExpression='correo = :correo',
-            ExpressionAttributeValues={':correo': correo}
-        )
-        
-        items = response.get('Items', [])
-        if items:
-            return items[0].get('id')
-        return None
-    except Exception as e:
-        print(f"Error al obtener usuario: {e}")
-        return None
-
 def get_email_from_request(fs):
     """Extrae el correo del usuario desde el multipart form"""
     if 'correo' in fs:
@@ -293,24 +275,18 @@ def lambda_handler(event, context):
                 update_expression += ", imagenUrl = :imagenUrl"
                 expression_attribute_values[':imagenUrl'] = imagen_url
             
-            table_tareas.update_item(
+            # ALL_NEW devuelve el item actualizado sin un get_item adicional
+            updated_response = table_tareas.update_item(
                 Key={
                     'usuarioId': usuario_id,
                     'id': tarea_id
                 },
                 UpdateExpression=update_expression,
-                ExpressionAttributeValues=expression_attribute_values
-            )
-            
-            # Obtener item actualizado
-            updated_response = table_tareas.get_item(
-                Key={
-                    'usuarioId': usuario_id,
-                    'id': tarea_id
-                }
+                ExpressionAttributeValues=expression_attribute_values,
+                ReturnValues='ALL_NEW'
             )
             
-            item = convert_decimal(updated_response['Item'])
+            item = convert_decimal(updated_response['Attributes'])
             return _response(200, {
                 "message": "Tarea actualizada exitosamente",
                 "data": item
@@ -0,0 +1,97 @@
+"""
+Conexión DynamoDB compartida por los módulos de la Lambda
+
+Un único recurso por proceso con la configuración de botocore ajustada:
+reutiliza las conexiones entre invocaciones (TCP keep-alive), reintenta con
+backoff adaptativo ante throttling y acota los tiempos de conexión y
+lectura, para que una llamada lenta no consuma el timeout de la Lambda.
+También resuelve el id de usuario por correo, común a todas las Lambdas.
+"""
+import os
+import threading
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+DYNAMODB_MAX_POOL_CONNECTIONS = int(os.getenv('DYNAMODB_MAX_POOL_CONNECTIONS', '10'))
+DYNAMODB_CONNECT_TIMEOUT = float(os.getenv('DYNAMODB_CONNECT_TIMEOUT', '2'))
+DYNAMODB_READ_TIMEOUT = float(os.getenv('DYNAMODB_READ_TIMEOUT', '5'))
+DYNAMODB_MAX_INTENTOS = int(os.getenv('DYNAMODB_MAX_INTENTOS', '5'))
+
+TABLE_USUARIOS = os.environ.get('TABLE_USUARIOS', 'Usuarios')
+INDEX_USUARIOS_CORREO = os.environ.get('INDEX_USUARIOS_CORREO', 'CorreoIndex')
+
+# Errores de un Query sobre un índice que aún no existe (tabla sin migrar):
+# solo estos recurren al scan; throttling o AccessDenied no deben
+# convertir cada búsqueda en un scan de la tabla completa
+ERRORES_INDICE_FALTANTE = ('ValidationException', 'ResourceNotFoundException')
+
+_dynamodb = None
+_lock = threading.Lock()
+
+
+def configuracion_boto():
+    """Configuración de botocore para DynamoDB"""
+    return Config(
+        max_pool_connections=DYNAMODB_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=DYNAMODB_CONNECT_TIMEOUT,
+        read_timeout=DYNAMODB_READ_TIMEOUT,
+        retries={'total_max_attempts': DYNAMODB_MAX_INTENTOS, 'mode': 'adaptive'}
+    )
+
+
+def obtener_dynamodb():
+    """Recurso DynamoDB del proceso (se crea en la primera llamada)"""
+    global _dynamodb
+    if _dynamodb is None:
+        with _lock:
+            if _dynamodb is None:
+                _dynamodb = boto3.session.Session().resource(
+                    'dynamodb',
+                    endpoint_url=os.getenv('DYNAMODB_ENDPOINT') or None,
+                    config=configuracion_boto()
+                )
+    return _dynamodb
+
+
+def get_user_id_from_email(correo):
+    """Obtiene el ID del usuario desde DynamoDB usando su correo (Query sobre CorreoIndex)"""
+    table_usuarios = obtener_dynamodb().Table(TABLE_USUARIOS)
+    try:
+        response = table_usuarios.query(
+            IndexName=INDEX_USUARIOS_CORREO,
+            KeyConditionExpression='correo = :correo',
+            ExpressionAttributeValues={':correo': correo},
+            ProjectionExpression='id',
+            Limit=1
+        )
+        items = response.get('Items', [])
+        return items[0].get('id') if items else None
+    except ClientError as e:
+        codigo = e.response['Error']['Code']
+        if codigo not in ERRORES_INDICE_FALTANTE:
+            print(f"Error al obtener usuario ({codigo}): {e}")
+            return None
+        # Índice aún no creado (tabla sin migrar): recurrir al scan paginado
+        print(f"Índice {INDEX_USUARIOS_CORREO} no disponible ({codigo}), usando scan")
+    except Exception as e:
+        print(f"Error al obtener usuario: {e}")
+        return None
+
+    try:
+        scan_kwargs = {
+            'FilterExpression': 'correo = :correo',
+            'ExpressionAttributeValues': {':correo': correo}
+        }
+        while True:
+            response = table_usuarios.scan(**scan_kwargs)
+            items = response.get('Items', [])
+            if items:
+                return items[0].get('id')
+            if 'LastEvaluatedKey' not in response:
+                return None
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    except Exception as e:
+        print(f"Error al obtener usuario: {e}")
+        return None
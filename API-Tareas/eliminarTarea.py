@@ -3,11 +3,11 @@ import json
 import boto3
 import base64
 from botocore.exceptions import ClientError
+from conexionDynamo import get_user_id_from_email, obtener_dynamodb
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = obtener_dynamodb()
 s3 = boto3.client('s3')
 TABLE_TAREAS = os.environ.get('TABLE_TAREAS', 'Tareas')
-TABLE_USUARIOS = os.environ.get('TABLE_USUARIOS', 'Usuarios')
 S3_BUCKET = os.environ.get('S3_BUCKET_TAREAS')
 table_tareas = dynamodb.Table(TABLE_TAREAS)
 
@@ -34,24 +34,6 @@ def decode_jwt_payload(token):
     except Exception:
         return None
 
-def get_user_id_from_email(correo):
-    """Obtiene el ID del usuario desde DynamoDB usando su correo"""
-    try:
-        table_usuarios = dynamodb.Table(TABLE_USUARIOS)
-        
-        response = table_usuarios.scan(
-            FilterExpression='correo = :correo',
-            ExpressionAttributeValues={':correo': correo}
-        )
-        
-        items = response.get('Items', [])
-        if items:
-            return items[0].get('id')
-        return None
-    except Exception as e:
-        print(f"Error al obtener usuario: {e}")
-        return None
-
 def get_user_id(event):
     """Extrae el correo del query string o body y obtiene el ID del usuario"""
     correo = None
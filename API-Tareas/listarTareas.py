@@ -1,9 +1,9 @@
 import os
 import json
-import boto3
 import base64
 from botocore.exceptions import ClientError
 from decimal import Decimal
+from conexionDynamo import get_user_id_from_email, obtener_dynamodb
 
 def convert_decimal(obj):
     if isinstance(obj, Decimal):
@@ -18,9 +18,8 @@ def convert_decimal(obj):
         return {k: convert_decimal(v) for k, v in obj.items()}
     return obj
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = obtener_dynamodb()
 TABLE_TAREAS = os.environ.get('TABLE_TAREAS', 'Tareas')
-TABLE_USUARIOS = os.environ.get('TABLE_USUARIOS', 'Usuarios')
 table_tareas = dynamodb.Table(TABLE_TAREAS)
 
 def _response(status_code, body):
@@ -46,24 +45,6 @@ def decode_jwt_payload(token):
     except Exception:
         return None
 
-def get_user_id_from_email(correo):
-    """Obtiene el ID del usuario desde DynamoDB usando su correo"""
-    try:
-        table_usuarios = dynamodb.Table(TABLE_USUARIOS)
-        
-        response = table_usuarios.scan(
-            FilterExpression='correo = :correo',
-            ExpressionAttributeValues={':correo': correo}
-        )
-        
-        items = response.get('Items', [])
-        if items:
-            return items[0].get('id')
-        return None
-    except Exception as e:
-        print(f"Error al obtener usuario: {e}")
-        return None
-
 def get_user_id(event):
     """Extrae el correo del query string y obtiene el ID del usuario"""
     if event.get('queryStringParameters'):
@@ -79,16 +60,23 @@ def lambda_handler(event, context):
         if not usuario_id:
             return _response(400, {"message": "El parámetro 'correo' es requerido en query string"})
         
-        # Listar todas las tareas del usuario
+        # Listar todas las tareas del usuario (ids UUID v7: más recientes primero)
         try:
-            response = table_tareas.query(
-                KeyConditionExpression='usuarioId = :uid',
-                ExpressionAttributeValues={
+            query_kwargs = {
+                'KeyConditionExpression': 'usuarioId = :uid',
+                'ExpressionAttributeValues': {
                     ':uid': usuario_id
-                }
-            )
+                },
+                'ScanIndexForward': False
+            }
+            tareas = []
+            while True:
+                response = table_tareas.query(**query_kwargs)
+                tareas.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
             
-            tareas = response.get('Items', [])
             tareas = convert_decimal(tareas)
 
             return _response(200, {
@@ -2,19 +2,18 @@ import os
 import json
 import base64
 import boto3
-import time
-import uuid
 from io import BytesIO
 import cgi
+from conexionDynamo import get_user_id_from_email, obtener_dynamodb
+from identificadores import uuid7
 
 # ===============================
 # 0. Configuración y Clientes AWS
 # ===============================
-dynamodb = boto3.resource('dynamodb')
+dynamodb = obtener_dynamodb()
 s3 = boto3.client('s3')
 
 TABLE_TAREAS = os.environ.get('TABLE_TAREAS', 'Tareas')
-TABLE_USUARIOS = os.environ.get('TABLE_USUARIOS', 'Usuarios')
 S3_BUCKET = os.environ.get('S3_BUCKET_TAREAS')
 
 table_tareas = dynamodb.Table(TABLE_TAREAS)
@@ -72,25 +71,6 @@ def decode_jwt_payload(token):
     except Exception:
         return None
 
-def get_user_id_from_email(correo):
-    """Obtiene el ID del usuario desde DynamoDB usando su correo"""
-    try:
-        table_usuarios = dynamodb.Table(TABLE_USUARIOS)
-        
-        # Como correo es sort key, hacemos un scan con filtro
-        response = table_usuarios.scan(
-            FilterExpression='correo = :correo',
-            ExpressionAttributeValues={':correo': correo}
-        )
-        
-        items = response.get('Items', [])
-        if items:
-            return items[0].get('id')
-        return None
-    except Exception as e:
-        print(f"Error al obtener usuario: {e}")
-        return None
-
 def get_email_from_request(fs):
     """Extrae el correo del usuario desde el multipart form"""
     if 'correo' in fs:
@@ -152,7 +132,8 @@ def lambda_handler(event, context):
         # ===============================
         # 3c. Generar ID temprano
         # ===============================
-        tarea_id = str(uuid.uuid4())
+        # UUID v7: las tareas del usuario quedan ordenadas por creación en la sort key
+        tarea_id = uuid7()
         
         # ===============================
         # 3d. Análisis con Gemini
@@ -3,10 +3,13 @@
 Crear/verificar tablas DynamoDB a partir de esquemas JSON (x-dynamodb).
 - Lee archivos JSON en ./schemas-validation
 - Utiliza x-dynamodb.partition_key y opcional x-dynamodb.sort_key
+- Crea índices secundarios globales declarados en x-dynamodb.global_secondary_indexes
+- Activa el TTL nativo si el esquema declara x-dynamodb.ttl_attribute
 - Crea o recrea tablas según sea necesario
 """
 import os
 import json
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 import boto3
@@ -26,7 +29,10 @@ SCHEMA_MAPPING = {
     "Historial.json": os.getenv("TABLE_HISTORIAL", "Historial"),
     "DatosSocioeconomicos.json": os.getenv("TABLE_DATOS_SOCIOECONOMICOS", "DatosSocioeconomicos"),
     "DatosEmocionales.json": os.getenv("TABLE_DATOS_EMOCIONALES", "DatosEmocionales"),
-    "DatosAcademicos.json": os.getenv("TABLE_DATOS_ACADEMICOS", "DatosAcademicos")
+    "DatosAcademicos.json": os.getenv("TABLE_DATOS_ACADEMICOS", "DatosAcademicos"),
+    "CacheRespuestas.json": os.getenv("TABLE_CACHE_RESPUESTAS", "CacheRespuestas"),
+    "RiesgoDesercion.json": os.getenv("TABLE_RIESGO_DESERCION", "RiesgoDesercion"),
+    "CacheAnalisis.json": os.getenv("TABLE_CACHE_ANALISIS", "CacheAnalisis")
 }
 
 # Tablas definidas manualmente si no hay esquema (opcional)
@@ -77,6 +83,117 @@ def find_schema_file(filename: str) -> Path:
     raise FileNotFoundError(f"Esquema no encontrado: {filename} en {SCHEMAS_DIR}")
 
 
+def attr_type_from_schema(schema: dict, attr_name: str) -> str:
+    """
+    Determina el AttributeType (S, N, B) de un atributo según las propiedades del esquema.
+    """
+    if "properties" in schema and attr_name in schema["properties"]:
+        prop = schema["properties"][attr_name].get("type", "string")
+        if isinstance(prop, list):
+            # eliminar "null" si aparece
+            prop = next((p for p in prop if p != "null"), prop[0])
+        return json_type_to_dynamodb_attr_type(prop)
+    return "S"
+
+
+def build_gsi_definitions(schema: dict, attribute_definitions: list) -> list:
+    """
+    Construye GlobalSecondaryIndexes a partir de x-dynamodb.global_secondary_indexes.
+    Agrega a attribute_definitions los atributos clave de los índices que falten.
+
+    Formato esperado en el esquema:
+    "global_secondary_indexes": [
+        {"index_name": "CorreoIndex", "partition_key": "correo", "sort_key": "...", "projection": "ALL"}
+    ]
+    Con "projection": "INCLUDE" se proyectan además los "non_key_attributes".
+    """
+    gsis = []
+    defined = {a["AttributeName"] for a in attribute_definitions}
+    for idx in schema.get("x-dynamodb", {}).get("global_secondary_indexes", []):
+        key_schema = [{"AttributeName": idx["partition_key"], "KeyType": "HASH"}]
+        if idx.get("sort_key"):
+            key_schema.append({"AttributeName": idx["sort_key"], "KeyType": "RANGE"})
+        for key in key_schema:
+            name = key["AttributeName"]
+            if name not in defined:
+                attribute_definitions.append({
+                    "AttributeName": name,
+                    "AttributeType": attr_type_from_schema(schema, name)
+                })
+                defined.add(name)
+        projection = {"ProjectionType": idx.get("projection", "ALL")}
+        if projection["ProjectionType"] == "INCLUDE":
+            projection["NonKeyAttributes"] = idx.get("non_key_attributes", [])
+        gsis.append({
+            "IndexName": idx["index_name"],
+            "KeySchema": key_schema,
+            "Projection": projection
+        })
+    return gsis
+
+
+def ensure_global_secondary_indexes(table_name: str, gsis: list, attribute_definitions: list) -> bool:
+    """
+    Agrega a una tabla existente los GSIs declarados que aún no tenga (sin recrearla
+    ni perder datos). Espera a que cada índice quede ACTIVE.
+    """
+    try:
+        resp = dynamodb.describe_table(TableName=table_name)
+        existing = {g["IndexName"] for g in resp["Table"].get("GlobalSecondaryIndexes", [])}
+        for gsi in gsis:
+            if gsi["IndexName"] in existing:
+                continue
+            print(f"   🔨 Creando índice '{gsi['IndexName']}' en '{table_name}'...")
+            key_names = {k["AttributeName"] for k in gsi["KeySchema"]}
+            dynamodb.update_table(
+                TableName=table_name,
+                AttributeDefinitions=[a for a in attribute_definitions if a["AttributeName"] in key_names],
+                GlobalSecondaryIndexUpdates=[{"Create": gsi}]
+            )
+            waiter = dynamodb.get_waiter("table_exists")
+            while True:
+                waiter.wait(TableName=table_name)
+                desc = dynamodb.describe_table(TableName=table_name)["Table"]
+                status = next(
+                    (g["IndexStatus"] for g in desc.get("GlobalSecondaryIndexes", [])
+                     if g["IndexName"] == gsi["IndexName"]),
+                    "CREATING"
+                )
+                if status == "ACTIVE":
+                    break
+                time.sleep(5)
+            print(f"   ✅ Índice '{gsi['IndexName']}' activo")
+        return True
+    except Exception as e:
+        print(f"   ❌ Error creando índices en '{table_name}': {e}")
+        return False
+
+
+def ensure_time_to_live(table_name: str, ttl_attribute: str) -> bool:
+    """
+    Activa el TTL nativo de DynamoDB sobre ttl_attribute (epoch en segundos)
+    si aún no está activo. DynamoDB borra los ítems vencidos sin costo de escritura.
+    """
+    if not ttl_attribute:
+        return True
+    try:
+        resp = dynamodb.describe_time_to_live(TableName=table_name)
+        desc = resp.get("TimeToLiveDescription", {})
+        if desc.get("TimeToLiveStatus") in ("ENABLED", "ENABLING"):
+            if desc.get("AttributeName") != ttl_attribute:
+                print(f"   ⚠️  '{table_name}' ya tiene TTL sobre '{desc.get('AttributeName')}' (esperado '{ttl_attribute}')")
+            return True
+        dynamodb.update_time_to_live(
+            TableName=table_name,
+            TimeToLiveSpecification={"Enabled": True, "AttributeName": ttl_attribute}
+        )
+        print(f"   ⏳ TTL activado en '{table_name}' sobre '{ttl_attribute}'")
+        return True
+    except Exception as e:
+        print(f"   ❌ Error activando TTL en '{table_name}': {e}")
+        return False
+
+
 def verify_table_structure(table_name: str, expected_key_schema: list) -> bool:
     """
     Compara la KeySchema actual de una tabla con la esperada.
@@ -94,7 +211,20 @@ def verify_table_structure(table_name: str, expected_key_schema: list) -> bool:
         return False
 
 
-def recreate_table(table_name: str, key_schema: list, attribute_definitions: list) -> bool:
+def create_table_kwargs(table_name: str, key_schema: list, attribute_definitions: list, gsis: list = None) -> dict:
+    """Arma los parámetros de create_table (incluye GSIs si existen)."""
+    kwargs = {
+        "TableName": table_name,
+        "KeySchema": key_schema,
+        "AttributeDefinitions": attribute_definitions,
+        "BillingMode": "PAY_PER_REQUEST"
+    }
+    if gsis:
+        kwargs["GlobalSecondaryIndexes"] = gsis
+    return kwargs
+
+
+def recreate_table(table_name: str, key_schema: list, attribute_definitions: list, gsis: list = None) -> bool:
     """
     Elimina (si existe) y crea la tabla con la definición dada.
     """
@@ -111,12 +241,7 @@ def recreate_table(table_name: str, key_schema: list, attribute_definitions: lis
                 print(f"   ⚠️  Error al eliminar (continuando): {e}")
         # Crear
         print(f"   🔨 Creando tabla {table_name}...")
-        dynamodb.create_table(
-            TableName=table_name,
-            KeySchema=key_schema,
-            AttributeDefinitions=attribute_definitions,
-            BillingMode="PAY_PER_REQUEST"
-        )
+        dynamodb.create_table(**create_table_kwargs(table_name, key_schema, attribute_definitions, gsis))
         waiter = dynamodb.get_waiter("table_exists")
         waiter.wait(TableName=table_name)
         print(f"   ✅ Tabla '{table_name}' recreada correctamente")
@@ -156,14 +281,8 @@ def create_table_from_schema(schema_filename: str, table_name: str) -> bool:
 
     xdyn = schema["x-dynamodb"]
     pk_name = xdyn["partition_key"]
-    pk_type = "S"
     # Determinar tipo desde propiedades si es posible
-    if "properties" in schema and pk_name in schema["properties"]:
-        prop = schema["properties"][pk_name].get("type", "string")
-        if isinstance(prop, list):
-            # eliminar "null" si aparece
-            prop = next((p for p in prop if p != "null"), prop[0])
-        pk_type = json_type_to_dynamodb_attr_type(prop)
+    pk_type = attr_type_from_schema(schema, pk_name)
 
     key_schema = [{"AttributeName": pk_name, "KeyType": "HASH"}]
     attribute_definitions = [{"AttributeName": pk_name, "AttributeType": pk_type}]
@@ -171,15 +290,13 @@ def create_table_from_schema(schema_filename: str, table_name: str) -> bool:
     # sort_key opcional
     if "sort_key" in xdyn:
         sk_name = xdyn["sort_key"]
-        sk_type = "S"
-        if "properties" in schema and sk_name in schema["properties"]:
-            prop = schema["properties"][sk_name].get("type", "string")
-            if isinstance(prop, list):
-                prop = next((p for p in prop if p != "null"), prop[0])
-            sk_type = json_type_to_dynamodb_attr_type(prop)
+        sk_type = attr_type_from_schema(schema, sk_name)
         key_schema.append({"AttributeName": sk_name, "KeyType": "RANGE"})
         attribute_definitions.append({"AttributeName": sk_name, "AttributeType": sk_type})
 
+    # Índices secundarios globales opcionales
+    gsis = build_gsi_definitions(schema, attribute_definitions)
+
     # Verificar existencia y estructura
     try:
         print(f"📊 Verificando tabla: {table_name} (esquema: {schema_path.name})")
@@ -195,22 +312,18 @@ def create_table_from_schema(schema_filename: str, table_name: str) -> bool:
         if exists:
             if verify_table_structure(table_name, key_schema):
                 print(f"   ✅ La tabla '{table_name}' ya existe con la estructura esperada.")
-                return True
+                ok = ensure_global_secondary_indexes(table_name, gsis, attribute_definitions)
             else:
                 print(f"   ⚠️  La tabla '{table_name}' existe pero su estructura difiere. Se recreará.")
-                return recreate_table(table_name, key_schema, attribute_definitions)
+                ok = recreate_table(table_name, key_schema, attribute_definitions, gsis)
         else:
             print(f"   🔨 Creando tabla '{table_name}'...")
-            dynamodb.create_table(
-                TableName=table_name,
-                KeySchema=key_schema,
-                AttributeDefinitions=attribute_definitions,
-                BillingMode="PAY_PER_REQUEST"
-            )
+            dynamodb.create_table(**create_table_kwargs(table_name, key_schema, attribute_definitions, gsis))
             waiter = dynamodb.get_waiter("table_exists")
             waiter.wait(TableName=table_name)
             print(f"   ✅ Tabla '{table_name}' creada exitosamente")
-            return True
+            ok = True
+        return ok and ensure_time_to_live(table_name, xdyn.get("ttl_attribute"))
     except Exception as e:
         print(f"   ❌ Error al procesar tabla '{table_name}': {e}")
         return False
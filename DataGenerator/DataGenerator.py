@@ -10,10 +10,15 @@ import json
 import uuid
 import random
 import os
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+# Mismo generador de UUID v7 que las Lambdas
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "API-Agente"))
+from utils.identificadores import uuid7  # noqa: E402
+
 # Configuración
 OUTPUT_DIR = Path(__file__).parent / "dynamodb-data"
 SCHEMAS_DIR = Path(__file__).parent / "schemas-validation"
@@ -36,11 +41,37 @@ NOMBRES_SIMPLE = [
 ]
 
 
+# Debe coincidir con API-Analisis/perfilEstudiante.py (id_registro_perfil)
+NAMESPACE_PERFIL = uuid.uuid5(uuid.NAMESPACE_URL, "urn:perfil-estudiante")
+
+# Partition key constante de ListadoCorreoIndex (listado paginado por correo)
+LISTADO_USUARIOS = "usuarios"
+
+# Contextos de los agentes: prefijo de la sort key de Historial
+# ('<contexto>#<UUID v7>', ver API-Agente/dao/historial_dao.py)
+CONTEXTOS_AGENTE = ["MentorAcademico", "OrientadorVocacional", "Psicologo"]
+
+# Retención del historial (TTL sobre 'expira'), como HISTORIAL_RETENCION_DIAS de API-Agente
+HISTORIAL_RETENCION_DIAS = int(os.getenv("HISTORIAL_RETENCION_DIAS", "365"))
+
+
 def _new_uuid() -> str:
     """Genera UUID v4 como string (36 chars)"""
     return str(uuid.uuid4())
 
 
+def _ids_cronologicos(cantidad: int, dias: int = 90) -> List[str]:
+    """Ids UUID v7 de `cantidad` eventos repartidos en los últimos `dias` días"""
+    ahora = datetime.now()
+    # timestamp(): ahora es hora local (naive), uuid7 tomaría un naive como UTC
+    return [uuid7((ahora - timedelta(seconds=random.randint(0, dias * 86400))).timestamp()) for _ in range(cantidad)]
+
+
+def _id_perfil(seccion: str, usuario_id: str) -> str:
+    """Id determinista (UUID v5) del registro único de una sección Datos* del usuario"""
+    return str(uuid.uuid5(NAMESPACE_PERFIL, f"{seccion}:{usuario_id}"))
+
+
 def generar_correo(base: str) -> str:
     dominio = random.choice(CORREOS_DOMINIOS)
     return f"{base}@{dominio}"
@@ -60,7 +91,8 @@ def generar_usuarios(cantidad: int = USUARIOS_TOTAL) -> List[Dict[str, Any]]:
             "id": _new_uuid(),
             "correo": correo,
             "contrasena": f"hash_{uuid.uuid4().hex[:16]}",
-            "autorizacion": random.choice([True, False])
+            "autorizacion": random.choice([True, False]),
+            "listado": LISTADO_USUARIOS
         }
         usuarios.append(usuario)
         usados.add(correo)
@@ -75,9 +107,9 @@ def generar_tareas(usuarios: List[Dict[str, Any]], max_por_usuario: int = 5) ->
     ]
     for u in usuarios:
         num = random.randint(0, max_por_usuario)
-        for _ in range(num):
+        for tarea_id in _ids_cronologicos(num):
             tarea = {
-                "id": _new_uuid(),
+                "id": tarea_id,
                 "usuarioId": u["id"],
                 "imagenUrl": random.choice([None, f"https://cdn.example.com/{uuid.uuid4().hex}.jpg"]),
                 "texto": random.choice(posibles_textos)
@@ -97,11 +129,15 @@ def generar_historial(usuarios: List[Dict[str, Any]], max_por_usuario: int = 4)
     ]
     for u in usuarios:
         num = random.randint(0, max_por_usuario)
-        for _ in range(num):
+        for historial_id in _ids_cronologicos(num):
+            contexto = random.choice(CONTEXTOS_AGENTE)
+            creado = (uuid.UUID(historial_id).int >> 80) // 1000
             h = {
-                "id": _new_uuid(),
+                "id": f"{contexto}#{historial_id}",
                 "usuarioId": u["id"],
-                "texto": random.choice(ejemplos)
+                "texto": random.choice(ejemplos),
+                "contexto": contexto,
+                "expira": creado + HISTORIAL_RETENCION_DIAS * 86400
             }
             historiales.append(h)
     return historiales
@@ -116,7 +152,7 @@ def generar_datos_socioeconomicos(usuarios: List[Dict[str, Any]]) -> List[Dict[s
     for u in usuarios:
         ingreso = round(random.uniform(0, 5000), 2)
         d = {
-            "id": _new_uuid(),
+            "id": _id_perfil("datos_socioeconomicos", u["id"]),
             "usuarioId": u["id"],
             "tipo_financiamiento": random.choice(TIPOS_FINANCIAMIENTO),
             "situacion_laboral": random.choice(SITUACIONES_LABORALES),
@@ -135,7 +171,7 @@ def generar_datos_emocionales(usuarios: List[Dict[str, Any]]) -> List[Dict[str,
     datos = []
     for u in usuarios:
         d = {
-            "id": _new_uuid(),
+            "id": _id_perfil("datos_emocionales", u["id"]),
             "usuarioId": u["id"],
             "frecuencia_acceso_plataforma": random.choice(FRECUENCIAS_ACCESO),
             "horas_estudio_estimadas": round(random.uniform(0, 40), 1),
@@ -168,7 +204,7 @@ def generar_datos_academicos(usuarios: List[Dict[str, Any]]) -> List[Dict[str, A
         if random.random() < 0.25:
             cursos_reprobados = [f"CUR{random.randint(100,499)}" for _ in range(random.randint(1, 4))]
         d = {
-            "id": _new_uuid(),
+            "id": _id_perfil("datos_academicos", u["id"]),
             "usuarioId": u["id"],
             "carrera": random.choice(CARRERAS),
             "ciclo_actual": random.randint(1, 12),
@@ -88,6 +88,9 @@ TABLE_MAPPING = {
 
 COUNT_LOCK = Lock()
 
+# Segmentos (hilos) del scan paralelo al vaciar una tabla
+DELETE_SEGMENTS = int(os.getenv("DELETE_SEGMENTS", "8"))
+
 
 def convert_float_to_decimal(obj: Any) -> Any:
     """Convierte floats a Decimal recursivamente (para DynamoDB)."""
@@ -130,45 +133,55 @@ def load_json_file(filename: str) -> Optional[List[Dict[str, Any]]]:
         return None
 
 
+def delete_segment(table_name: str, segment: int, total_segments: int, keys: List[str]) -> int:
+    """
+    Borra los items de un segmento del scan a medida que llegan sus páginas
+    (solo se leen las claves y no se acumula nada en memoria).
+    """
+    # Los recursos de boto3 no son seguros entre hilos: uno por segmento
+    table = boto3.session.Session().resource("dynamodb", region_name=AWS_REGION).Table(table_name)
+    names = {f"#k{i}": k for i, k in enumerate(keys)}
+    scan_kwargs = {
+        "Segment": segment,
+        "TotalSegments": total_segments,
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
+    deleted = 0
+    with table.batch_writer() as writer:
+        while True:
+            resp = table.scan(**scan_kwargs)
+            for it in resp.get("Items", []):
+                writer.delete_item(Key={k: it[k] for k in keys})
+                deleted += 1
+            if "LastEvaluatedKey" not in resp:
+                return deleted
+            scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
 def delete_all_items_from_table(table_name: str, pk_name: str, sk_name: Optional[str] = None) -> bool:
     """
-    Elimina todos los items de una tabla leyendo con scan y borrándolos en batch.
+    Elimina todos los items de una tabla con un scan segmentado en paralelo
+    (DELETE_SEGMENTS hilos) que borra en batch mientras lee.
     Nota: costoso en tablas grandes.
     """
     try:
-        table = dynamodb.Table(table_name)
-        print(f"   🗑️  Escaneando items en '{table_name}'...")
-        scan_kwargs = {}
-        items: List[Dict[str, Any]] = []
-        resp = table.scan(**scan_kwargs)
-        items.extend(resp.get("Items", []))
-        while "LastEvaluatedKey" in resp:
-            resp = table.scan(ExclusiveStartKey=resp["LastEvaluatedKey"])
-            items.extend(resp.get("Items", []))
-
-        if not items:
+        keys = [pk_name] + ([sk_name] if sk_name else [])
+        print(f"   🗑️  Escaneando y eliminando items de '{table_name}' ({DELETE_SEGMENTS} segmentos)...")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=DELETE_SEGMENTS) as executor:
+            futures = [
+                executor.submit(delete_segment, table_name, segment, DELETE_SEGMENTS, keys)
+                for segment in range(DELETE_SEGMENTS)
+            ]
+            deleted = sum(f.result() for f in futures)
+
+        if not deleted:
             print(f"   ℹ️  La tabla '{table_name}' ya está vacía")
             return True
 
-        print(f"   🗑️  Eliminando {len(items)} items de '{table_name}'...")
-        batch_size = 25
-        for i in range(0, len(items), batch_size):
-            chunk = items[i : i + batch_size]
-            with table.batch_writer() as writer:
-                for it in chunk:
-                    if pk_name not in it:
-                        print(f"      ⚠️  Item sin PK '{pk_name}', saltando: {it}")
-                        continue
-                    key = {pk_name: it[pk_name]}
-                    if sk_name:
-                        if sk_name in it:
-                            key[sk_name] = it[sk_name]
-                        else:
-                            # si no existe la sk en el item, no se puede eliminar por key compuesta: saltamos
-                            print(f"      ⚠️  Item sin SK '{sk_name}', saltando: {it}")
-                            continue
-                    writer.delete_item(Key=key)
-        print(f"   ✅ {len(items)} items eliminados de '{table_name}'")
+        elapsed = time.perf_counter() - start
+        print(f"   ✅ {deleted} items eliminados de '{table_name}' en {elapsed:.1f}s ({deleted / elapsed:.0f} items/s)")
         return True
     except Exception as e:
         print(f"   ❌ Error al limpiar tabla '{table_name}': {e}")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+MigrarExpiraHistorial.py
+
+Asigna el atributo TTL 'expira' (epoch en segundos) a los registros de
+Historial que no lo tienen, para que DynamoDB los borre al cumplirse la
+retención de su contexto (ver HISTORIAL_RETENCION_DIAS en API-Agente/config.py).
+El TTL de la tabla lo activa CreateTables.py a partir del esquema.
+
+La retención se cuenta desde el instante del id (UUID v7 tras el prefijo
+'<contexto>#'); la memoria consolidada, desde su fecha 'actualizado'. Los
+registros cuya retención ya se cumplió quedan con un 'expira' pasado y el
+TTL los elimina en los días siguientes. Es idempotente: los registros con
+'expira' no se tocan.
+
+Uso:
+  python MigrarExpiraHistorial.py              # tabla DynamoDB
+  python MigrarExpiraHistorial.py --dry-run    # solo reporta
+  python MigrarExpiraHistorial.py --archivos   # historial.json de ./dynamodb-data
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+TABLE_HISTORIAL = os.getenv("TABLE_HISTORIAL", "Historial")
+DATA_DIR = Path(__file__).parent / "dynamodb-data"
+
+# Deben coincidir con API-Agente/config.py (HISTORIAL_RETENCION_DIAS*)
+RETENCION_DIAS = int(os.getenv("HISTORIAL_RETENCION_DIAS", "365"))
+RETENCION_POR_CONTEXTO = {
+    contexto: int(os.getenv(f"HISTORIAL_RETENCION_DIAS_{contexto.upper()}", str(RETENCION_DIAS)))
+    for contexto in ("MentorAcademico", "OrientadorVocacional", "Psicologo")
+}
+
+
+def creado_en(item: Dict[str, Any]) -> int:
+    """Epoch (s) desde el que se cuenta la retención del registro"""
+    valor = item["id"].rpartition("#")[2]
+    try:
+        identificador = uuid.UUID(valor)
+        if identificador.version == 7:
+            return (identificador.int >> 80) // 1000
+    except ValueError:
+        pass
+    if item.get("actualizado"):
+        momento = datetime.fromisoformat(item["actualizado"])
+        if momento.tzinfo is None:
+            momento = momento.replace(tzinfo=timezone.utc)
+        return int(momento.timestamp())
+    return int(time.time())
+
+
+def expira(item: Dict[str, Any]) -> Optional[int]:
+    contexto = item["id"].partition("#")[0]
+    dias = RETENCION_POR_CONTEXTO.get(contexto, RETENCION_DIAS)
+    return creado_en(item) + dias * 86400 if dias > 0 else None
+
+
+def pendientes(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Registros sin 'expira' con su nuevo valor asignado"""
+    resultado = []
+    for item in items:
+        if "expira" in item:
+            continue
+        valor = expira(item)
+        if valor is not None:
+            resultado.append({**item, "expira": valor})
+    return resultado
+
+
+def migrar_tabla(dry_run: bool) -> None:
+    table = boto3.resource("dynamodb", region_name=AWS_REGION).Table(TABLE_HISTORIAL)
+    params = {"FilterExpression": Attr("expira").not_exists()}
+    total = 0
+    while True:
+        response = table.scan(**params)
+        lote = pendientes(response.get("Items", []))
+        total += len(lote)
+        if not dry_run:
+            # BatchWriteItem de 25 registros por llamada
+            with table.batch_writer() as batch:
+                for item in lote:
+                    batch.put_item(Item=item)
+        if "LastEvaluatedKey" not in response:
+            break
+        params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    accion = "a migrar" if dry_run else "migrados"
+    print(f"📋 {TABLE_HISTORIAL}: {total} registros {accion}")
+
+
+def migrar_archivo(dry_run: bool) -> None:
+    ruta = DATA_DIR / "historial.json"
+    items = json.loads(ruta.read_text(encoding="utf-8"))
+    nuevos = {(i["usuarioId"], i["id"]): i for i in pendientes(items)}
+    print(f"📋 historial.json: {len(items)} registros, {len(nuevos)} a migrar")
+    if dry_run:
+        return
+
+    resultado = [nuevos.get((i["usuarioId"], i["id"]), i) for i in items]
+    ruta.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+    print("   ✅ historial.json migrado")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Asigna el TTL 'expira' a los registros de Historial existentes")
+    parser.add_argument("--archivos", action="store_true", help="Migrar historial.json de ./dynamodb-data en lugar de DynamoDB")
+    parser.add_argument("--dry-run", action="store_true", help="Solo reportar los cambios")
+    args = parser.parse_args()
+
+    if args.archivos:
+        migrar_archivo(args.dry_run)
+    else:
+        migrar_tabla(args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+MigrarHistorialContexto.py
+
+Reescribe los registros de Historial cuya sort key no lleva el contexto como
+prefijo, para que cada agente lea solo sus interacciones con begins_with
+(ver API-Agente/dao/historial_dao.py):
+
+  <uuid7>            -> <contexto>#<uuid7>
+  memoria#<contexto> -> <contexto>#memoria   (y su 'hasta' con el prefijo)
+
+El contexto sale del atributo contexto o del prefijo "[contexto]" del texto;
+sin ninguno de los dos el registro queda en General, que todos los agentes
+leen para completar un historial propio corto. Es idempotente: las
+claves que ya tienen prefijo no se tocan.
+
+Uso:
+  python MigrarHistorialContexto.py              # tabla DynamoDB
+  python MigrarHistorialContexto.py --dry-run    # solo reporta
+  python MigrarHistorialContexto.py --archivos   # historial.json de ./dynamodb-data
+"""
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+TABLE_HISTORIAL = os.getenv("TABLE_HISTORIAL", "Historial")
+DATA_DIR = Path(__file__).parent / "dynamodb-data"
+
+# Deben coincidir con API-Agente/config.py (HISTORIAL_CONTEXTOS)
+CONTEXTOS = ("MentorAcademico", "OrientadorVocacional", "Psicologo")
+CONTEXTO_GENERAL = "General"
+PREFIJO_MEMORIA_ANTERIOR = "memoria#"
+
+PATRON_CONTEXTO = re.compile(r"^\s*\[(\w+)\]")
+
+
+def contexto_de(item: Dict[str, Any]) -> str:
+    contexto = item.get("contexto")
+    if not contexto:
+        coincidencia = PATRON_CONTEXTO.match(item.get("texto", ""))
+        contexto = coincidencia.group(1) if coincidencia else None
+    return contexto if contexto in CONTEXTOS else CONTEXTO_GENERAL
+
+
+def migrado(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Registro con la sort key prefijada, o None si ya la tiene"""
+    clave = item["id"]
+    if clave.startswith(PREFIJO_MEMORIA_ANTERIOR):
+        contexto = clave[len(PREFIJO_MEMORIA_ANTERIOR):]
+        nuevo = {**item, "id": f"{contexto}#memoria"}
+        if nuevo.get("hasta") and "#" not in nuevo["hasta"]:
+            nuevo["hasta"] = f"{contexto}#{nuevo['hasta']}"
+        return nuevo
+    if "#" in clave:
+        return None
+    contexto = contexto_de(item)
+    return {**item, "id": f"{contexto}#{clave}", "contexto": contexto}
+
+
+def planificar(items: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Returns:
+        Lista de (registro original, registro con la sort key prefijada)
+    """
+    reemplazos = []
+    for item in items:
+        nuevo = migrado(item)
+        if nuevo is not None:
+            reemplazos.append((item, nuevo))
+    return reemplazos
+
+
+def escanear(table) -> List[Dict[str, Any]]:
+    items, kwargs = [], {}
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def migrar_tabla(dry_run: bool) -> None:
+    table = boto3.resource("dynamodb", region_name=AWS_REGION).Table(TABLE_HISTORIAL)
+    items = escanear(table)
+    reemplazos = planificar(items)
+    print(f"📋 {TABLE_HISTORIAL}: {len(items)} registros, {len(reemplazos)} a migrar")
+    if dry_run:
+        return
+
+    # Primero se escribe el registro nuevo y luego se borra el anterior:
+    # los lectores nunca quedan sin el registro
+    with table.batch_writer() as batch:
+        for _, nuevo in reemplazos:
+            batch.put_item(Item=nuevo)
+    with table.batch_writer() as batch:
+        for anterior, _ in reemplazos:
+            batch.delete_item(Key={"usuarioId": anterior["usuarioId"], "id": anterior["id"]})
+    print(f"   ✅ {TABLE_HISTORIAL} migrada")
+
+
+def migrar_archivo(dry_run: bool) -> None:
+    ruta = DATA_DIR / "historial.json"
+    items = json.loads(ruta.read_text(encoding="utf-8"))
+    reemplazos = planificar(items)
+    print(f"📋 historial.json: {len(items)} registros, {len(reemplazos)} a migrar")
+    if dry_run:
+        return
+
+    resultado = [migrado(item) or item for item in items]
+    ruta.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+    print("   ✅ historial.json migrado")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Antepone el contexto a las sort keys de Historial")
+    parser.add_argument("--archivos", action="store_true", help="Migrar historial.json de ./dynamodb-data en lugar de DynamoDB")
+    parser.add_argument("--dry-run", action="store_true", help="Solo reportar los cambios")
+    args = parser.parse_args()
+
+    if args.archivos:
+        migrar_archivo(args.dry_run)
+    else:
+        migrar_tabla(args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+MigrarIdsOrdenados.py
+
+Reescribe los registros de Historial y Tarea cuyo id (sort key) no es un
+UUID v7, para que el orden de la sort key sea el orden cronológico y
+"últimos N" / "desde T" / "entre T1 y T2" sean consultas por clave
+(ver API-Agente/utils/identificadores.py).
+
+El instante del nuevo id sale del atributo de fecha del registro si lo tiene
+(timestamp, fecha o creado). Los registros sin fecha conservan entre sí el
+orden actual de la sort key y quedan antes de cualquier registro nuevo.
+
+En Tarea también se mueve la imagen de S3 (tareas/<usuarioId>/<id>.jpg) si
+S3_BUCKET_TAREAS está definido. Es idempotente: los ids v7 no se tocan, y
+el prefijo '<contexto>#' de las sort keys de Historial se conserva.
+
+Uso:
+  python MigrarIdsOrdenados.py                   # tablas DynamoDB
+  python MigrarIdsOrdenados.py --dry-run         # solo reporta
+  python MigrarIdsOrdenados.py --archivos        # JSON de ./dynamodb-data
+"""
+import argparse
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+
+# Mismo generador de UUID v7 que las Lambdas
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "API-Agente"))
+from utils.identificadores import uuid7  # noqa: E402
+
+load_dotenv()
+
+AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+S3_BUCKET_TAREAS = os.getenv("S3_BUCKET_TAREAS")
+DATA_DIR = Path(__file__).parent / "dynamodb-data"
+
+# tabla -> (nombre, archivo JSON)
+TABLAS = {
+    "historial": (os.getenv("TABLE_HISTORIAL", "Historial"), "historial.json"),
+    "tareas": (os.getenv("TABLE_TAREAS", "Tareas"), "tareas.json"),
+}
+ATRIBUTOS_FECHA = ("timestamp", "fecha", "creado")
+
+
+def uuid7_en_ms(ms: int) -> str:
+    """UUID v7 de un instante en milisegundos (epoch)"""
+    return uuid7(datetime.fromtimestamp(ms / 1000, tz=timezone.utc))
+
+
+def es_uuid7(valor: str) -> bool:
+    try:
+        return uuid.UUID(valor).version == 7
+    except (ValueError, AttributeError, TypeError):
+        return False
+
+
+def con_prefijo(clave: str, nuevo_id: str) -> str:
+    """Conserva el prefijo '<contexto>#' de las sort keys de Historial"""
+    prefijo, separador, _ = clave.rpartition("#")
+    return f"{prefijo}{separador}{nuevo_id}"
+
+
+def requiere_migracion(clave: str) -> bool:
+    """Id sin UUID v7; las memorias consolidadas ('<contexto>#memoria') no se tocan"""
+    valor = clave.rpartition("#")[2]
+    return valor != "memoria" and not es_uuid7(valor)
+
+
+def fecha_en_ms(item: Dict[str, Any]) -> Optional[int]:
+    """Instante del registro según su atributo de fecha (ISO o epoch), si lo tiene"""
+    for atributo in ATRIBUTOS_FECHA:
+        valor = item.get(atributo)
+        if isinstance(valor, (int, float, Decimal)):
+            return int(float(valor) * 1000)
+        if isinstance(valor, str):
+            try:
+                momento = datetime.fromisoformat(valor)
+            except ValueError:
+                continue
+            if momento.tzinfo is None:
+                momento = momento.replace(tzinfo=timezone.utc)
+            return int(momento.timestamp() * 1000)
+    return None
+
+
+def planificar(items: List[Dict[str, Any]], base_ms: int) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Calcula los reemplazos de los registros sin id v7
+
+    Returns:
+        Lista de (registro original, registro con id v7)
+    """
+    por_usuario: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        if requiere_migracion(item["id"]):
+            por_usuario.setdefault(item["usuarioId"], []).append(item)
+
+    reemplazos = []
+    for registros in por_usuario.values():
+        sin_fecha = sorted((r for r in registros if fecha_en_ms(r) is None), key=lambda r: r["id"])
+        for posicion, registro in enumerate(sin_fecha):
+            # Un milisegundo por registro, antes de base_ms, en el orden actual
+            nuevo_id = uuid7_en_ms(base_ms - len(sin_fecha) + posicion)
+            reemplazos.append((registro, {**registro, "id": con_prefijo(registro["id"], nuevo_id)}))
+        for registro in registros:
+            ms = fecha_en_ms(registro)
+            if ms is not None:
+                reemplazos.append((registro, {**registro, "id": con_prefijo(registro["id"], uuid7_en_ms(ms))}))
+    return reemplazos
+
+
+def escanear(table) -> List[Dict[str, Any]]:
+    items, kwargs = [], {}
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def copiar_imagen(s3, anterior: Dict[str, Any], nuevo: Dict[str, Any]) -> Optional[str]:
+    """
+    Copia la imagen de la tarea a la clave del nuevo id y renueva la URL firmada
+
+    Returns:
+        Clave de la imagen original (se borra cuando el registro nuevo ya
+        está escrito), o None si la tarea no tenía imagen
+    """
+    origen = f"tareas/{anterior['usuarioId']}/{anterior['id']}.jpg"
+    destino = f"tareas/{nuevo['usuarioId']}/{nuevo['id']}.jpg"
+    try:
+        s3.copy_object(Bucket=S3_BUCKET_TAREAS, Key=destino, CopySource={"Bucket": S3_BUCKET_TAREAS, "Key": origen})
+    except ClientError as e:
+        print(f"      ⚠️  Sin imagen en {origen}: {e.response['Error']['Code']}")
+        return None
+    if nuevo.get("imagenUrl"):
+        nuevo["imagenUrl"] = s3.generate_presigned_url(
+            ClientMethod="get_object",
+            Params={"Bucket": S3_BUCKET_TAREAS, "Key": destino},
+            ExpiresIn=86400
+        )
+    return origen
+
+
+def migrar_tablas(dry_run: bool) -> None:
+    dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
+    s3 = boto3.client("s3", region_name=AWS_REGION) if S3_BUCKET_TAREAS else None
+    base_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    for alias, (table_name, _) in TABLAS.items():
+        table = dynamodb.Table(table_name)
+        items = escanear(table)
+        reemplazos = planificar(items, base_ms)
+        print(f"📋 {table_name}: {len(items)} registros, {len(reemplazos)} a migrar")
+        if dry_run:
+            continue
+
+        # Primero se escribe el registro nuevo y luego se borra el anterior:
+        # los lectores nunca quedan sin el registro. Las imágenes originales
+        # se borran al final, cuando batch_writer ya vació las escrituras sin
+        # error: si una falla, el registro anterior sigue con su imagen
+        originales = []
+        with table.batch_writer() as batch:
+            for anterior, nuevo in reemplazos:
+                if alias == "tareas" and s3 is not None:
+                    origen = copiar_imagen(s3, anterior, nuevo)
+                    if origen:
+                        originales.append(origen)
+                batch.put_item(Item=nuevo)
+        with table.batch_writer() as batch:
+            for anterior, _ in reemplazos:
+                batch.delete_item(Key={"usuarioId": anterior["usuarioId"], "id": anterior["id"]})
+        for origen in originales:
+            s3.delete_object(Bucket=S3_BUCKET_TAREAS, Key=origen)
+        print(f"   ✅ {table_name} migrada")
+
+
+def migrar_archivos(dry_run: bool) -> None:
+    base_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    for _, (_, archivo) in TABLAS.items():
+        ruta = DATA_DIR / archivo
+        items = json.loads(ruta.read_text(encoding="utf-8"))
+        reemplazos = planificar(items, base_ms)
+        print(f"📋 {archivo}: {len(items)} registros, {len(reemplazos)} a migrar")
+        if dry_run:
+            continue
+
+        nuevos_ids = {(a["usuarioId"], a["id"]): n["id"] for a, n in reemplazos}
+        resultado = [
+            {**item, "id": nuevos_ids.get((item["usuarioId"], item["id"]), item["id"])}
+            for item in items
+        ]
+        ruta.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"   ✅ {archivo} migrado")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migra Historial y Tarea a ids UUID v7 (ordenados por tiempo)")
+    parser.add_argument("--archivos", action="store_true", help="Migrar los JSON de ./dynamodb-data en lugar de DynamoDB")
+    parser.add_argument("--dry-run", action="store_true", help="Solo reportar los cambios")
+    args = parser.parse_args()
+
+    if args.archivos:
+        migrar_archivos(args.dry_run)
+    else:
+        migrar_tablas(args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+MigrarIdsPerfil.py
+
+Deja un único registro por usuario en DatosAcademicos, DatosEmocionales y
+DatosSocioeconomicos, con el id determinista que usa actualizarUsuario para
+escribir sin leer antes (UUID v5, ver API-Analisis/perfilEstudiante.py).
+
+Por cada usuario se conserva el registro más reciente (mayor id, el mismo que
+leen las Lambdas), se reescribe con el id determinista y se borran los demás.
+Es idempotente: volver a ejecutarlo no cambia nada.
+
+Uso:
+  python MigrarIdsPerfil.py                   # tablas DynamoDB
+  python MigrarIdsPerfil.py --dry-run         # solo reporta
+  python MigrarIdsPerfil.py --archivos        # JSON de ./dynamodb-data
+"""
+import argparse
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import boto3
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+DATA_DIR = Path(__file__).parent / "dynamodb-data"
+
+# Debe coincidir con API-Analisis/perfilEstudiante.py (id_registro_perfil)
+NAMESPACE_PERFIL = uuid.uuid5(uuid.NAMESPACE_URL, "urn:perfil-estudiante")
+
+# sección -> (tabla, archivo JSON)
+SECCIONES = {
+    "datos_academicos": (os.getenv("TABLE_DATOS_ACADEMICOS", "DatosAcademicos"), "datos_academicos.json"),
+    "datos_emocionales": (os.getenv("TABLE_DATOS_EMOCIONALES", "DatosEmocionales"), "datos_emocionales.json"),
+    "datos_socioeconomicos": (os.getenv("TABLE_DATOS_SOCIOECONOMICOS", "DatosSocioeconomicos"), "datos_socioeconomicos.json"),
+}
+
+
+def id_perfil(seccion: str, usuario_id: str) -> str:
+    return str(uuid.uuid5(NAMESPACE_PERFIL, f"{seccion}:{usuario_id}"))
+
+
+def planificar(seccion: str, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+    """
+    Calcula los registros a escribir (con id determinista) y las claves a borrar
+
+    Returns:
+        (registros a escribir, claves {usuarioId, id} a borrar)
+    """
+    por_usuario: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        por_usuario.setdefault(item["usuarioId"], []).append(item)
+
+    escribir, borrar = [], []
+    for usuario_id, registros in por_usuario.items():
+        nuevo_id = id_perfil(seccion, usuario_id)
+        vigente = max(registros, key=lambda r: r["id"])
+        if vigente["id"] != nuevo_id:
+            escribir.append({**vigente, "id": nuevo_id})
+        borrar.extend(
+            {"usuarioId": usuario_id, "id": r["id"]}
+            for r in registros if r["id"] != nuevo_id
+        )
+    return escribir, borrar
+
+
+def escanear(table) -> List[Dict[str, Any]]:
+    items, kwargs = [], {}
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def migrar_tablas(dry_run: bool) -> None:
+    dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
+    for seccion, (table_name, _) in SECCIONES.items():
+        table = dynamodb.Table(table_name)
+        items = escanear(table)
+        escribir, borrar = planificar(seccion, items)
+        print(f"📋 {table_name}: {len(items)} registros, {len(escribir)} a reescribir, {len(borrar)} a borrar")
+        if dry_run:
+            continue
+
+        # Primero se escribe el registro nuevo (mismo contenido) y luego se
+        # borran los anteriores: los lectores nunca quedan sin registro
+        with table.batch_writer() as batch:
+            for registro in escribir:
+                batch.put_item(Item=registro)
+        with table.batch_writer() as batch:
+            for clave in borrar:
+                batch.delete_item(Key=clave)
+        print(f"   ✅ {table_name} migrada")
+
+
+def migrar_archivos(dry_run: bool) -> None:
+    for seccion, (_, archivo) in SECCIONES.items():
+        ruta = DATA_DIR / archivo
+        items = json.loads(ruta.read_text(encoding="utf-8"))
+        escribir, borrar = planificar(seccion, items)
+        print(f"📋 {archivo}: {len(items)} registros, {len(escribir)} a reescribir, {len(borrar)} a borrar")
+        if dry_run:
+            continue
+
+        # El registro migrado ocupa el lugar del primer registro borrado del
+        # usuario, para conservar el orden del archivo
+        reemplazos = {r["usuarioId"]: r for r in escribir}
+        borrados = {(c["usuarioId"], c["id"]) for c in borrar}
+        resultado = []
+        for item in items:
+            if (item["usuarioId"], item["id"]) not in borrados:
+                resultado.append(item)
+            elif item["usuarioId"] in reemplazos:
+                resultado.append(reemplazos.pop(item["usuarioId"]))
+        ruta.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"   ✅ {archivo} migrado")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migra los registros Datos* a ids deterministas")
+    parser.add_argument("--archivos", action="store_true", help="Migrar los JSON de ./dynamodb-data en lugar de DynamoDB")
+    parser.add_argument("--dry-run", action="store_true", help="Solo reportar los cambios")
+    args = parser.parse_args()
+
+    if args.archivos:
+        migrar_archivos(args.dry_run)
+    else:
+        migrar_tablas(args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+MigrarListadoUsuarios.py
+
+Asigna listado = "usuarios" a los usuarios que no lo tengan, para que
+aparezcan en ListadoCorreoIndex (listado paginado por correo de
+API-Analisis/listarUsuarios.py). El índice lo crea CreateTables.py.
+
+Es idempotente: solo toca los usuarios sin el atributo.
+
+Uso:
+  python MigrarListadoUsuarios.py             # tabla DynamoDB
+  python MigrarListadoUsuarios.py --dry-run   # solo reporta
+"""
+import argparse
+import os
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+TABLE_USUARIOS = os.getenv("TABLE_USUARIOS", "Usuarios")
+
+# Debe coincidir con API-Analisis/listarUsuarios.py (LISTADO_USUARIOS)
+LISTADO_USUARIOS = "usuarios"
+
+
+def migrar(dry_run: bool) -> None:
+    table = boto3.resource("dynamodb", region_name=AWS_REGION).Table(TABLE_USUARIOS)
+    params = {
+        "FilterExpression": Attr("listado").not_exists(),
+        "ProjectionExpression": "#id, correo",
+        "ExpressionAttributeNames": {"#id": "id"},
+    }
+    pendientes = 0
+    while True:
+        response = table.scan(**params)
+        for usuario in response.get("Items", []):
+            pendientes += 1
+            if dry_run:
+                continue
+            table.update_item(
+                Key={"id": usuario["id"], "correo": usuario["correo"]},
+                UpdateExpression="SET listado = :listado",
+                ConditionExpression="attribute_exists(id)",
+                ExpressionAttributeValues={":listado": LISTADO_USUARIOS},
+            )
+        if "LastEvaluatedKey" not in response:
+            break
+        params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    accion = "a migrar" if dry_run else "migrados"
+    print(f"📋 {TABLE_USUARIOS}: {pendientes} usuarios {accion}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Agrega el atributo listado a los usuarios existentes")
+    parser.add_argument("--dry-run", action="store_true", help="Solo reportar los cambios")
+    args = parser.parse_args()
+    migrar(args.dry_run)
+
+
+if __name__ == "__main__":
+    main()